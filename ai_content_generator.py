@@ -1,25 +1,34 @@
 # ai_content_generator.py
 
-import openai
 import os
 import json
 import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import textstat
-import yake
 from bs4 import BeautifulSoup
+from config import Config
+from metrics import OPENAI_REQUEST_SECONDS, OPENAI_TOKENS_TOTAL
+from prompt_builder import build_ai_prompt, build_map_prompt, compact_markdown, count_tokens, needs_map_reduce, split_into_chunks
+
+SYSTEM_PROMPT = "You are an expert Hindi content writer specializing in SEO-optimized articles."
+# Prompt + completion context se thoda kam rakhte hain - local count tiktoken ke bina estimate hai
+CONTEXT_MARGIN_TOKENS = 64
+MIN_COMPLETION_TOKENS = 256
 
 class AIContentGenerator:
     def __init__(self, api_key=None):
+        # openai/textstat/yake pehli zaroorat par import hote hain - app startup inka wait nahi karta
         self.api_key = api_key or os.getenv('OPENAI_API_KEY')
-        if self.api_key:
-            openai.api_key = self.api_key
     
     def analyze_content_quality(self, content):
         """Content ki SEO quality analyze karta hai"""
         soup = BeautifulSoup(content, 'html.parser')
         text = soup.get_text()
         
+        import textstat
+        import yake
+
         # Basic SEO metrics
         word_count = len(text.split())
         readability_score = textstat.flesch_reading_ease(text)
@@ -62,36 +71,91 @@ class AIContentGenerator:
             recommendations.append("Content ko simple aur readable banayein")
         return recommendations
     
-    def generate_content_with_ai(self, prompt, max_tokens=2000):
-        """OpenAI se content generate karta hai"""
+    def _chat(self, prompt, max_tokens):
+        """
+        Ek ChatCompletion call. Prompt ke tokens locally gin kar max_tokens context ke andar rakhta hai.
+        Return: (content, usage, latency) ya error dict.
+        """
         if not self.api_key:
             return {"error": "OpenAI API key not configured"}
-        
+
+        prompt_tokens = count_tokens(SYSTEM_PROMPT) + count_tokens(prompt)
+        available = Config.AI_CONTEXT_TOKENS - prompt_tokens - CONTEXT_MARGIN_TOKENS
+        if available < MIN_COMPLETION_TOKENS:
+            return {"error": f"Prompt too long for the model context (~{prompt_tokens} tokens)"}
+
+        import openai
+        openai.api_key = self.api_key
+        model = Config.AI_MODEL
+        started = time.perf_counter()
         try:
             response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
+                model=model,
                 messages=[
-                    {"role": "system", "content": "You are an expert Hindi content writer specializing in SEO-optimized articles."},
+                    {"role": "system", "content": SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
-                max_tokens=max_tokens,
-                temperature=0.7
+                max_tokens=min(max_tokens, available),
+                temperature=Config.AI_TEMPERATURE
             )
-            
-            generated_content = response.choices[0].message.content
-            
-            # Content quality analyze karein
-            quality_analysis = self.analyze_content_quality(generated_content)
-            
-            return {
-                "generated_content": generated_content,
-                "quality_analysis": quality_analysis,
-                "tokens_used": response.usage.total_tokens,
-                "timestamp": datetime.now().isoformat()
-            }
-            
         except Exception as e:
+            OPENAI_REQUEST_SECONDS.observe(time.perf_counter() - started, model=model, outcome='error')
             return {"error": f"AI generation failed: {str(e)}"}
+
+        latency = time.perf_counter() - started
+        OPENAI_REQUEST_SECONDS.observe(latency, model=model, outcome='ok')
+        OPENAI_TOKENS_TOTAL.inc(response.usage.total_tokens, model=model)
+        return response.choices[0].message.content, response.usage, latency
+
+    def generate_content_with_ai(self, prompt, max_tokens=2000):
+        """OpenAI se content generate karta hai"""
+        reply = self._chat(prompt, max_tokens)
+        if isinstance(reply, dict):
+            return reply
+        generated_content, usage, latency = reply
+        
+        # Content quality analyze karein
+        quality_analysis = self.analyze_content_quality(generated_content)
+        
+        return {
+            "generated_content": generated_content,
+            "quality_analysis": quality_analysis,
+            "tokens_used": usage.total_tokens,
+            "prompt_tokens": usage.prompt_tokens,
+            "latency_ms": round(latency * 1000, 1),
+            "timestamp": datetime.now().isoformat()
+        }
+
+    def rewrite_article(self, h1, markdown_content, publisher_name, max_tokens=2000):
+        """
+        Scraped article ka rewrite. Token budget ke andar ho to ek hi prompt; lamba ho to map-reduce:
+        har chunk ke tathya (notes) parallel mein nikalte hain, phir notes se ek normal rewrite prompt.
+        """
+        markdown_content = compact_markdown(markdown_content)
+        if not needs_map_reduce(markdown_content):
+            result = self.generate_content_with_ai(build_ai_prompt(h1, markdown_content, publisher_name), max_tokens)
+            if 'error' not in result:
+                result['chunks'] = 1
+            return result
+
+        chunks = split_into_chunks(markdown_content, Config.AI_CHUNK_TOKENS)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=Config.AI_MAP_WORKERS) as pool:
+            notes = list(pool.map(lambda args: self._chat(build_map_prompt(h1, args[1], args[0], len(chunks)), Config.AI_MAP_MAX_TOKENS),
+                                  enumerate(chunks, start=1)))
+        failed = next((reply for reply in notes if isinstance(reply, dict)), None)
+        if failed:
+            return failed
+        map_latency = time.perf_counter() - started
+
+        condensed = f"# {h1}\n\n" + '\n\n'.join(content.strip() for content, _, _ in notes)
+        result = self.generate_content_with_ai(build_ai_prompt(h1, condensed, publisher_name), max_tokens)
+        if 'error' not in result:
+            result['tokens_used'] += sum(usage.total_tokens for _, usage, _ in notes)
+            result['prompt_tokens'] += sum(usage.prompt_tokens for _, usage, _ in notes)
+            result['latency_ms'] = round(result['latency_ms'] + map_latency * 1000, 1)
+            result['chunks'] = len(chunks)
+        return result
     
     def improve_content_seo(self, content, target_keywords):
         """Content ko SEO ke liye optimize karta hai"""
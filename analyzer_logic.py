@@ -3,19 +3,40 @@
 import os
 import json
 import asyncio
-import aiohttp
 import re
 import hashlib
+import time
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
 import logging
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
+from config import Config
+from scan_index import build_scan_index, build_scan_summary
+from scan_checkpoint import ScanCheckpoint
+from redirect_cache import get_redirect_cache, PERMANENT_REDIRECTS
+from url_categorizer import get_matcher
+from link_graph import LinkGraphBuilder, analyze_link_graph, extract_internal_links, site_host
+from seo_audit import SiteAudit, audit_page, reuse_audit
+from scan_priority import PreviousScan, prioritize_urls, carry_over_rows
+from metrics import HTTP_PHASE_SECONDS, HTTP_REQUESTS_TOTAL, task_phase
 
 # --- Configuration and Logging ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 SCAN_DATA_DIR = "scans"
 MAX_CONCURRENT_REQUESTS = 50
+# Title/meta/h1 <head> ke paas hote hain - poora page download karna zaroori nahi
+MAX_HTML_BYTES = 512 * 1024
+# Inke liye body kabhi nahi chahiye, sirf status/redirect - HEAD kaafi hai
+HEAD_ONLY_EXTENSIONS = {
+    '.pdf', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.bmp', '.ico', '.avif',
+    '.mp4', '.webm', '.mov', '.mp3', '.wav', '.zip', '.rar', '.gz', '.apk',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv', '.txt'
+}
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+# Crawl mode: sitemap ke bahar mile internal pages ki limit, aur per page kitne links graph mein jaayein
+CRAWL_MAX_PAGES = 100000
+MAX_LINKS_PER_PAGE = 500
 
 # --- Helper and Logic Functions ---
 def sanitize_url_for_filename(url):
@@ -82,38 +103,181 @@ async def get_all_sitemap_urls(session, base_url):
     unique_urls = list({item['url']: item for item in all_urls}.values())
     return unique_urls
 
-async def check_url_health(session, url_data, semaphore):
+def create_timing_trace_config():
+    """aiohttp trace hooks jo har request ke DNS/connect/TTFB spans `trace_request_ctx` dict mein likhte hain"""
+    def span_start(name):
+        async def hook(session, context, params):
+            spans = context.trace_request_ctx
+            if isinstance(spans, dict):
+                spans[f'_{name}_started'] = time.perf_counter()
+        return hook
+
+    def span_end(name):
+        async def hook(session, context, params):
+            spans = context.trace_request_ctx
+            if isinstance(spans, dict) and f'_{name}_started' in spans:
+                elapsed_ms = (time.perf_counter() - spans.pop(f'_{name}_started')) * 1000
+                # Redirects par har hop ka time jodte hain
+                spans[f'{name}_ms'] = round(spans.get(f'{name}_ms', 0) + elapsed_ms, 1)
+        return hook
+
+    import aiohttp
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(span_start('dns'))
+    trace_config.on_dns_resolvehost_end.append(span_end('dns'))
+    trace_config.on_connection_create_start.append(span_start('connect'))
+    trace_config.on_connection_create_end.append(span_end('connect'))
+    trace_config.on_connection_queued_start.append(span_start('pool_wait'))
+    trace_config.on_connection_queued_end.append(span_end('pool_wait'))
+    trace_config.on_request_start.append(span_start('ttfb'))
+    trace_config.on_request_end.append(span_end('ttfb'))
+    return trace_config
+
+def _record_http_metrics(url, http_status, timings):
+    host = urlparse(url).netloc
+    status_class = f"{http_status // 100}xx" if isinstance(http_status, int) else 'error'
+    HTTP_REQUESTS_TOTAL.inc(host=host, status_class=status_class)
+    for name, value in timings.items():
+        HTTP_PHASE_SECONDS.observe(value / 1000, phase=name[:-3], host=host)
+
+def _wants_head(url):
+    return os.path.splitext(urlparse(url).path)[1].lower() in HEAD_ONLY_EXTENSIONS
+
+async def _read_limited(response, limit):
+    """Body ke sirf pehle `limit` bytes padhta hai; baaki connection close hone par chhod diya jaata hai"""
+    chunks, size = [], 0
+    while size < limit:
+        chunk = await response.content.read(limit - size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size += len(chunk)
+    return b''.join(chunks)
+
+async def _fetch_for_health(session, url, spans):
+    """
+    Media/documents ke liye HEAD (405/501 par GET), baaki ke liye GET. Response context manager
+    return karta hai - non-HTML body kabhi padhi nahi jaati.
+    """
+    if _wants_head(url):
+        response = await session.head(url, timeout=15, allow_redirects=True, trace_request_ctx=spans)
+        if response.status not in (405, 501):
+            return response
+        response.release()
+    return await session.get(url, timeout=15, allow_redirects=True, trace_request_ctx=spans)
+
+async def _verify_cached_redirect(session, url, expected_location, spans):
+    """Cached permanent redirect ka sirf pehla hop check karta hai (HEAD, redirects follow nahi)"""
+    try:
+        async with session.head(url, timeout=15, allow_redirects=False, trace_request_ctx=spans) as response:
+            location = response.headers.get('Location')
+            return (response.status in PERMANENT_REDIRECTS and location is not None
+                    and urljoin(url, location) == expected_location)
+    except Exception:
+        return False
+
+def _history_hops(history):
+    return [{'url': str(hop.url), 'status': hop.status} for hop in history]
+
+def _is_redirect_loop(hops, final_url=None):
+    urls = [hop['url'] for hop in hops] + ([final_url] if final_url else [])
+    return len(urls) != len(set(urls))
+
+async def check_url_health(session, url_data, semaphore, redirect_cache=None, link_host=None, previous_scan=None):
+    """
+    previous_scan: pichla complete scan (PreviousScan). Body byte-for-byte same ho to page dobara
+    parse nahi hota - audit uski row se copy hota hai.
+    """
     url = url_data['url']
     async with semaphore:
+        spans = {}
+        started = time.perf_counter()
+        cached_hops = []
         try:
-            async with session.get(url, timeout=15, allow_redirects=True) as response:
+            fetch_url = url
+            cached = redirect_cache.get(url) if redirect_cache else None
+            if cached:
+                # Known 301 chain: TTL ke andar seedha target, warna ek HEAD se pehla hop verify
+                if redirect_cache.is_fresh(cached) or await _verify_cached_redirect(session, url, redirect_cache.next_hop(cached), spans):
+                    if not redirect_cache.is_fresh(cached):
+                        redirect_cache.mark_verified(url)
+                    fetch_url = cached['target']
+                    cached_hops = cached['hops']
+                else:
+                    redirect_cache.forget(url)
+
+            async with await _fetch_for_health(session, fetch_url, spans) as response:
                 status = response.status
                 final_url = str(response.url)
+                content_type = response.content_type
+                redirect_chain = cached_hops + _history_hops(response.history)
+                if redirect_cache and response.history:
+                    redirect_cache.remember(url, redirect_chain, final_url)
                 
                 content_hash = None
-                if status == 200:
-                    html = await response.text()
-                    soup = BeautifulSoup(html, 'lxml')
-                    title = soup.title.string.strip() if soup.title else ''
-                    desc_tag = soup.find('meta', attrs={'name': 'description'})
-                    content = desc_tag['content'].strip() if desc_tag and desc_tag.get('content') else ''
-                    h1_tag = soup.h1
-                    h1 = h1_tag.get_text(strip=True) if h1_tag else ''
-                    key_content = f"{title}{h1}{content}".encode('utf-8')
-                    content_hash = hashlib.md5(key_content).hexdigest()
+                canonical_url = None
+                links = []
+                page = {}
+                bytes_read = 0
+                if status == 200 and response.method == 'GET' and content_type in HTML_CONTENT_TYPES:
+                    download_started = time.perf_counter()
+                    body = await _read_limited(response, MAX_HTML_BYTES)
+                    bytes_read = len(body)
+                    parse_started = time.perf_counter()
+                    spans['download_ms'] = round((parse_started - download_started) * 1000, 1)
+                    body_hash = hashlib.md5(body).hexdigest()
+                    previous = previous_scan.reusable_audit(url, body_hash) if previous_scan and not link_host else None
+                    if previous:
+                        page = reuse_audit(previous)
+                        content_hash = page.pop('content_hash')
+                        canonical_url = page.pop('canonical_url')
+                    else:
+                        html = body.decode(response.charset or 'utf-8', errors='replace')
+                        soup = BeautifulSoup(html, 'lxml')
+                        title = soup.title.string.strip() if soup.title and soup.title.string else ''
+                        desc_tag = soup.find('meta', attrs={'name': 'description'})
+                        content = desc_tag['content'].strip() if desc_tag and desc_tag.get('content') else ''
+                        h1_tag = soup.h1
+                        h1 = h1_tag.get_text(strip=True) if h1_tag else ''
+                        canonical_tag = soup.find('link', rel='canonical')
+                        if canonical_tag and canonical_tag.get('href'):
+                            canonical_url = urljoin(final_url, canonical_tag['href'].strip())
+                        if link_host:
+                            links = extract_internal_links(soup, final_url, link_host, MAX_LINKS_PER_PAGE)
+                        key_content = f"{title}{h1}{content}".encode('utf-8')
+                        content_hash = hashlib.md5(key_content).hexdigest()
+                        page = audit_page(soup, title, content)
+                    page['body_hash'] = body_hash
+                    spans['parse_ms'] = round((time.perf_counter() - parse_started) * 1000, 1)
                 
-                return {**url_data, "http_status": status, "content_hash": content_hash, "final_url": final_url, "error": None}
+                response_time_ms = round((time.perf_counter() - started) * 1000, 1)
+                timings = {k: v for k, v in spans.items() if not k.startswith('_')}
+                timings['total_ms'] = response_time_ms
+                _record_http_metrics(url, status, timings)
+                extra = {"links": links} if link_host else {}
+                return {**url_data, **extra, **page, "http_status": status, "content_hash": content_hash, "final_url": final_url, "error": None, "response_time_ms": response_time_ms, "timings": timings, "content_type": content_type, "bytes_read": bytes_read, "check_method": response.method,
+                        "redirect_chain": redirect_chain, "redirect_hops": len(redirect_chain), "redirect_loop": False,
+                        "canonical_url": canonical_url, "canonical_mismatch": bool(canonical_url) and canonical_url.rstrip('/') != final_url.rstrip('/')}
         except Exception as e:
-            return {**url_data, "http_status": "Error", "content_hash": None, "final_url": url, "error": str(e)}
+            response_time_ms = round((time.perf_counter() - started) * 1000, 1)
+            timings = {k: v for k, v in spans.items() if not k.startswith('_')}
+            timings['total_ms'] = response_time_ms
+            _record_http_metrics(url, 'Error', timings)
+            # TooManyRedirects ke saath aiohttp poori history deta hai - loop yahin pakda jaata hai
+            redirect_chain = cached_hops + _history_hops(getattr(e, 'history', ()))
+            import aiohttp
+            redirect_loop = isinstance(e, aiohttp.TooManyRedirects) or _is_redirect_loop(redirect_chain)
+            error = 'Redirect loop or too many redirects' if redirect_loop else str(e)
+            return {**url_data, "http_status": "Error", "content_hash": None, "final_url": url, "error": error, "response_time_ms": response_time_ms, "timings": timings, "content_type": None, "bytes_read": 0, "check_method": None,
+                    "redirect_chain": redirect_chain, "redirect_hops": len(redirect_chain), "redirect_loop": redirect_loop,
+                    "canonical_url": None, "canonical_mismatch": False}
 
 def categorize_url(url):
-    path = urlparse(url).path.lower()
-    if any(s in path for s in ['/blog/', '/post/', '/article/', '/news/']): return 'Post/Article'
-    if any(s in path for s in ['/web-stories/', '/web-story/']): return 'Web Story'
-    if any(s in path for s in ['/product/', '/shop/']): return 'Product'
-    if any(s in path for s in ['/category/', '/collection/']): return 'Category Page'
-    if path == '/' or not path: return 'Homepage'
-    return 'Other Page'
+    return get_matcher().categorize(url)
+
+def categorize_urls(urls):
+    """Poori list ek saath - compiled rules ek baar, har unique path ek regex match"""
+    return get_matcher().categorize_many(urls)
     
 def compare_scan_data(old_data, new_data):
     old_map = {item['url']: item for item in old_data}
@@ -137,53 +301,149 @@ def compare_scan_data(old_data, new_data):
             updated.append({'url': url, 'changes': changes})
     return {'added': added, 'removed': removed, 'updated': updated}
 
-async def _async_core_scanner(base_url, scan_id, status_dict):
+async def _async_core_scanner(base_url, scan_id, status_dict, resume=False, crawl=False, budget=None):
+    """
+    budget: {'max_urls': N, 'max_seconds': S} - URLs priority order mein check hote hain jab tak budget bache;
+    baaki pichle scan se carry over hote hain aur scan partial mark hota hai (crawl mode mein lagu nahi).
+    """
+    # aiohttp sirf scan chalne par load hota hai - dashboard/app startup ko iski zaroorat nahi
+    import aiohttp
+    sanitized_url = sanitize_url_for_filename(base_url)
+    site_scan_dir = os.path.join(SCAN_DATA_DIR, sanitized_url)
+    checkpoint = ScanCheckpoint(site_scan_dir, scan_id)
     try:
-        async with aiohttp.ClientSession() as session:
+        phase_timings = status_dict[scan_id].setdefault('timings', {})
+        async with aiohttp.ClientSession(trace_configs=[create_timing_trace_config()]) as session:
             status_dict[scan_id]['status'] = 'running'
             status_dict[scan_id]['progress'] = 5
-            status_dict[scan_id]['message'] = 'Fetching sitemaps...'
-            
-            sitemap_urls = await get_all_sitemap_urls(session, base_url)
-            
-            if not sitemap_urls:
-                status_dict[scan_id] = {**status_dict[scan_id], 'status': 'error', 'message': 'No URLs found or sitemap not accessible.'}
-                return
 
-            total_urls = len(sitemap_urls)
-            final_results = []
+            done_urls = set()
+            if resume and os.path.exists(checkpoint.sitemap_path):
+                # Sitemap dobara fetch nahi karni - checkpoint se URLs aur pehle se checked results
+                sitemap_urls, options = checkpoint.load_sitemap()
+                crawl = options.get('crawl', False)
+                budget = options.get('budget')
+                done_urls = checkpoint.load_done_urls()
+                status_dict[scan_id]['message'] = f'Resuming: {len(done_urls)} URLs already checked'
+            else:
+                status_dict[scan_id]['message'] = 'Fetching sitemaps...'
+                with task_phase('sitemap_scan', 'sitemap_fetch', phase_timings):
+                    sitemap_urls = await get_all_sitemap_urls(session, base_url)
+
+                if not sitemap_urls:
+                    status_dict[scan_id] = {**status_dict[scan_id], 'status': 'error', 'message': 'No URLs found or sitemap not accessible.'}
+                    return
+                budget = None if crawl else budget
+                checkpoint.save_sitemap(base_url, sitemap_urls, {'crawl': crawl, 'budget': budget})
+
+            link_host = site_host(base_url) if crawl else None
+            graph = LinkGraphBuilder() if crawl else None
+            audit = SiteAudit()
+            for row in checkpoint.iter_results():
+                audit.add(row)
+                if graph:
+                    graph.add_page(row)
+            # Audit reuse, content_changed aur budget priority - sab pichle complete scan se
+            previous_scan = await asyncio.to_thread(PreviousScan.load, site_scan_dir, scan_id)
+
+            batch = [url_data for url_data in sitemap_urls if url_data['url'] not in done_urls]
+            completed = len(done_urls)
             semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-            tasks = [check_url_health(session, url_data, semaphore) for url_data in sitemap_urls]
+            redirect_cache = get_redirect_cache()
+            matcher = get_matcher()
+            deadline = None
+            if budget:
+                batch = prioritize_urls(batch, previous_scan, matcher)
+                if budget.get('max_urls'):
+                    batch = batch[:max(0, budget['max_urls'] - completed)]
+                if budget.get('max_seconds'):
+                    deadline = time.monotonic() + budget['max_seconds']
+            total_urls = completed + len(batch)
             
-            for i, future in enumerate(asyncio.as_completed(tasks)):
-                result = await future
-                result['category'] = categorize_url(result.get('final_url', result['url']))
-                final_results.append(result)
-                progress = int(((i + 1) / total_urls) * 100)
-                status_dict[scan_id]['progress'] = progress
-                status_dict[scan_id]['message'] = f'Checking {i+1}/{total_urls}'
+            with task_phase('sitemap_scan', 'url_checks', phase_timings):
+                while batch:
+                    # Tasks priority order mein bante hain - semaphore bhi usi order mein milta hai
+                    tasks = [asyncio.ensure_future(check_url_health(session, url_data, semaphore, redirect_cache, link_host, previous_scan))
+                             for url_data in batch]
+                    try:
+                        for future in asyncio.as_completed(tasks, timeout=deadline - time.monotonic() if deadline else None):
+                            result = await future
+                            result['category'] = matcher.categorize(result.get('final_url', result['url']))
+                            result['content_changed'] = previous_scan.content_changed(result)
+                            audit.add(result)
+                            if graph:
+                                graph.add_page(result)
+                            checkpoint.append(result)
+                            done_urls.add(result['url'])
+                            completed += 1
+                            if completed % Config.SCAN_CHECKPOINT_EVERY == 0:
+                                # Redirect cache ke batched writes checkpoint ke saath, event loop ke bahar
+                                await asyncio.to_thread(redirect_cache.flush)
+                            progress = int((completed / total_urls) * 100)
+                            status_dict[scan_id]['progress'] = progress
+                            status_dict[scan_id]['message'] = f'Checking {completed}/{total_urls}'
+                    except asyncio.TimeoutError:
+                        # Time budget khatam - bache hue checks cancel, unke URLs carry over honge
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+                    # Crawl mode: links mein mile naye internal pages agle round mein (BFS level by level)
+                    batch = []
+                    if graph and completed < CRAWL_MAX_PAGES:
+                        batch = [{'url': url, 'last_modified': 'N/A', 'source': 'crawl'}
+                                 for url in graph.unchecked()[:CRAWL_MAX_PAGES - completed]]
+                        total_urls += len(batch)
+            if budget:
+                unchecked = [url_data for url_data in sitemap_urls if url_data['url'] not in done_urls]
+                status_dict[scan_id]['message'] = f'Carrying over {len(unchecked)} unchecked URLs...'
+                for row in carry_over_rows(previous_scan, unchecked, matcher):
+                    audit.add(row)
+                    checkpoint.append(row)
+            checkpoint.flush()
+            await asyncio.to_thread(redirect_cache.flush)
+            previous_scan = None  # finalize se pehle memory chhod do
         
-        sanitized_url = sanitize_url_for_filename(base_url)
-        site_scan_dir = os.path.join(SCAN_DATA_DIR, sanitized_url)
-        os.makedirs(site_scan_dir, exist_ok=True)
-        filename = os.path.join(site_scan_dir, f"{scan_id}.json")
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(final_results, f, indent=4)
+        link_report = None
+        link_lookup = None
+        if graph:
+            with task_phase('sitemap_scan', 'link_graph', phase_timings):
+                link_lookup, link_report = await asyncio.to_thread(analyze_link_graph, graph, checkpoint.final_path, sitemap_urls)
+        def transform(row):
+            row = audit.annotate(row)
+            if link_lookup:
+                row.pop('links', None)
+                row = {**row, **link_lookup(row['url'])}
+            return row
+
+        with task_phase('sitemap_scan', 'save', phase_timings):
+            filename = checkpoint.finalize(transform)
+            audit_report = audit.write_report(filename)
+            build_scan_index(filename, map(transform, checkpoint.iter_results()))
+        summary = build_scan_summary(filename, map(transform, checkpoint.iter_results()), base_url, phase_timings, link_report, audit_report, budget)
+        checkpoint.cleanup()
         
         status_dict[scan_id]['status'] = 'complete'
-        status_dict[scan_id]['message'] = f'Scan complete! Results saved.'
+        if budget:
+            partial = summary['partial']
+            status_dict[scan_id]['message'] = (f"Partial scan complete: {partial['checked']} checked, {partial['carried_over']} carried over"
+                                               + (f", {partial['unchecked']} never checked" if partial['unchecked'] else '') + '.')
+        else:
+            status_dict[scan_id]['message'] = f'Scan complete! Results saved.'
         status_dict[scan_id]['file'] = filename
 
     except Exception as e:
+        # Checkpoint files rehte hain taaki scan `resume=True` se wahin se chal sake
+        checkpoint.close()
         logging.error(f"Error during scan for {base_url}: {e}")
         status_dict[scan_id]['status'] = 'error'
         status_dict[scan_id]['message'] = str(e)
+        status_dict[scan_id]['resumable'] = os.path.exists(checkpoint.sitemap_path)
 
-def run_full_scan(base_url, scan_id, status_dict):
+def run_full_scan(base_url, scan_id, status_dict, resume=False, crawl=False, budget=None):
     try:
         # On Windows, you might need a specific event loop policy for asyncio in threads
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     except AttributeError:
         # Other OS's don't have this
         pass
-    asyncio.run(_async_core_scanner(base_url, scan_id, status_dict))
\ No newline at end of file
+    asyncio.run(_async_core_scanner(base_url, scan_id, status_dict, resume, crawl, budget))
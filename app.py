@@ -1,6 +1,7 @@
 # app.py
 
-from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory
+from startup_report import mark_imports_done, startup_timings, importtime_breakdown
+from flask import Flask, render_template, request, redirect, url_for, jsonify, send_from_directory, Response
 import os
 import threading
 import uuid
@@ -11,31 +12,49 @@ from datetime import datetime, timedelta
 # Logic scripts import
 from analyzer_logic import run_full_scan, sanitize_url_for_filename, compare_scan_data
 from scraper_logic import run_scrape, SCRAPED_DATA_DIR
-from ai_content_generator import AIContentGenerator
-from competitor_monitor import CompetitorMonitor
-from automated_publisher import AutomatedPublisher
+from bulk_scraper import run_bulk_scrape, new_bulk_task, reset_failed_items, extract_urls, dedupe_urls
+from scan_index import list_scan_files, load_scan_index, query_scan_index, load_latest_summary
+from scan_checkpoint import list_incomplete_scans
+from scan_coordinator import run_sharded_scan, run_sharded_scans
+from link_graph import load_link_graph_report
+from seo_audit import load_audit_report
+from url_categorizer import load_category_rules, save_category_rules, get_matcher, recategorize_all_scans
+from metrics import REGISTRY
+from profiling import run_profiled
+from components import get_ai_generator, get_competitor_monitor, get_auto_publisher, warm_up_in_background
+from scan_export import (EXPORT_FORMATS, SCAN_EXPORT_COLUMNS, DIFF_COLUMNS, OPPORTUNITY_COLUMNS, DIFF_CHANGES,
+                         parse_columns, stream_rows, iter_scan_export, iter_scan_diff, iter_opportunities)
+from http_cache import cached_json, not_modified, file_validators, compress_response, ensure_thumbnail
+from werkzeug.security import safe_join
+from config import Config
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'a-super-secret-key-that-you-should-change'
+app.after_request(compress_response)
 
 # In-memory dictionary to track tasks
 tasks_status = {}
 
-# Initialize new components
-ai_generator = AIContentGenerator()
-competitor_monitor = CompetitorMonitor()
-auto_publisher = AutomatedPublisher()
+# AI generator / competitor monitor pehli request par bante hain (components.py);
+# publisher ka scheduler background mein start hota hai taaki due posts request ke bina bhi publish hon
+warm_up_in_background(get_auto_publisher)
+mark_imports_done()
 
-# Load existing data
-competitor_monitor.load_competitors()
-auto_publisher.load_sites_config()
-auto_publisher.load_publishing_queue()
+def start_task(task_id, target, *args, profile=False):
+    """Background thread mein task chalata hai; profiling per-task ya Config se on hoti hai"""
+    thread = threading.Thread(target=run_profiled, args=(target, args, task_id, tasks_status), kwargs={'enabled': profile})
+    thread.start()
+    return thread
 
 @app.route('/')
 def dashboard():
     sorted_tasks = dict(reversed(list(tasks_status.items())))
     scanned_sites = [d for d in os.listdir('scans') if os.path.isdir(os.path.join('scans', d))]
-    return render_template('dashboard.html', tasks=sorted_tasks, scanned_sites=scanned_sites)
+    site_summaries = {site: load_latest_summary(os.path.join('scans', site)) for site in scanned_sites}
+    # Jo scans abhi chal rahe hain woh "interrupted" list mein nahi dikhne chahiye
+    running = {task_id for task_id, task in tasks_status.items() if task['status'] in ('queued', 'running')}
+    incomplete_scans = [scan for scan in list_incomplete_scans('scans') if scan['scan_id'] not in running]
+    return render_template('dashboard.html', tasks=sorted_tasks, scanned_sites=scanned_sites, site_summaries=site_summaries, incomplete_scans=incomplete_scans)
 
 @app.route('/start-scan', methods=['POST'])
 def start_scan_route():
@@ -43,8 +62,45 @@ def start_scan_route():
     if not url: return "Error: URL is required.", 400
     task_id = str(uuid.uuid4())
     tasks_status[task_id] = {'type': 'Sitemap Scan', 'status': 'queued', 'progress': 0, 'url': url, 'message': 'Waiting to start...'}
-    thread = threading.Thread(target=run_full_scan, args=(url, task_id, tasks_status))
-    thread.start()
+    budget = {'max_urls': request.form.get('budget_urls', type=int), 'max_seconds': (request.form.get('budget_minutes', type=float) or 0) * 60 or None}
+    budget = budget if any(budget.values()) else None
+    # Crawl mode ka BFS poore link graph par chalta hai - woh shards mein nahi bant-ta
+    if request.form.get('sharded') and not request.form.get('crawl') and not budget:
+        start_task(task_id, run_sharded_scan, url, task_id, tasks_status, profile=bool(request.form.get('profile')))
+    else:
+        start_task(task_id, run_full_scan, url, task_id, tasks_status, False, bool(request.form.get('crawl')), budget, profile=bool(request.form.get('profile')))
+    return redirect(url_for('dashboard'))
+
+@app.route('/start-portfolio-scan', methods=['POST'])
+def start_portfolio_scan_route():
+    urls = [line.strip() for line in request.form.get('urls', '').splitlines() if line.strip()]
+    if request.form.get('include_competitors'):
+        urls += [c['url'] for c in get_competitor_monitor().competitors]
+    # Ek site ek hi baar (scans/<site>/ folder ke naam se)
+    sites, seen = [], set()
+    for url in urls:
+        if sanitize_url_for_filename(url) not in seen:
+            seen.add(sanitize_url_for_filename(url))
+            sites.append(url)
+    if not sites: return "Error: At least one site URL is required.", 400
+    coordinator_id = str(uuid.uuid4())
+    tasks_status[coordinator_id] = {'type': 'Portfolio Scan', 'status': 'queued', 'progress': 0, 'url': f'{len(sites)} sites', 'message': 'Queueing sites...'}
+    jobs = []
+    for url in sites:
+        task_id = str(uuid.uuid4())
+        tasks_status[task_id] = {'type': 'Sitemap Scan', 'status': 'queued', 'progress': 0, 'url': url, 'message': 'Waiting to start...'}
+        jobs.append((url, task_id))
+    start_task(coordinator_id, run_sharded_scans, jobs, tasks_status, coordinator_id)
+    return redirect(url_for('dashboard'))
+
+@app.route('/resume-scan/<scan_id>', methods=['POST'])
+def resume_scan_route(scan_id):
+    scan = next((s for s in list_incomplete_scans('scans') if s['scan_id'] == scan_id), None)
+    if not scan: return "Error: No interrupted scan found with this ID.", 404
+    if tasks_status.get(scan_id, {}).get('status') in ('queued', 'running'):
+        return redirect(url_for('dashboard'))
+    tasks_status[scan_id] = {'type': 'Sitemap Scan', 'status': 'queued', 'progress': 0, 'url': scan['base_url'], 'message': 'Resuming...'}
+    start_task(scan_id, run_full_scan, scan['base_url'], scan_id, tasks_status, True, profile=bool(request.form.get('profile')))
     return redirect(url_for('dashboard'))
 
 @app.route('/start-scrape', methods=['POST'])
@@ -54,10 +110,48 @@ def start_scrape_route():
     if not article_url or not publisher_name: return "Error: All fields are required.", 400
     task_id = str(uuid.uuid4())
     tasks_status[task_id] = {'type': 'Content Scrape', 'status': 'queued', 'progress': 0, 'url': article_url, 'message': 'Waiting to start...'}
-    thread = threading.Thread(target=run_scrape, args=(article_url, publisher_name, task_id, tasks_status))
-    thread.start()
+    start_task(task_id, run_scrape, article_url, publisher_name, task_id, tasks_status, bool(request.form.get('refresh')), profile=bool(request.form.get('profile')))
     return redirect(url_for('dashboard'))
 
+@app.route('/start-bulk-scrape', methods=['POST'])
+def start_bulk_scrape_route():
+    publisher_name = request.form.get('publisher_name')
+    if not publisher_name: return "Error: Publisher name is required.", 400
+    urls, sources = extract_urls(request.form.get('urls')), []
+    if urls: sources.append('pasted')
+    url_file = request.files.get('url_file')
+    if url_file and url_file.filename:
+        urls += extract_urls(url_file.read().decode('utf-8', errors='ignore'))
+        sources.append(url_file.filename)
+    competitor_url = request.form.get('competitor_url')
+    if competitor_url:
+        competitor = next((c for c in get_competitor_monitor().competitors if c['url'] == competitor_url), None)
+        if competitor:
+            urls += [item['url'] for item in competitor.get('last_scan_data', {}).get('new_content', [])]
+            sources.append(competitor['name'])
+    urls = dedupe_urls(urls)
+    if not urls: return "Error: No URLs found to scrape.", 400
+
+    task_id = str(uuid.uuid4())
+    tasks_status[task_id] = new_bulk_task(urls, publisher_name, ', '.join(sources))
+    start_task(task_id, run_bulk_scrape, task_id, tasks_status, bool(request.form.get('refresh')), profile=bool(request.form.get('profile')))
+    return redirect(url_for('bulk_scrape_details', task_id=task_id))
+
+@app.route('/bulk-scrape/<task_id>')
+def bulk_scrape_details(task_id):
+    task = tasks_status.get(task_id)
+    if not task or task.get('type') != 'Bulk Scrape': return "Bulk scrape task not found.", 404
+    return render_template('bulk_scrape.html', task_id=task_id, task=task)
+
+@app.route('/bulk-scrape/<task_id>/retry', methods=['POST'])
+def retry_bulk_scrape(task_id):
+    task = tasks_status.get(task_id)
+    if not task or task.get('type') != 'Bulk Scrape': return "Bulk scrape task not found.", 404
+    if task['status'] in ('queued', 'running'): return redirect(url_for('bulk_scrape_details', task_id=task_id))
+    if reset_failed_items(task):
+        start_task(task_id, run_bulk_scrape, task_id, tasks_status)
+    return redirect(url_for('bulk_scrape_details', task_id=task_id))
+
 @app.route('/ai-generate', methods=['POST'])
 def ai_generate_content():
     prompt = request.form.get('prompt')
@@ -75,7 +169,7 @@ def ai_generate_content():
     def generate_content():
         try:
             tasks_status[task_id]['progress'] = 50
-            result = ai_generator.generate_content_with_ai(prompt)
+            result = get_ai_generator().generate_content_with_ai(prompt)
             
             if 'error' in result:
                 tasks_status[task_id]['status'] = 'error'
@@ -89,10 +183,8 @@ def ai_generate_content():
             tasks_status[task_id]['status'] = 'error'
             tasks_status[task_id]['message'] = str(e)
     
-    thread = threading.Thread(target=generate_content)
-    thread.start()
-    return redirec
-  t(url_for('dashboard'))
+    start_task(task_id, generate_content)
+    return redirect(url_for('dashboard'))
 
 @app.route('/add-competitor', methods=['POST'])
 def add_competitor():
@@ -104,21 +196,52 @@ def add_competitor():
     if not name or not url:
         return "Error: Name and URL are required.", 400
     
-    competitor_monitor.add_competitor(name, url, keywords)
+    get_competitor_monitor().add_competitor(name, url, keywords)
     return redirect(url_for('competitors'))
 
+@app.route('/category-rules', methods=['GET', 'POST'])
+def category_rules():
+    error = None
+    if request.method == 'POST':
+        rules_text = request.form.get('rules', '')
+        try:
+            save_category_rules(json.loads(rules_text))
+        except ValueError as e:
+            # json.JSONDecodeError bhi ValueError hi hai
+            error = str(e)
+        else:
+            task_id = str(uuid.uuid4())
+            tasks_status[task_id] = {'type': 'Recategorize Scans', 'status': 'queued', 'progress': 0, 'url': 'All stored scans', 'message': 'Waiting to start...'}
+            start_task(task_id, recategorize_all_scans, task_id, tasks_status)
+            return redirect(url_for('dashboard'))
+    else:
+        rules_text = json.dumps(load_category_rules(), indent=2, ensure_ascii=False)
+    return render_template('category_rules.html', rules_text=rules_text, error=error)
+
+@app.route('/api/categorize', methods=['POST'])
+def categorize_api():
+    urls = (request.json or {}).get('urls', [])
+    return jsonify({'categories': dict(zip(urls, get_matcher().categorize_many(urls)))})
+
 @app.route('/competitors')
 def competitors():
+    competitor_monitor = get_competitor_monitor()
     competitor_monitor.load_competitors()
     return render_template('competitors.html', 
                          competitors=competitor_monitor.competitors,
-                         opportunities=competitor_monitor.generate_opportunities_report())
+                         opportunities=competitor_monitor.generate_opportunities_report(),
+                         schedule=competitor_monitor.get_schedule())
 
 @app.route('/start-competitor-monitoring', methods=['POST'])
 def start_monitoring():
-    competitor_monitor.start_monitoring()
+    if not get_competitor_monitor().start_monitoring():
+        return jsonify({'status': 'Monitoring is already running.'})
     return jsonify({'status': 'Monitoring started successfully!'})
 
+@app.route('/api/competitor-schedule')
+def competitor_schedule():
+    return cached_json(get_competitor_monitor().get_schedule())
+
 @app.route('/scan-competitors', methods=['POST'])
 def manual_competitor_scan():
     task_id = str(uuid.uuid4())
@@ -129,9 +252,13 @@ def manual_competitor_scan():
         'message': 'Scanning all competitors...'
     }
     
+    def on_progress(done, total, name):
+        tasks_status[task_id]['progress'] = int(done / total * 100)
+        tasks_status[task_id]['message'] = f'Scanned {done}/{total} competitors (last: {name})'
+    
     def run_scan():
         try:
-            asyncio.run(competitor_monitor.scan_all_competitors())
+            asyncio.run(get_competitor_monitor().scan_all_competitors(progress_callback=on_progress))
             tasks_status[task_id]['status'] = 'complete'
             tasks_status[task_id]['progress'] = 100
             tasks_status[task_id]['message'] = 'Competitor scan completed!'
@@ -139,8 +266,7 @@ def manual_competitor_scan():
             tasks_status[task_id]['status'] = 'error'
             tasks_status[task_id]['message'] = str(e)
     
-    thread = threading.Thread(target=run_scan)
-    thread.start()
+    start_task(task_id, run_scan)
     return redirect(url_for('dashboard'))
 
 @app.route('/add-wordpress-site', methods=['POST'])
@@ -153,18 +279,19 @@ def add_wordpress_site():
     if not all([name, url, username, password]):
         return "Error: All fields are required.", 400
     
-    result = auto_publisher.add_wordpress_site(name, url, username, password)
+    result = get_auto_publisher().add_wordpress_site(name, url, username, password)
     return redirect(url_for('publishing'))
 
 @app.route('/publishing')
 def publishing():
+    auto_publisher = get_auto_publisher()
     auto_publisher.load_sites_config()
-    auto_publisher.load_publishing_queue()
     stats = auto_publisher.get_publishing_stats()
     
     return render_template('publishing.html',
                          sites=auto_publisher.wordpress_sites,
                          queue=auto_publisher.publishing_queue,
+                         archived=auto_publisher.get_recent_archived(10),
                          stats=stats)
 
 @app.route('/auto-generate-and-publish', methods=['POST'])
@@ -199,8 +326,11 @@ def auto_generate_and_publish():
             tasks_status[task_id]['progress'] = 25
             tasks_status[task_id]['message'] = 'Generating AI content...'
             
-            # Generate AI content
-            ai_result = ai_generator.generate_content_with_ai(ai_prompt)
+            # Generate AI content - lambe articles chunks mein condense hote hain (map-reduce)
+            if scraped_task.get('h1'):
+                ai_result = get_ai_generator().rewrite_article(scraped_task['h1'], scraped_content, scraped_task['publisher_name'])
+            else:
+                ai_result = get_ai_generator().generate_content_with_ai(ai_prompt)
             
             if 'error' in ai_result:
                 tasks_status[task_id]['status'] = 'error'
@@ -211,13 +341,13 @@ def auto_generate_and_publish():
             tasks_status[task_id]['message'] = 'Preparing for publishing...'
             
             # Create content for publishing
-            content_data = auto_publisher.create_content_from_scrape(
+            content_data = get_auto_publisher().create_content_from_scrape(
                 {'url': scraped_task['url']}, 
                 ai_result
             )
             
             # Queue for publishing
-            queue_item = auto_publisher.queue_content_for_publishing(
+            queue_item = get_auto_publisher().queue_content_for_publishing(
                 content_data, 
                 target_sites
             )
@@ -231,8 +361,7 @@ def auto_generate_and_publish():
             tasks_status[task_id]['status'] = 'error'
             tasks_status[task_id]['message'] = str(e)
     
-    thread = threading.Thread(target=auto_process)
-    thread.start()
+    start_task(task_id, auto_process)
     return redirect(url_for('dashboard'))
 
 @app.route('/process-publishing-queue', methods=['POST'])
@@ -247,55 +376,203 @@ def process_queue():
     
     def process():
         try:
-            auto_publisher.process_publishing_queue()
+            processed = get_auto_publisher().process_publishing_queue()
             tasks_status[task_id]['status'] = 'complete'
             tasks_status[task_id]['progress'] = 100
-            tasks_status[task_id]['message'] = 'Publishing queue processed!'
+            tasks_status[task_id]['message'] = f'Publishing queue processed! {processed} due item(s) handled.'
         except Exception as e:
             tasks_status[task_id]['status'] = 'error'
             tasks_status[task_id]['message'] = str(e)
     
-    thread = threading.Thread(target=process)
-    thread.start()
+    start_task(task_id, process)
     return redirect(url_for('dashboard'))
 
 @app.route('/api/content-opportunities')
 def get_content_opportunities():
+    opportunities_file = os.path.join('monitoring_data', 'content_opportunities.json')
     try:
-        with open('monitoring_data/content_opportunities.json', 'r', encoding='utf-8') as f:
-            opportunities = json.load(f)
-        return jsonify(opportunities)
+        validators = file_validators(opportunities_file)
     except FileNotFoundError:
         return jsonify([])
+    # File badli na ho to use padhe bina 304
+    response = not_modified(*validators)
+    if response: return response
+    with open(opportunities_file, 'r', encoding='utf-8') as f:
+        opportunities = json.load(f)
+    return cached_json(opportunities, *validators)
+
+@app.route('/api/content-suggestions')
+def get_content_suggestions():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    keywords = [k.strip() for k in query.split(',') if k.strip()]
+    return jsonify(get_competitor_monitor().get_content_suggestions(keywords, limit=request.args.get('limit', 20, type=int)))
 
 @app.route('/scraped-media/<path:filename>')
 def scraped_media(filename):
     base_dir = os.path.abspath(SCRAPED_DATA_DIR)
-    return send_from_directory(base_dir, filename)
+    return send_from_directory(base_dir, filename, max_age=int(Config.MEDIA_CACHE_MAX_AGE.total_seconds()))
+
+@app.route('/scraped-media-thumb/<path:filename>')
+def scraped_media_thumbnail(filename):
+    """Result pages ke liye chhota preview (pehli request par bana kar cache); Pillow na ho to original"""
+    base_dir = os.path.abspath(SCRAPED_DATA_DIR)
+    source_path = safe_join(base_dir, filename)
+    if not source_path or not os.path.isfile(source_path): return "Image not found.", 404
+    thumbnail = ensure_thumbnail(source_path)
+    if not thumbnail:
+        return scraped_media(filename)
+    return send_from_directory(os.path.dirname(thumbnail), os.path.basename(thumbnail), max_age=int(Config.MEDIA_CACHE_MAX_AGE.total_seconds()))
 
 @app.route('/site/<site_name>')
 def site_details(site_name):
-    site_dir = os.path.join('scans', site_name)
+    site_dir = os.path.join('scans', os.path.basename(site_name))
     if not os.path.exists(site_dir): return "Site not found", 404
-    scan_files = sorted([f for f in os.listdir(site_dir) if f.endswith('.json')], reverse=True)
-    latest_scan_data = []
-    if scan_files:
-        with open(os.path.join(site_dir, scan_files[0]), 'r', encoding='utf-8') as f:
-            latest_scan_data = json.load(f)
-    return render_template('site_details.html', site_name=site_name, scan_files=scan_files, data=latest_scan_data)
+    scan_files = list_scan_files(site_dir)
+    return render_template('site_details.html', site_name=site_name, scan_files=scan_files)
+
+@app.route('/api/site/<site_name>/rows')
+def site_rows_api(site_name):
+    site_dir = os.path.join('scans', os.path.basename(site_name))
+    if not os.path.exists(site_dir): return jsonify({'error': 'Site not found'}), 404
+    scan_file = request.args.get('scan') or next(iter(list_scan_files(site_dir)), None)
+    if not scan_file: return jsonify({'total': 0, 'rows': [], 'status_counts': {}, 'category_counts': {}})
+    scan_path = os.path.join(site_dir, os.path.basename(scan_file))
+    if not os.path.isfile(scan_path): return jsonify({'error': 'Scan not found'}), 404
+    validators = file_validators(scan_path)
+    response = not_modified(*validators, extra=request.query_string.decode())
+    if response: return response
+    
+    index = load_scan_index(scan_path)
+    result = query_scan_index(index,
+                              page=request.args.get('page', 1, type=int),
+                              per_page=request.args.get('per_page', 50, type=int),
+                              sort=request.args.get('sort', 'url'),
+                              order=request.args.get('order', 'asc'),
+                              category=request.args.get('category'),
+                              http_status=request.args.get('status'),
+                              issue=request.args.get('issue'),
+                              search=request.args.get('q'))
+    result['scan'] = os.path.basename(scan_path)
+    result['scan_total'] = index['total']
+    result['status_counts'] = index['status_counts']
+    result['category_counts'] = index['category_counts']
+    result['issue_counts'] = index.get('issue_counts', {})
+    return cached_json(result, *validators, extra=request.query_string.decode())
+
+@app.route('/api/site/<site_name>/link-graph')
+def site_link_graph_api(site_name):
+    site_dir = os.path.join('scans', os.path.basename(site_name))
+    if not os.path.exists(site_dir): return jsonify({'error': 'Site not found'}), 404
+    scan_file = request.args.get('scan') or next(iter(list_scan_files(site_dir)), None)
+    report = load_link_graph_report(os.path.join(site_dir, os.path.basename(scan_file))) if scan_file else None
+    if not report: return jsonify({'error': 'No link graph for this scan. Run it in crawl mode.'}), 404
+    return cached_json(report)
     
-@app.route('/api/compare', methods=['POST'])
+@app.route('/api/site/<site_name>/audit')
+def site_audit_api(site_name):
+    site_dir = os.path.join('scans', os.path.basename(site_name))
+    if not os.path.exists(site_dir): return jsonify({'error': 'Site not found'}), 404
+    scan_file = request.args.get('scan') or next(iter(list_scan_files(site_dir)), None)
+    report = load_audit_report(os.path.join(site_dir, os.path.basename(scan_file))) if scan_file else None
+    if not report: return jsonify({'error': 'No SEO audit for this scan. Run a new scan to audit its pages.'}), 404
+    return cached_json(report)
+
+@app.route('/api/compare', methods=['GET', 'POST'])
 def compare_scans_api():
-    data = request.json
-    site_dir = os.path.join('scans', data.get('site_name'))
-    with open(os.path.join(site_dir, data.get('file_a')), 'r') as f1, \
-         open(os.path.join(site_dir, data.get('file_b')), 'r') as f2:
+    """GET (?site_name=&file_a=&file_b=) browser cache ho sakta hai; POST purane clients ke liye"""
+    data = request.args if request.method == 'GET' else request.json
+    site_dir = os.path.join('scans', os.path.basename(data.get('site_name', '')))
+    path_a = os.path.join(site_dir, os.path.basename(data.get('file_a', '')))
+    path_b = os.path.join(site_dir, os.path.basename(data.get('file_b', '')))
+    if not os.path.isfile(path_a) or not os.path.isfile(path_b): return jsonify({'error': 'Scan not found'}), 404
+    # Dono scans wahi hain to diff bhi wahi - files padhe bina 304
+    validators = file_validators(path_a, path_b)
+    response = not_modified(*validators)
+    if response: return response
+    with open(path_a, 'r') as f1, open(path_b, 'r') as f2:
         data_a, data_b = json.load(f1), json.load(f2)
-    return jsonify(compare_scan_data(data_a, data_b))
+    return cached_json(compare_scan_data(data_a, data_b), *validators)
+
+def _export_response(rows, download_name, default_columns):
+    """
+    Generator response - pehla chunk turant jaata hai, poora export kabhi memory mein nahi banta.
+    ?format=csv|jsonl, ?columns=a,b (JSONL mein na diye hon to poori row)
+    """
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS: return jsonify({'error': f"Unknown format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    columns = request.args.get('columns')
+    columns = parse_columns(columns, default_columns) if fmt == 'csv' or columns else None
+    mimetype, extension = EXPORT_FORMATS[fmt]
+    response = Response(stream_rows(rows, fmt, columns), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{download_name}.{extension}"'
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+@app.route('/export/scan/<site_name>')
+def export_scan(site_name):
+    """Scan results CSV/JSONL mein; rows API wale filters (status, category, issue, q) + ?changed=1"""
+    site_dir = os.path.join('scans', os.path.basename(site_name))
+    if not os.path.exists(site_dir): return jsonify({'error': 'Site not found'}), 404
+    scan_file = request.args.get('scan') or next(iter(list_scan_files(site_dir)), None)
+    scan_path = os.path.join(site_dir, os.path.basename(scan_file)) if scan_file else None
+    if not scan_path or not os.path.isfile(scan_path): return jsonify({'error': 'Scan not found'}), 404
+    rows = iter_scan_export(scan_path,
+                            status=request.args.get('status'),
+                            category=request.args.get('category'),
+                            issue=request.args.get('issue'),
+                            search=request.args.get('q'),
+                            changed=request.args.get('changed') == '1')
+    scan_id = os.path.splitext(os.path.basename(scan_path))[0]
+    return _export_response(rows, f"{os.path.basename(site_name)}-{scan_id}", SCAN_EXPORT_COLUMNS)
+
+@app.route('/export/compare/<site_name>')
+def export_compare(site_name):
+    """Do scans ka diff (added/removed/updated) row-by-row; ?change= se ek hi type"""
+    site_dir = os.path.join('scans', os.path.basename(site_name))
+    path_a = os.path.join(site_dir, os.path.basename(request.args.get('file_a', '')))
+    path_b = os.path.join(site_dir, os.path.basename(request.args.get('file_b', '')))
+    if not os.path.isfile(path_a) or not os.path.isfile(path_b): return jsonify({'error': 'Scan not found'}), 404
+    change = request.args.get('change') or None
+    if change and change not in DIFF_CHANGES: return jsonify({'error': f"Unknown change. Use one of: {', '.join(DIFF_CHANGES)}"}), 400
+    rows = iter_scan_diff(path_a, path_b, change=change, search=request.args.get('q'))
+    scan_ids = [os.path.splitext(os.path.basename(path))[0][:8] for path in (path_a, path_b)]
+    return _export_response(rows, f"{os.path.basename(site_name)}-diff-{scan_ids[0]}-{scan_ids[1]}", DIFF_COLUMNS)
+
+@app.route('/export/opportunities')
+def export_opportunities():
+    opportunities_file = os.path.join('monitoring_data', 'content_opportunities.json')
+    if not os.path.isfile(opportunities_file): return jsonify({'error': 'No content opportunities yet'}), 404
+    rows = iter_opportunities(opportunities_file, competitor=request.args.get('competitor'), search=request.args.get('q'))
+    return _export_response(rows, 'content-opportunities', OPPORTUNITY_COLUMNS)
+
+@app.route('/metrics')
+def metrics():
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/startup-report')
+def startup_report():
+    """Import + lazy component init timings; ?importtime=1 par naye process mein `-X importtime` breakdown bhi"""
+    report = {'timings_ms': startup_timings()}
+    if request.args.get('importtime'):
+        report['importtime'] = importtime_breakdown('app', top=request.args.get('top', 25, type=int))
+    return jsonify(report)
 
 @app.route('/task-status/<task_id>')
 def get_task_status(task_id):
-    return jsonify(tasks_status.get(task_id, {'status': 'not_found'}))
+    task = tasks_status.get(task_id, {'status': 'not_found'})
+    if 'items' in task and not request.args.get('items'):
+        # Dashboard polling ke liye bulk task ke per-URL items nahi bhejte
+        task = {k: v for k, v in task.items() if k != 'items'}
+    # Polling: status na badla ho to 304 (ETag body ke hash se)
+    return cached_json(task)
+
+@app.route('/task-profile/<task_id>')
+def get_task_profile(task_id):
+    profile_file = tasks_status.get(task_id, {}).get('profile_file')
+    if not profile_file or not os.path.exists(profile_file): return "Profile not found.", 404
+    return send_from_directory(os.path.abspath(os.path.dirname(profile_file)), os.path.basename(profile_file), as_attachment=True)
 
 @app.route('/results/<task_id>')
 def view_results(task_id):
@@ -305,29 +582,47 @@ def view_results(task_id):
     if result_info['type'] == 'Sitemap Scan':
         return redirect(url_for('site_details', site_name=sanitize_url_for_filename(result_info['url'])))
     
+    elif result_info['type'] == 'Bulk Scrape':
+        return redirect(url_for('bulk_scrape_details', task_id=task_id))
+
+    elif result_info['type'] == 'Portfolio Scan':
+        # Har site ka apna Sitemap Scan task hai
+        return redirect(url_for('dashboard'))
+
     elif result_info['type'] == 'Content Scrape':
-        try:
-            with open(result_info['scraped_file'], 'r', encoding='utf-8') as f: scraped_content = f.read()
-            with open(result_info['prompt_file'], 'r', encoding='utf-8') as f: ai_prompt = f.read()
-            
-            image_folder_abs_path = result_info.get('image_folder')
-            web_image_paths = []
-            if image_folder_abs_path and os.path.exists(image_folder_abs_path):
-                base_dir_abs_path = os.path.abspath(SCRAPED_DATA_DIR)
-                relative_folder_path = os.path.relpath(image_folder_abs_path, base_dir_abs_path)
-                for img_name in sorted(os.listdir(image_folder_abs_path)):
-                    final_web_path = os.path.join(relative_folder_path, img_name).replace('\\', '/')
-                    web_image_paths.append(final_web_path)
-
-            return render_template('scraper_results.html',
-                                   scraped_content=scraped_content, ai_prompt=ai_prompt,
-                                   web_image_paths=web_image_paths, url=result_info['url'])
-        except Exception as e:
-            print(f"ERROR reading result files for task {task_id}: {e}")
-            return f"Could not read result files: {e}", 500
+        return _render_scrape_result(task_id, result_info)
     
     return "Unknown result type", 400
 
+@app.route('/results/<task_id>/item/<int:index>')
+def view_bulk_item_result(task_id, index):
+    task = tasks_status.get(task_id)
+    if not task or task.get('type') != 'Bulk Scrape' or not 0 <= index < len(task['items']): return "Item not found.", 404
+    item = task['items'][index]
+    if item['status'] != 'complete': return "Item not scraped yet.", 404
+    return _render_scrape_result(task_id, item)
+
+def _render_scrape_result(task_id, result_info):
+    try:
+        with open(result_info['scraped_file'], 'r', encoding='utf-8') as f: scraped_content = f.read()
+        with open(result_info['prompt_file'], 'r', encoding='utf-8') as f: ai_prompt = f.read()
+        
+        image_folder_abs_path = result_info.get('image_folder')
+        web_image_paths = []
+        if image_folder_abs_path and os.path.exists(image_folder_abs_path):
+            base_dir_abs_path = os.path.abspath(SCRAPED_DATA_DIR)
+            relative_folder_path = os.path.relpath(image_folder_abs_path, base_dir_abs_path)
+            for img_name in sorted(os.listdir(image_folder_abs_path)):
+                final_web_path = os.path.join(relative_folder_path, img_name).replace('\\', '/')
+                web_image_paths.append(final_web_path)
+
+        return render_template('scraper_results.html',
+                               scraped_content=scraped_content, ai_prompt=ai_prompt,
+                               web_image_paths=web_image_paths, url=result_info['url'])
+    except Exception as e:
+        print(f"ERROR reading result files for task {task_id}: {e}")
+        return f"Could not read result files: {e}", 500
+
 if __name__ == '__main__':
     os.makedirs('scans', exist_ok=True)
     os.makedirs(SCRAPED_DATA_DIR, exist_ok=True)
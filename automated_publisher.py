@@ -2,17 +2,33 @@
 
 import os
 import json
+import heapq
+import threading
+import time
+import uuid
 import requests
+from collections import deque
 from datetime import datetime
-from wordpress_xmlrpc import Client, WordPressPost
-from wordpress_xmlrpc.methods.posts import NewPost, GetPosts
-from wordpress_xmlrpc.methods.media import UploadFile
 import base64
+from config import Config
+from journal_store import JournalStore, atomic_write_json
+from metrics import PUBLISH_SECONDS
+
+QUEUE_FILE = 'publishing_data/publishing_queue.json'
+ARCHIVE_FILE = 'publishing_data/publishing_archive.jsonl'
+ARCHIVE_STATS_FILE = 'publishing_data/archive_stats.json'
 
 class AutomatedPublisher:
     def __init__(self):
         self.wordpress_sites = []
         self.publishing_queue = []
+        self._queue_store = JournalStore(QUEUE_FILE, 'id')
+        self.archive_stats = {'completed': 0}
+        # Min-heap of (due_timestamp, item_id) - sirf pending items yahan aate hain
+        self._due_heap = []
+        self._queue_lock = threading.RLock()
+        self._scheduler_wakeup = threading.Condition(self._queue_lock)
+        self._scheduler_thread = None
         
     def add_wordpress_site(self, name, url, username, password):
         """WordPress site add karta hai"""
@@ -26,6 +42,9 @@ class AutomatedPublisher:
         }
         
         # Test connection
+        # wordpress_xmlrpc sirf WordPress se baat karte waqt import hota hai
+        from wordpress_xmlrpc import Client
+        from wordpress_xmlrpc.methods.posts import GetPosts
         try:
             client = Client(site_config['xmlrpc_url'], username, password)
             # Test with a simple call
@@ -42,9 +61,7 @@ class AutomatedPublisher:
     
     def save_sites_config(self):
         """Sites configuration save karta hai"""
-        os.makedirs('publishing_data', exist_ok=True)
-        with open('publishing_data/wordpress_sites.json', 'w', encoding='utf-8') as f:
-            json.dump(self.wordpress_sites, f, indent=2, ensure_ascii=False)
+        atomic_write_json('publishing_data/wordpress_sites.json', self.wordpress_sites, indent=2, ensure_ascii=False)
     
     def load_sites_config(self):
         """Saved sites configuration load karta hai"""
@@ -57,7 +74,7 @@ class AutomatedPublisher:
     def queue_content_for_publishing(self, content_data, site_names=None, schedule_time=None):
         """Content ko publishing queue mein add karta hai"""
         queue_item = {
-            'id': f"pub_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+            'id': f"pub_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}",
             'content': content_data,
             'target_sites': site_names or [site['name'] for site in self.wordpress_sites],
             'schedule_time': schedule_time,
@@ -67,23 +84,93 @@ class AutomatedPublisher:
             'results': {}
         }
         
-        self.publishing_queue.append(queue_item)
-        self.save_publishing_queue()
+        with self._queue_lock:
+            self.publishing_queue.append(queue_item)
+            self._queue_store.put(queue_item)
+            self._push_due(queue_item)
         return queue_item
     
     def save_publishing_queue(self):
-        """Publishing queue save karta hai"""
-        os.makedirs('publishing_data', exist_ok=True)
-        with open('publishing_data/publishing_queue.json', 'w', encoding='utf-8') as f:
-            json.dump(self.publishing_queue, f, indent=2, ensure_ascii=False)
+        """Poori publishing queue ka snapshot save karta hai"""
+        with self._queue_lock:
+            self._queue_store.replace_all(self.publishing_queue)
     
     def load_publishing_queue(self):
         """Publishing queue load karta hai"""
+        with self._queue_lock:
+            self.publishing_queue = self._queue_store.load()
+            try:
+                with open(ARCHIVE_STATS_FILE, 'r', encoding='utf-8') as f:
+                    self.archive_stats = json.load(f)
+            except FileNotFoundError:
+                self.archive_stats = {'completed': 0}
+            
+            # Purane files mein completed items hot queue mein pade hain - unhe archive mein move karein
+            finished = [q for q in self.publishing_queue if q['status'] == 'completed']
+            if finished:
+                self._archive_items(finished)
+                self.publishing_queue = [q for q in self.publishing_queue if q['status'] != 'completed']
+                for queue_item in finished:
+                    self._queue_store.delete(queue_item['id'])
+            
+            # Crash ke time 'processing' reh gaye items dobara queue mein daalein
+            for queue_item in self.publishing_queue:
+                if queue_item['status'] == 'processing':
+                    queue_item['status'] = 'queued'
+                    self._queue_store.put(queue_item)
+            self._rebuild_due_heap()
+    
+    def _item_due_timestamp(self, queue_item):
+        """Item kab publish hona chahiye - retry time, schedule time ya turant"""
+        due = queue_item.get('next_attempt_at') or queue_item.get('schedule_time')
+        if not due:
+            return 0.0
+        try:
+            return datetime.fromisoformat(due).timestamp()
+        except ValueError:
+            return 0.0
+    
+    def _push_due(self, queue_item):
+        if queue_item['status'] != 'queued':
+            return
+        heapq.heappush(self._due_heap, (self._item_due_timestamp(queue_item), queue_item['id']))
+        self._scheduler_wakeup.notify_all()
+    
+    def _rebuild_due_heap(self):
+        self._due_heap = [(self._item_due_timestamp(q), q['id']) for q in self.publishing_queue if q['status'] == 'queued']
+        heapq.heapify(self._due_heap)
+        self._scheduler_wakeup.notify_all()
+    
+    def _pop_due_items(self, now):
+        """Heap se sirf woh pending items nikalta hai jinka time ho gaya hai"""
+        items_by_id = {q['id']: q for q in self.publishing_queue}
+        due_items = []
+        while self._due_heap and self._due_heap[0][0] <= now:
+            due_ts, item_id = heapq.heappop(self._due_heap)
+            queue_item = items_by_id.get(item_id)
+            # Stale entries (item hat gaya ya reschedule ho gaya) skip karein
+            if not queue_item or queue_item['status'] != 'queued' or self._item_due_timestamp(queue_item) != due_ts:
+                continue
+            queue_item['status'] = 'processing'
+            due_items.append(queue_item)
+        return due_items
+    
+    def _archive_items(self, items):
+        """Completed items ko append-only archive file mein likhta hai"""
+        os.makedirs('publishing_data', exist_ok=True)
+        with open(ARCHIVE_FILE, 'a', encoding='utf-8') as f:
+            for queue_item in items:
+                f.write(json.dumps(queue_item, ensure_ascii=False) + '\n')
+        self.archive_stats['completed'] = self.archive_stats.get('completed', 0) + len(items)
+        atomic_write_json(ARCHIVE_STATS_FILE, self.archive_stats)
+    
+    def get_recent_archived(self, limit=10):
+        """Archive se last kuch published items return karta hai"""
         try:
-            with open('publishing_data/publishing_queue.json', 'r', encoding='utf-8') as f:
-                self.publishing_queue = json.load(f)
+            with open(ARCHIVE_FILE, 'r', encoding='utf-8') as f:
+                return [json.loads(line) for line in deque(f, maxlen=limit) if line.strip()]
         except FileNotFoundError:
-            self.publishing_queue = []
+            return []
     
     def publish_content(self, content_data, site_name):
         """Single site par content publish karta hai"""
@@ -91,6 +178,9 @@ class AutomatedPublisher:
         if not site:
             return {'error': f'Site {site_name} not found'}
         
+        from wordpress_xmlrpc import Client, WordPressPost
+        from wordpress_xmlrpc.methods.posts import NewPost
+        started = time.perf_counter()
         try:
             client = Client(site['xmlrpc_url'], site['username'], site['password'])
             
@@ -115,23 +205,30 @@ class AutomatedPublisher:
             
             # Publish post
             post_id = client.call(NewPost(post))
+            duration = time.perf_counter() - started
+            PUBLISH_SECONDS.observe(duration, site=site_name, outcome='ok')
             
             return {
                 'success': True,
                 'post_id': post_id,
                 'site': site_name,
-                'published_at': datetime.now().isoformat()
+                'published_at': datetime.now().isoformat(),
+                'duration_ms': round(duration * 1000, 1)
             }
             
         except Exception as e:
+            duration = time.perf_counter() - started
+            PUBLISH_SECONDS.observe(duration, site=site_name, outcome='error')
             return {
                 'success': False,
                 'error': str(e),
-                'site': site_name
+                'site': site_name,
+                'duration_ms': round(duration * 1000, 1)
             }
     
     def upload_media(self, client, file_path):
         """WordPress mein media upload karta hai"""
+        from wordpress_xmlrpc.methods.media import UploadFile
         try:
             with open(file_path, 'rb') as f:
                 file_data = f.read()
@@ -151,38 +248,78 @@ class AutomatedPublisher:
             print(f"Media upload failed: {e}")
             return None
     
-    def process_publishing_queue(self):
-        """Publishing queue ko process karta hai"""
-        self.load_publishing_queue()
+    def _process_queue_item(self, queue_item):
+        """Ek item ko sabhi target sites par publish karta hai, fail hone par backoff ke saath retry schedule karta hai"""
+        queue_item['attempts'] += 1
         
-        for queue_item in self.publishing_queue:
-            if queue_item['status'] != 'queued':
+        # Publish to all target sites (pichle attempt mein successful sites dobara nahi)
+        for site_name in queue_item['target_sites']:
+            if queue_item['results'].get(site_name, {}).get('success'):
                 continue
-            
-            # Check if scheduled time has passed
-            if queue_item.get('schedule_time'):
-                schedule_time = datetime.fromisoformat(queue_item['schedule_time'])
-                if datetime.now() < schedule_time:
-                    continue
-            
-            queue_item['status'] = 'processing'
-            queue_item['attempts'] += 1
-            
-            # Publish to all target sites
-            for site_name in queue_item['target_sites']:
-                result = self.publish_content(queue_item['content'], site_name)
-                queue_item['results'][site_name] = result
-            
-            # Update status
-            successful_publishes = sum(1 for r in queue_item['results'].values() if r.get('success'))
-            if successful_publishes > 0:
-                queue_item['status'] = 'completed'
-            else:
-                queue_item['status'] = 'failed'
-            
-            queue_item['processed_at'] = datetime.now().isoformat()
+            result = self.publish_content(queue_item['content'], site_name)
+            queue_item['results'][site_name] = result
+        
+        queue_item['processed_at'] = datetime.now().isoformat()
+        successful_publishes = sum(1 for r in queue_item['results'].values() if r.get('success'))
+        if successful_publishes > 0:
+            queue_item['status'] = 'completed'
+            queue_item.pop('next_attempt_at', None)
+        elif queue_item['attempts'] < Config.PUBLISH_MAX_ATTEMPTS:
+            backoff = Config.PUBLISH_RETRY_BACKOFF * (2 ** (queue_item['attempts'] - 1))
+            queue_item['status'] = 'queued'
+            queue_item['next_attempt_at'] = (datetime.now() + backoff).isoformat()
+        else:
+            queue_item['status'] = 'failed'
+            queue_item.pop('next_attempt_at', None)
+    
+    def _finish_items(self, items):
+        """Processed items ka state save karta hai aur completed items ko hot queue se hatata hai"""
+        with self._queue_lock:
+            completed = [q for q in items if q['status'] == 'completed']
+            if completed:
+                self._archive_items(completed)
+                completed_ids = {q['id'] for q in completed}
+                self.publishing_queue = [q for q in self.publishing_queue if q['id'] not in completed_ids]
+            for queue_item in items:
+                if queue_item['status'] == 'completed':
+                    self._queue_store.delete(queue_item['id'])
+                else:
+                    self._queue_store.put(queue_item)
+                    self._push_due(queue_item)
+    
+    def process_publishing_queue(self):
+        """Publishing queue ke sirf due items ko process karta hai"""
+        with self._queue_lock:
+            due_items = self._pop_due_items(time.time())
+        
+        for queue_item in due_items:
+            self._process_queue_item(queue_item)
         
-        self.save_publishing_queue()
+        if due_items:
+            self._finish_items(due_items)
+        return len(due_items)
+    
+    def start_scheduler(self):
+        """Background scheduler start karta hai jo agle due item ke time par hi jaagta hai"""
+        with self._queue_lock:
+            if self._scheduler_thread and self._scheduler_thread.is_alive():
+                return
+            self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
+            self._scheduler_thread.start()
+    
+    def _run_scheduler(self):
+        while True:
+            with self._queue_lock:
+                while True:
+                    now = time.time()
+                    if self._due_heap and self._due_heap[0][0] <= now:
+                        break
+                    timeout = self._due_heap[0][0] - now if self._due_heap else None
+                    self._scheduler_wakeup.wait(timeout)
+            try:
+                self.process_publishing_queue()
+            except Exception as e:
+                print(f"Publishing scheduler error: {e}")
     
     def create_content_from_scrape(self, scraped_data, ai_generated_content):
         """Scraped data aur AI content se WordPress ready content banata hai"""
@@ -201,16 +338,16 @@ class AutomatedPublisher:
     
     def get_publishing_stats(self):
         """Publishing statistics return karta hai"""
-        self.load_publishing_queue()
-        
-        total_queued = len([q for q in self.publishing_queue if q['status'] == 'queued'])
-        total_completed = len([q for q in self.publishing_queue if q['status'] == 'completed'])
-        total_failed = len([q for q in self.publishing_queue if q['status'] == 'failed'])
+        with self._queue_lock:
+            total_queued = len([q for q in self.publishing_queue if q['status'] in ('queued', 'processing')])
+            total_failed = len([q for q in self.publishing_queue if q['status'] == 'failed'])
+            total_completed = self.archive_stats.get('completed', 0)
+            total_items = len(self.publishing_queue) + total_completed
         
         return {
-            'total_items': len(self.publishing_queue),
+            'total_items': total_items,
             'queued': total_queued,
             'completed': total_completed,
             'failed': total_failed,
-            'success_rate': (total_completed / len(self.publishing_queue) * 100) if self.publishing_queue else 0
-        }
\ No newline at end of file
+            'success_rate': (total_completed / total_items * 100) if total_items else 0
+        }
@@ -0,0 +1,346 @@
+# benchmark.py - Local mock-site benchmarks for scan, compare, scrape and publish throughput
+#
+# Usage:
+#   python benchmark.py --urls 2000 --sitemaps 8 --latency-ms 20 --error-rate 0.02 --gzip --output bench.json
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from aiohttp import web
+from bs4 import BeautifulSoup
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# --- Mock WordPress-like site ---
+
+class MockSite:
+    """
+    Local HTTP server jo synthetic WordPress jaisi site banata hai:
+    robots.txt -> nested sitemap index -> child sitemaps -> post pages,
+    configurable latency, error rate aur gzip ke saath.
+    """
+    def __init__(self, url_count=1000, sitemaps=5, nested=True, latency_ms=0, error_rate=0.0, gzip=False, seed=42, media_ratio=0.0):
+        self.url_count = url_count
+        self.media_ratio = media_ratio
+        self.sitemaps = max(1, sitemaps)
+        self.nested = nested
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.gzip = gzip
+        self.seed = seed
+        self.base_url = None
+        self._loop = None
+        self._runner = None
+        self._thread = None
+        self._started = threading.Event()
+
+    def _page_slug(self, i):
+        words = ['sarkari', 'result', 'bihar', 'police', 'bharti', 'yojana', 'admit', 'card', 'exam', 'date']
+        rng = random.Random(self.seed + i)
+        return f"{'-'.join(rng.sample(words, 3))}-{i}"
+
+    def _is_media(self, i):
+        return random.Random(self.seed * 17 + i).random() < self.media_ratio
+
+    def _page_url(self, i):
+        if self._is_media(i):
+            extension = 'pdf' if i % 2 else 'jpg'
+            return f"{self.base_url}/wp-content/uploads/file-{i}.{extension}"
+        section = 'web-stories' if i % 7 == 0 else 'blog'
+        return f"{self.base_url}/{section}/{self._page_slug(i)}/"
+
+    def _lastmod(self, i):
+        return (datetime(2025, 1, 1) + timedelta(hours=i)).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+    async def _respond(self, request, body, content_type='text/html'):
+        if self.latency_ms:
+            # Thoda jitter taaki p99 realistic rahe
+            await asyncio.sleep(random.expovariate(1 / self.latency_ms) / 1000)
+        response = web.Response(text=body, content_type=content_type)
+        if self.gzip:
+            response.enable_compression()
+        return response
+
+    async def robots(self, request):
+        return await self._respond(request, f"User-agent: *\nSitemap: {self.base_url}/sitemap_index.xml\n", 'text/plain')
+
+    async def sitemap_index(self, request):
+        children = ''.join(f"<sitemap><loc>{self.base_url}/sitemap-{n}.xml</loc></sitemap>" for n in range(self.sitemaps))
+        if self.nested:
+            # Ek extra level: index ke andar doosra index
+            children = f"<sitemap><loc>{self.base_url}/sitemap_index_nested.xml</loc></sitemap>"
+        body = f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{children}</sitemapindex>'
+        return await self._respond(request, body, 'application/xml')
+
+    async def sitemap_index_nested(self, request):
+        children = ''.join(f"<sitemap><loc>{self.base_url}/sitemap-{n}.xml</loc></sitemap>" for n in range(self.sitemaps))
+        body = f'<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{children}</sitemapindex>'
+        return await self._respond(request, body, 'application/xml')
+
+    async def sitemap(self, request):
+        n = int(request.match_info['n'])
+        urls = ''.join(f"<url><loc>{self._page_url(i)}</loc><lastmod>{self._lastmod(i)}</lastmod></url>"
+                       for i in range(n, self.url_count, self.sitemaps))
+        body = f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+        return await self._respond(request, body, 'application/xml')
+
+    async def page(self, request):
+        slug = request.match_info['slug']
+        if not slug.rsplit('-', 1)[-1].isdigit():
+            return web.Response(status=404, text='not found')
+        i = int(slug.rsplit('-', 1)[-1])
+        rng = random.Random(self.seed * 31 + i)
+        if rng.random() < self.error_rate:
+            return web.Response(status=rng.choice([404, 500, 503]), text='error')
+        return await self._respond(request, render_post_html(slug, i, self.base_url, self._related(i)))
+
+    def _related(self, i):
+        """Agle do posts ke links; har 50va post kahin se link nahi hota (orphan) aur har 100va ek toota link deta hai"""
+        related = [self._page_url(j) for j in (i + 1, i + 2) if j < self.url_count and j % 50 and not self._is_media(j)]
+        if i % 100 == 99:
+            related.append(f"{self.base_url}/blog/deleted-post/")
+        return related
+
+    async def home(self, request):
+        links = ''.join(f'<a href="{self._page_url(i)}">Post</a>' for i in range(1, min(self.url_count, 20)) if i % 50 and not self._is_media(i))
+        return await self._respond(request, f"<html><head><title>Home</title></head><body>{links}</body></html>")
+
+    async def media(self, request):
+        name = request.match_info['name']
+        content_type = 'application/pdf' if name.endswith('.pdf') else 'image/jpeg'
+        # ~256 KB ki file - HEAD-first checks ka bandwidth fark dikhane ke liye
+        return web.Response(body=b'\0' * 256 * 1024, content_type=content_type)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        self._started.wait(10)
+        return self
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_get('/', self.home)
+        app.router.add_get('/robots.txt', self.robots)
+        app.router.add_get('/sitemap_index.xml', self.sitemap_index)
+        app.router.add_get('/sitemap_index_nested.xml', self.sitemap_index_nested)
+        app.router.add_get('/sitemap-{n}.xml', self.sitemap)
+        app.router.add_get('/{section}/{slug}/', self.page)
+        app.router.add_get('/wp-content/uploads/{name}', self.media)
+        self._runner = web.AppRunner(app, access_log=None)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        self._started.set()
+        self._loop.run_forever()
+
+    def stop(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(10)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+def render_post_html(slug, i, base_url, related=()):
+    title = slug.replace('-', ' ').title()
+    paragraphs = ''.join(f"<p>Paragraph {n} for {title}. Yahan important jankari di gayi hai, jaise last date, fees aur apply process.</p>" for n in range(12))
+    headings = ''.join(f"<h2>Section {n}</h2><p>Details for section {n}.</p>" for n in range(4))
+    images = ''.join(f'<img src="/wp-content/uploads/{i}-{n}.jpg" alt="{title} {n}">' for n in range(3))
+    related_links = ''.join(f'<a href="{url}">Related</a>' for url in related)
+    return (f"<!doctype html><html><head><title>{title}</title>"
+            f'<meta name="description" content="{title} - poori jankari yahan padhein"></head>'
+            f'<body><nav><a href="{base_url}/">Home</a></nav><article><h1>{title}</h1>{paragraphs}{headings}{images}'
+            f"<ul><li>Point one</li><li>Point two</li></ul></article>"
+            f"<aside>{related_links}</aside><footer>Footer</footer></body></html>")
+
+# --- Selenium-free stand-ins for the scraper benchmark ---
+
+class SoupElement:
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def text(self):
+        return self._tag.get_text(' ', strip=True)
+
+    def is_displayed(self):
+        return True
+
+    def get_attribute(self, name):
+        return self._tag.get(name)
+
+class SoupDriver:
+    """extract_markdown ke liye minimal driver jo Chrome ki jagah BeautifulSoup use karta hai"""
+    def __init__(self, html):
+        self.page_source = html
+        self._soup = BeautifulSoup(html, 'lxml')
+        self.title = self._soup.title.string if self._soup.title else ''
+
+    def find_element(self, by, value):
+        tag = self._soup.find(value)
+        if tag is None:
+            raise LookupError(value)
+        return SoupElement(tag)
+
+    def find_elements(self, by, value):
+        return [SoupElement(tag) for tag in self._soup.find_all(value)]
+
+# --- Measurements ---
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux KB deta hai, macOS bytes
+    return round(usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024, 1)
+
+def latency_stats(values_ms):
+    values = sorted(values_ms)
+    if not values:
+        return {'p50_ms': None, 'p99_ms': None}
+    pick = lambda pct: values[min(len(values) - 1, int(pct / 100 * len(values)))]
+    return {'p50_ms': round(pick(50), 2), 'p99_ms': round(pick(99), 2)}
+
+def bench_scan(site, crawl=False):
+    import analyzer_logic
+    status = {}
+    scan_id = 'bench-scan'
+    status[scan_id] = {'status': 'queued', 'progress': 0}
+    started = time.perf_counter()
+    analyzer_logic.run_full_scan(site.base_url, scan_id, status, crawl=crawl)
+    elapsed = time.perf_counter() - started
+    if status[scan_id]['status'] != 'complete':
+        return {'error': status[scan_id].get('message')}
+    with open(status[scan_id]['file'], 'r', encoding='utf-8') as f:
+        results = json.load(f)
+    return {
+        'urls': len(results),
+        'seconds': round(elapsed, 3),
+        'urls_per_sec': round(len(results) / elapsed, 1),
+        'errors': sum(1 for r in results if r.get('http_status') != 200),
+        'bytes_read': sum(r.get('bytes_read') or 0 for r in results),
+        'head_checks': sum(1 for r in results if r.get('check_method') == 'HEAD'),
+        **latency_stats([r['response_time_ms'] for r in results if r.get('response_time_ms') is not None]),
+        'link_graph': status[scan_id].get('timings', {}).get('link_graph'),
+        'scan_results': results,
+    }
+
+def bench_compare(scan_results, rounds=5):
+    from analyzer_logic import compare_scan_data
+    rng = random.Random(7)
+    old_data = scan_results
+    new_data = [dict(item) for item in scan_results[len(scan_results) // 20:]]
+    for item in rng.sample(new_data, len(new_data) // 10):
+        item['content_hash'] = 'changed'
+    new_data += [{'url': f"{item['url']}new/", 'http_status': 200} for item in scan_results[:len(scan_results) // 20]]
+
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        compare_scan_data(old_data, new_data)
+        timings.append((time.perf_counter() - started) * 1000)
+    rows = len(old_data) + len(new_data)
+    return {'rows': rows, 'rounds': rounds, 'rows_per_sec': round(rows / (sum(timings) / 1000 / rounds), 1), **latency_stats(timings)}
+
+def bench_scrape_markdown(site, pages=200):
+    from scraper_logic import extract_markdown
+    timings = []
+    for i in range(pages):
+        html = render_post_html(f"sarkari-result-{i}", i, site.base_url)
+        started = time.perf_counter()
+        extract_markdown(SoupDriver(html), f"{site.base_url}/blog/sarkari-result-{i}/")
+        timings.append((time.perf_counter() - started) * 1000)
+    return {'pages': pages, 'pages_per_sec': round(pages / (sum(timings) / 1000), 1), **latency_stats(timings)}
+
+def bench_publish(items=500, publish_latency_ms=2, sites=2):
+    from automated_publisher import AutomatedPublisher
+    publisher = AutomatedPublisher()
+    publisher.load_publishing_queue()
+
+    def stub_publish(content_data, site_name):
+        time.sleep(publish_latency_ms / 1000)
+        return {'success': True, 'post_id': 1, 'site': site_name, 'published_at': datetime.now().isoformat()}
+    publisher.publish_content = stub_publish
+
+    site_names = [f"site-{n}" for n in range(sites)]
+    started = time.perf_counter()
+    for n in range(items):
+        publisher.queue_content_for_publishing({'title': f"Post {n}", 'content': '<p>Body</p>'}, site_names)
+    enqueue_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    processed = publisher.process_publishing_queue()
+    elapsed = time.perf_counter() - started
+    return {
+        'items': processed,
+        'enqueue_seconds': round(enqueue_seconds, 3),
+        'process_seconds': round(elapsed, 3),
+        'items_per_sec': round(processed / elapsed, 1) if elapsed else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='SEO dashboard throughput benchmarks against a local mock site.')
+    parser.add_argument('--urls', type=int, default=1000, help='URLs in the synthetic sitemap')
+    parser.add_argument('--sitemaps', type=int, default=5, help='Child sitemaps in the sitemap index')
+    parser.add_argument('--flat', action='store_true', help='Single-level sitemap index instead of nested')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Mean injected response latency')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of pages returning 4xx/5xx')
+    parser.add_argument('--gzip', action='store_true', help='Serve gzip-compressed responses')
+    parser.add_argument('--crawl', action='store_true', help='Scan in link-graph crawl mode')
+    parser.add_argument('--media-ratio', type=float, default=0.0, help='Fraction of sitemap entries that are PDFs/images')
+    parser.add_argument('--publish-items', type=int, default=300)
+    parser.add_argument('--only', default='scan,compare,scrape,publish', help='Comma separated subset of benchmarks')
+    parser.add_argument('--output', help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args()
+
+    selected = set(args.only.split(','))
+    output_path = os.path.abspath(args.output) if args.output else None
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    sys.path.insert(0, repo_dir)
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'config': vars(args),
+        'results': {},
+    }
+    site = MockSite(args.urls, args.sitemaps, not args.flat, args.latency_ms, args.error_rate, args.gzip, media_ratio=args.media_ratio).start()
+    # Saari relative data directories (scans/, publishing_data/) temp dir mein banti hain
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            scan_results = []
+            if 'scan' in selected or 'compare' in selected:
+                scan = bench_scan(site, args.crawl)
+                scan_results = scan.pop('scan_results', [])
+                if 'scan' in selected:
+                    report['results']['scan'] = scan
+            if 'compare' in selected and scan_results:
+                report['results']['compare'] = bench_compare(scan_results)
+            if 'scrape' in selected:
+                report['results']['scrape_markdown'] = bench_scrape_markdown(site)
+            if 'publish' in selected:
+                report['results']['publish_queue'] = bench_publish(args.publish_items)
+        finally:
+            os.chdir(repo_dir)
+            site.stop()
+    report['peak_rss_mb'] = peak_rss_mb()
+
+    payload = json.dumps(report, indent=2)
+    if output_path:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+    print(payload)
+
+if __name__ == '__main__':
+    main()
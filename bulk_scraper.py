@@ -0,0 +1,130 @@
+# bulk_scraper.py
+
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from config import Config
+from scraper_logic import run_scrape, create_driver
+from scrape_cache import normalize_article_url
+
+URL_PATTERN = re.compile(r'https?://[^\s"\'<>,]+')
+
+class DomainRateLimiter:
+    """Har domain par requests ke beech kam se kam `min_interval` seconds - alag domains parallel chalte hain"""
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(domain, 0))
+            self._next_slot[domain] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def extract_urls(text):
+    """Pasted text ya uploaded file (txt/csv) se http(s) URLs"""
+    return [url.rstrip('.;)') for url in URL_PATTERN.findall(text or '')]
+
+def dedupe_urls(urls, limit=None):
+    seen, unique = set(), []
+    for url in urls:
+        key = normalize_article_url(url)
+        if key not in seen:
+            seen.add(key)
+            unique.append(url)
+    return unique[:limit or Config.BULK_SCRAPE_MAX_URLS]
+
+def new_bulk_task(urls, publisher_name, source):
+    return {
+        'type': 'Bulk Scrape', 'status': 'queued', 'progress': 0, 'url': f"{len(urls)} URLs ({source})",
+        'message': 'Waiting to start...', 'publisher_name': publisher_name,
+        'items': [{'url': url, 'status': 'queued', 'progress': 0, 'message': 'Waiting...'} for url in urls]
+    }
+
+def _update_counts(task):
+    items = task['items']
+    done = sum(1 for item in items if item['status'] in ('complete', 'error'))
+    failed = sum(1 for item in items if item['status'] == 'error')
+    cached = sum(1 for item in items if item.get('cache_hit'))
+    task['progress'] = int(done / len(items) * 100) if items else 100
+    task['message'] = f"{done}/{len(items)} scraped ({cached} from cache, {failed} failed)"
+    task['failed_count'] = failed
+    return done, failed
+
+def run_bulk_scrape(task_id, status_dict, force_refresh=False):
+    """
+    Task ke 'queued' items ko bounded thread pool mein scrape karta hai.
+    Retry ke liye sirf failed items ko dobara 'queued' karke yahi function chalta hai.
+    """
+    task = status_dict[task_id]
+    task['status'] = 'running'
+    pending = [index for index, item in enumerate(task['items']) if item['status'] == 'queued']
+    limiter = DomainRateLimiter(Config.BULK_SCRAPE_DOMAIN_INTERVAL)
+    local = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+
+    def get_driver():
+        if getattr(local, 'driver', None) is None:
+            local.driver = create_driver()
+            with drivers_lock:
+                drivers.append(local.driver)
+        return local.driver
+
+    def discard_driver():
+        # Error ke baad browser ki state bharose layak nahi - agla item naya driver lega
+        driver = getattr(local, 'driver', None)
+        if driver is not None:
+            local.driver = None
+            with drivers_lock:
+                drivers.remove(driver)
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+    def scrape(index):
+        item = task['items'][index]
+        limiter.wait(item['url'])
+        try:
+            run_scrape(item['url'], task['publisher_name'], index, task['items'], force_refresh,
+                       driver_factory=get_driver, settle_seconds=Config.BULK_SCRAPE_SETTLE_SECONDS)
+        except Exception as e:
+            # Driver start hi na ho paaye to bhi baaki items chalte rahein
+            item.update({'status': 'error', 'message': f"An error occurred: {e}"})
+        if item['status'] == 'error':
+            discard_driver()
+        _update_counts(task)
+
+    try:
+        with ThreadPoolExecutor(max_workers=Config.BULK_SCRAPE_WORKERS) as pool:
+            list(pool.map(scrape, pending))
+        _update_counts(task)
+        task['status'] = 'complete'
+    except Exception as e:
+        task['status'] = 'error'
+        task['message'] = str(e)
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
+def reset_failed_items(task):
+    """Sirf failed items dobara queue mein; successful results waise hi rehte hain"""
+    retried = 0
+    for item in task['items']:
+        if item['status'] == 'error':
+            item.update({'status': 'queued', 'progress': 0, 'message': 'Waiting...'})
+            retried += 1
+    if retried:
+        task['status'] = 'queued'
+        _update_counts(task)
+    return retried
@@ -1,22 +1,41 @@
 # competitor_monitor.py
 
 import asyncio
-import aiohttp
-import schedule
+import heapq
 import time
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from analyzer_logic import get_all_sitemap_urls, check_url_health
 from ai_content_generator import AIContentGenerator
+from journal_store import JournalStore, atomic_write_json
+from config import Config
+from url_delta_index import UrlDeltaIndex, compute_delta, parse_lastmod, url_id
+from keyword_index import KeywordIndex
+from prompt_builder import extract_main_content, truncate_to_tokens
+from redirect_cache import get_redirect_cache
+from revisit_schedule import plan_next_scan, plan_retry, stagger_overdue, next_scan_time, schedule_overview
+from bs4 import BeautifulSoup
 import threading
 
+COMPETITORS_FILE = 'monitoring_data/competitors.json'
+OPPORTUNITIES_FILE = 'monitoring_data/content_opportunities.json'
+
 class CompetitorMonitor:
-    def __init__(self):
+    def __init__(self, ai_generator=None):
         self.competitors = []
+        self._store = JournalStore(COMPETITORS_FILE, 'url')
+        self._last_opportunities = None
+        self.keyword_index = KeywordIndex()
         self.monitoring_data = {}
-        self.ai_generator = AIContentGenerator()
+        # App ka shared generator milta hai; standalone use par apna bana lete hain
+        self.ai_generator = ai_generator or AIContentGenerator()
         self.monitoring_active = False
+        # Min-heap of (next_scan_timestamp, competitor_url) - har competitor apne publishing rate se revisit hota hai
+        self._due_heap = []
+        self._schedule_lock = threading.Lock()
+        self._scheduler_wakeup = threading.Condition(self._schedule_lock)
+        self._scheduler_thread = None
         
     def add_competitor(self, name, url, keywords=None):
         """Competitor add karta hai monitoring list mein"""
@@ -29,67 +48,102 @@ class CompetitorMonitor:
             'content_changes': [],
             'new_content_detected': []
         }
+        self.competitors = [c for c in self.competitors if c['url'] != url]
         self.competitors.append(competitor)
-        self.save_competitors()
+        self._push_due(competitor, stagger_overdue(competitor))
+        self.save_competitor(competitor)
         return competitor
     
+    def save_competitor(self, competitor):
+        """Sirf ek competitor ka change journal mein append karta hai"""
+        self._store.put(competitor)
+    
     def save_competitors(self):
-        """Competitors list ko file mein save karta hai"""
-        os.makedirs('monitoring_data', exist_ok=True)
-        with open('monitoring_data/competitors.json', 'w', encoding='utf-8') as f:
-            json.dump(self.competitors, f, indent=2, ensure_ascii=False)
+        """Competitors list ka poora snapshot atomically save karta hai"""
+        self._store.replace_all(self.competitors)
     
     def load_competitors(self):
-        """Saved competitors load karta hai"""
-        try:
-            with open('monitoring_data/competitors.json', 'r', encoding='utf-8') as f:
-                self.competitors = json.load(f)
-        except FileNotFoundError:
-            self.competitors = []
+        """Saved competitors load karta hai (snapshot + journal replay)"""
+        self.competitors = self._store.load()
     
+    def _resolve_known_redirects(self, sitemap_urls):
+        """Site scans mein mile 301/308 ko locally resolve karta hai - ek hi page do URLs se new content na bane"""
+        redirect_cache = get_redirect_cache()
+        resolved, seen = [], set()
+        for item in sitemap_urls:
+            target = redirect_cache.resolve(item['url'])
+            if target != item['url']:
+                item = {**item, 'url': target, 'redirected_from': item['url']}
+            if target not in seen:
+                seen.add(target)
+                resolved.append(item)
+        return resolved
+
     async def scan_competitor(self, competitor):
         """Single competitor ko scan karta hai"""
+        import aiohttp
         try:
             async with aiohttp.ClientSession() as session:
                 # Sitemap URLs fetch karein
                 sitemap_urls = await get_all_sitemap_urls(session, competitor['url'])
+                if not sitemap_urls:
+                    # Fetch errors yahan khali list ban jaate hain - khali index / high-water save kiya to
+                    # agla achha scan poore sitemap ko "new" bata dega. Scan failed, retry baad mein.
+                    print(f"No sitemap URLs fetched for competitor {competitor['name']}; keeping previous index")
+                    return None
+                sitemap_urls = self._resolve_known_redirects(sitemap_urls)
                 
-                # Recent content check karein (last 7 days)
-                recent_content = []
-                for url_data in sitemap_urls[:50]:  # Limit to first 50 URLs
-                    if url_data.get('last_modified'):
-                        try:
-                            last_mod = datetime.fromisoformat(url_data['last_modified'].replace('Z', '+00:00'))
-                            if last_mod > datetime.now() - timedelta(days=7):
-                                recent_content.append(url_data)
-                        except:
-                            continue
-                
-                # Content changes detect karein
+                # Content changes detect karein - poore sitemap par hashed-ID set difference
+                url_index = UrlDeltaIndex(competitor['url'])
                 previous_scan = competitor.get('last_scan_data', {})
-                current_urls = {item['url']: item for item in sitemap_urls}
-                previous_urls = previous_scan.get('urls', {})
+                previous_ids = url_index.load()
+                if not previous_ids and previous_scan.get('urls'):
+                    # Purane format ka URL map ek baar ID set mein migrate karein
+                    previous_ids = [url_id(url) for url in previous_scan['urls']]
+                is_baseline = not previous_ids and not competitor.get('last_scan')
+                
+                high_water = parse_lastmod(competitor.get('lastmod_high_water'))
+                delta = compute_delta(sitemap_urls, previous_ids, high_water)
+                
+                # Recent content check karein (last 7 days) - poora sitemap, sirf first 50 nahi
+                cutoff = datetime.now(timezone.utc) - timedelta(days=7)
+                recent_content = [item for item in sitemap_urls if (parse_lastmod(item.get('last_modified')) or cutoff) > cutoff]
+                recent_content.sort(key=lambda item: parse_lastmod(item['last_modified']), reverse=True)
+                recent_content = recent_content[:Config.COMPETITOR_RECENT_CONTENT_LIMIT]
                 
-                new_content = []
-                for url, data in current_urls.items():
-                    if url not in previous_urls:
-                        new_content.append(data)
+                # Pehle scan mein poora sitemap "new" nahi - sirf haal hi ka content
+                new_content = recent_content if is_baseline else delta['new']
                 
-                # Results save karein
+                # Keyword index mein sirf is competitor ke added/removed URLs update karein (dobara chalne par bhi same)
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.keyword_index.sync_competitor, competitor, sitemap_urls)
+                
+                # AI analysis for new content - timeout yahan aaye to kuch bhi "seen" mark nahi hua,
+                # retry wahi naye URLs dobara detect aur analyze karta hai
+                analyzed = await self.analyze_new_content(competitor, new_content) if new_content else []
+                
+                # Publishing rate (lastmod deltas) se agla revisit time
+                previous_scan_at = datetime.fromisoformat(competitor['last_scan']).astimezone(timezone.utc) if competitor.get('last_scan') else None
+                self._push_due(competitor, plan_next_scan(competitor, sitemap_urls, len(delta['new']), previous_scan_at))
+                
+                url_index.save(delta['current_ids'])
+                if delta['high_water']:
+                    competitor['lastmod_high_water'] = delta['high_water'].isoformat()
+                
+                # Results save karein (poora URL map nahi, sirf delta)
                 scan_result = {
                     'timestamp': datetime.now().isoformat(),
                     'total_urls': len(sitemap_urls),
                     'recent_content': recent_content,
                     'new_content': new_content,
-                    'urls': current_urls
+                    'updated_content': delta['updated'],
+                    'removed_count': delta['removed_count'],
+                    'baseline': is_baseline
                 }
                 
                 competitor['last_scan'] = datetime.now().isoformat()
                 competitor['last_scan_data'] = scan_result
-                
-                # AI analysis for new content
-                if new_content:
-                    await self.analyze_new_content(competitor, new_content)
+                competitor['new_content_detected'].extend(analyzed)
                 
                 return scan_result
                 
@@ -98,7 +152,9 @@ class CompetitorMonitor:
             return None
     
     async def analyze_new_content(self, competitor, new_content):
-        """New content ko AI se analyze karta hai"""
+        """New content ko AI se analyze karta hai; analyzed items return karta hai (competitor mein scan_competitor jodta hai)"""
+        import aiohttp
+        analyzed = []
         for content_item in new_content[:5]:  # Limit to 5 new articles
             try:
                 # Content scrape karein (simplified)
@@ -107,12 +163,19 @@ class CompetitorMonitor:
                         if response.status == 200:
                             html = await response.text()
                             
+                            soup = BeautifulSoup(html, 'lxml')
+                            title = soup.title.get_text(strip=True) if soup.title else ''
+                            headings = [h.get_text(strip=True) for h in soup.find_all(['h1', 'h2'])[:20]]
+                            self.keyword_index.set_document_text(competitor, content_item['url'], title, headings)
+                            # Raw HTML ka shuru ka hissa zyaadatar <head> hota hai - article ka text bhejte hain
+                            article_text = truncate_to_tokens(extract_main_content(html, content_item['url']), Config.AI_ANALYSIS_TOKENS)
+                            
                             # AI analysis
                             analysis_prompt = f"""
                             Analyze this competitor's new content and suggest how we can create better content:
                             
                             URL: {content_item['url']}
-                            Content: {html[:2000]}...
+                            Content: {article_text}
                             
                             Provide:
                             1. Main topic and keywords
@@ -121,52 +184,121 @@ class CompetitorMonitor:
                             4. SEO opportunities
                             """
                             
-                            ai_analysis = self.ai_generator.generate_content_with_ai(analysis_prompt)
+                            # Blocking OpenAI call ko executor mein chalayein taaki baaki scans na rukein
+                            loop = asyncio.get_running_loop()
+                            ai_analysis = await loop.run_in_executor(None, self.ai_generator.generate_content_with_ai, analysis_prompt)
                             
-                            content_item['ai_analysis'] = ai_analysis
-                            competitor['new_content_detected'].append(content_item)
+                            analyzed.append({**content_item, 'ai_analysis': ai_analysis})
                             
             except Exception as e:
                 print(f"Error analyzing content {content_item['url']}: {e}")
+        return analyzed
+    
+    def _push_due(self, competitor, due_ts):
+        with self._schedule_lock:
+            heapq.heappush(self._due_heap, (due_ts, competitor['url']))
+            self._scheduler_wakeup.notify_all()
+    
+    def _pop_due_urls(self, now):
+        """Heap se woh competitors jinka revisit time ho gaya; stale entries (reschedule/remove) skip"""
+        competitors_by_url = {c['url']: c for c in self.competitors}
+        due_urls = []
+        while self._due_heap and self._due_heap[0][0] <= now:
+            due_ts, url = heapq.heappop(self._due_heap)
+            competitor = competitors_by_url.get(url)
+            if competitor and next_scan_time(competitor) == due_ts and url not in due_urls:
+                due_urls.append(url)
+        return due_urls
     
     def start_monitoring(self):
-        """Automated monitoring start karta hai"""
-        self.monitoring_active = True
-        
-        # Schedule daily scans
-        schedule.every().day.at("09:00").do(self.run_daily_scan)
-        schedule.every().day.at("18:00").do(self.run_daily_scan)
-        
-        # Background thread for scheduler
-        def run_scheduler():
-            while self.monitoring_active:
-                schedule.run_pending()
-                time.sleep(60)
-        
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
-        
+        """Adaptive monitoring start karta hai; dobara call karne par kuch duplicate nahi hota"""
+        with self._schedule_lock:
+            if self._scheduler_thread and self._scheduler_thread.is_alive():
+                return False
+            self.monitoring_active = True
+            self.load_competitors()
+            self._due_heap = [(stagger_overdue(competitor), competitor['url']) for competitor in self.competitors]
+            heapq.heapify(self._due_heap)
+            self._scheduler_thread = threading.Thread(target=self._run_scheduler, daemon=True)
+            self._scheduler_thread.start()
+        self.save_competitors()
         print("Competitor monitoring started!")
+        return True
     
-    def run_daily_scan(self):
-        """Daily scan execute karta hai"""
-        print("Running daily competitor scan...")
-        asyncio.run(self.scan_all_competitors())
+    def stop_monitoring(self):
+        with self._schedule_lock:
+            self.monitoring_active = False
+            self._scheduler_wakeup.notify_all()
     
-    async def scan_all_competitors(self):
-        """Sabhi competitors ko scan karta hai"""
+    def _run_scheduler(self):
+        """Agle due competitor ke time par hi jaagta hai aur sirf due competitors scan karta hai"""
+        while True:
+            with self._schedule_lock:
+                while self.monitoring_active:
+                    now = time.time()
+                    if self._due_heap and self._due_heap[0][0] <= now:
+                        break
+                    timeout = self._due_heap[0][0] - now if self._due_heap else None
+                    self._scheduler_wakeup.wait(timeout)
+                if not self.monitoring_active:
+                    return
+                due_urls = self._pop_due_urls(now)
+            if not due_urls:
+                continue
+            print(f"Running scheduled scan for {len(due_urls)} competitors...")
+            try:
+                asyncio.run(self.scan_all_competitors(urls=due_urls))
+            except Exception as e:
+                print(f"Competitor scheduler error: {e}")
+    
+    def get_schedule(self):
+        """Upcoming revisits + fixed schedule ke mukable bacha scan kaam"""
+        overview = schedule_overview(self.competitors)
+        overview['monitoring_active'] = bool(self.monitoring_active and self._scheduler_thread and self._scheduler_thread.is_alive())
+        return overview
+    
+    async def scan_all_competitors(self, progress_callback=None, urls=None):
+        """
+        Competitors ko concurrently scan karta hai - global concurrency budget aur per-competitor timeout ke saath.
+        urls diye hon to sirf woh (scheduler ke due competitors).
+        """
         self.load_competitors()
+        competitors = self.competitors if urls is None else [c for c in self.competitors if c['url'] in urls]
+        semaphore = asyncio.Semaphore(Config.COMPETITOR_SCAN_CONCURRENCY)
+        timeout = Config.COMPETITOR_SCAN_TIMEOUT.total_seconds()
+        total = len(competitors)
+        completed = 0
         
-        for competitor in self.competitors:
-            print(f"Scanning {competitor['name']}...")
-            result = await self.scan_competitor(competitor)
+        async def scan_one(competitor):
+            nonlocal completed
+            async with semaphore:
+                print(f"Scanning {competitor['name']}...")
+                try:
+                    result = await asyncio.wait_for(self.scan_competitor(competitor), timeout=timeout)
+                except asyncio.TimeoutError:
+                    print(f"Scan timed out for {competitor['name']} after {int(timeout)}s")
+                    result = None
+                    competitor['last_scan_status'] = 'timeout'
+                else:
+                    competitor['last_scan_status'] = 'ok' if result else 'error'
+                if not result:
+                    # Fail hua scan rate nahi badalta - usi interval ke baad dobara
+                    self._push_due(competitor, plan_retry(competitor))
+            
             if result:
                 print(f"Found {len(result['new_content'])} new articles from {competitor['name']}")
+            # Har competitor complete hote hi uska result save karein
+            self.save_competitor(competitor)
+            completed += 1
+            if progress_callback:
+                progress_callback(completed, total, competitor['name'])
+            return result
         
-        self.save_competitors()
+        results = await asyncio.gather(*(scan_one(competitor) for competitor in competitors))
         
         # Generate opportunities report
         self.generate_opportunities_report()
+        return results
     
     def generate_opportunities_report(self):
         """Content opportunities ka report generate karta hai"""
@@ -183,27 +315,24 @@ class CompetitorMonitor:
                             'detected_date': content.get('last_modified')
                         })
         
-        # Save opportunities
-        os.makedirs('monitoring_data', exist_ok=True)
-        with open('monitoring_data/content_opportunities.json', 'w', encoding='utf-8') as f:
-            json.dump(opportunities, f, indent=2, ensure_ascii=False)
+        # Save opportunities - sirf tab jab report badli ho
+        if opportunities != self._last_opportunities:
+            atomic_write_json(OPPORTUNITIES_FILE, opportunities, indent=2, ensure_ascii=False)
+            self._last_opportunities = opportunities
         
         return opportunities
     
-    def get_content_suggestions(self, topic_keywords):
-        """Topic ke basis par content suggestions deta hai"""
+    def get_content_suggestions(self, topic_keywords, limit=20):
+        """Topic ke basis par content suggestions deta hai (inverted index se ranked)"""
         suggestions = []
         
-        for competitor in self.competitors:
-            if competitor.get('last_scan_data'):
-                # Check if any competitor covered this topic
-                for url_data in competitor['last_scan_data']['urls'].values():
-                    url_lower = url_data['url'].lower()
-                    if any(keyword.lower() in url_lower for keyword in topic_keywords):
-                        suggestions.append({
-                            'competitor': competitor['name'],
-                            'url': url_data['url'],
-                            'suggestion': f"Competitor ne is topic par content banaya hai. Hum better angle se likh sakte hain."
-                        })
+        for match in self.keyword_index.search(' '.join(topic_keywords), limit=limit):
+            suggestions.append({
+                'competitor': match['competitor'],
+                'url': match['url'],
+                'title': match['title'],
+                'score': match['score'],
+                'suggestion': f"Competitor ne is topic par content banaya hai. Hum better angle se likh sakte hain."
+            })
         
-        return suggestions
\ No newline at end of file
+        return suggestions
@@ -0,0 +1,61 @@
+# components.py
+
+import threading
+from startup_report import measure
+
+_components = {}
+# RLock: competitor monitor banate waqt shared AI generator bhi isi lock ke andar banta hai
+_components_lock = threading.RLock()
+
+def _get_component(name, factory):
+    """Pehli zaroorat par ek hi baar banta hai; baad ke calls bina lock ke cached object lete hain"""
+    component = _components.get(name)
+    if component is None:
+        with _components_lock:
+            component = _components.get(name)
+            if component is None:
+                with measure(f'component:{name}'):
+                    component = _components[name] = factory()
+    return component
+
+def _build_ai_generator():
+    from ai_content_generator import AIContentGenerator
+    return AIContentGenerator()
+
+def _build_competitor_monitor():
+    from competitor_monitor import CompetitorMonitor
+    monitor = CompetitorMonitor(ai_generator=get_ai_generator())
+    monitor.load_competitors()
+    return monitor
+
+def _build_auto_publisher():
+    from automated_publisher import AutomatedPublisher
+    publisher = AutomatedPublisher()
+    publisher.load_sites_config()
+    publisher.load_publishing_queue()
+    publisher.start_scheduler()
+    return publisher
+
+def get_ai_generator():
+    return _get_component('ai_generator', _build_ai_generator)
+
+def get_competitor_monitor():
+    return _get_component('competitor_monitor', _build_competitor_monitor)
+
+def get_auto_publisher():
+    return _get_component('auto_publisher', _build_auto_publisher)
+
+def warm_up_in_background(*getters):
+    """
+    Scheduled posts bina kisi request ke bhi publish hone chahiye - publisher (queue load + scheduler)
+    ek daemon thread mein banta hai taaki app pehli request turant serve kare.
+    """
+    def run():
+        for getter in getters:
+            try:
+                getter()
+            except Exception as e:
+                print(f"Background warm-up failed for {getter.__name__}: {e}")
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
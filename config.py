@@ -14,22 +14,81 @@ class Config:
     CHROME_DRIVER_PATH = os.environ.get('CHROME_DRIVER_PATH') or r"C:\Users\FCC The Gurukul\Documents\A Python Project\chromedriver-win64\chromedriver.exe"
     
     # Monitoring Configuration
-    COMPETITOR_SCAN_INTERVAL = timedelta(hours=12)  # Scan competitors every 12 hours
+    COMPETITOR_SCAN_INTERVAL = timedelta(hours=12)  # Revisit interval until a competitor's publishing rate is known
+    COMPETITOR_MIN_REVISIT = timedelta(hours=1)
+    COMPETITOR_MAX_REVISIT = timedelta(days=3)  # Dormant competitors are still checked at least this often
+    COMPETITOR_POSTS_PER_VISIT = 1  # Revisit interval targets about this many new posts per scan
+    COMPETITOR_RATE_WINDOW = timedelta(days=14)  # Sitemap lastmod history used to estimate the publishing rate
+    COMPETITOR_REVISIT_JITTER = 0.1  # +/- fraction of the interval, so scans of similar sites don't line up
+    COMPETITOR_START_STAGGER = timedelta(minutes=15)  # Overdue competitors are spread over this window when monitoring starts
+    COMPETITOR_SCAN_CONCURRENCY = 8  # Competitors scanned in parallel
+    COMPETITOR_SCAN_TIMEOUT = timedelta(minutes=10)  # Per-competitor limit so one slow site can't stall the batch
+    COMPETITOR_RECENT_CONTENT_LIMIT = 100  # Most recent sitemap entries kept per competitor scan
     MAX_CONCURRENT_REQUESTS = 50
+    SCAN_CHECKPOINT_EVERY = 200  # Partial scan results are flushed to disk after this many URLs
+    REDIRECT_CACHE_TTL = timedelta(days=7)  # Cached 301/308 chains are re-verified with a single HEAD after this
+    # Budgeted scans check higher-priority URLs first; the score is multiplied by the URL category's weight
+    SCAN_PRIORITY_CATEGORY_WEIGHTS = {'Homepage': 2.0, 'Category Page': 1.5, 'Post/Article': 1.2, 'Product': 1.2, 'Web Story': 0.6}
+    
+    # Sharded Scan Settings
+    SCAN_SHARD_DB = os.path.join('scans', '.shard_queue.db')  # SQLite broker; worker nodes must see the same file and scans/ folder
+    SCAN_SHARD_SIZE = 2000  # URLs per shard
+    SCAN_WORKER_PROCESSES = os.cpu_count() or 4  # Local worker processes started by the coordinator
+    SCAN_SHARD_CONCURRENCY = 25  # Concurrent requests inside one shard
+    SCAN_MAX_SHARDS_PER_SITE = 4  # Politeness: shards of one site running at the same time (all workers/nodes)
+    SCAN_SHARD_LEASE = timedelta(minutes=5)  # A shard whose worker stops renewing is handed to another worker
+    SCAN_SHARD_MAX_ATTEMPTS = 3
+    SCAN_WORKER_IDLE_EXIT = 60  # Seconds an idle local worker process waits for new shards before exiting
+    
+    # Bulk Scrape Settings
+    BULK_SCRAPE_WORKERS = 6  # Parallel Chrome instances
+    BULK_SCRAPE_DOMAIN_INTERVAL = 1.0  # Minimum seconds between two requests to the same domain
+    BULK_SCRAPE_SETTLE_SECONDS = 1.5  # Wait after page load (single scrapes use a random 3-5s)
+    BULK_SCRAPE_MAX_URLS = 1000
     
     # Content Generation Settings
+    AI_MODEL = 'gpt-3.5-turbo'
     AI_MAX_TOKENS = 2000
     AI_TEMPERATURE = 0.7
+    AI_CONTEXT_TOKENS = 16385  # Model context window (prompt + completion)
+    AI_ARTICLE_TOKEN_BUDGET = 6000  # Longer articles are condensed chunk by chunk (map) before the rewrite (reduce)
+    AI_CHUNK_TOKENS = 3000
+    AI_MAP_MAX_TOKENS = 800  # Completion limit for each chunk's notes
+    AI_MAP_WORKERS = 4  # Chunks condensed in parallel
+    AI_ANALYSIS_TOKENS = 1500  # Article text sent with competitor content analysis
     
     # Publishing Settings
     AUTO_PUBLISH_ENABLED = True
     DEFAULT_POST_STATUS = 'draft'  # 'draft' or 'publish'
+    PUBLISH_MAX_ATTEMPTS = 3
+    PUBLISH_RETRY_BACKOFF = timedelta(minutes=5)  # Doubles after every failed attempt
     
     # File Paths
     SCAN_DATA_DIR = "scans"
     SCRAPED_DATA_DIR = "scraped_data"
     MONITORING_DATA_DIR = "monitoring_data"
     PUBLISHING_DATA_DIR = "publishing_data"
+    CATEGORY_RULES_FILE = "category_rules.json"  # URL category rules; built-in defaults are used until saved
+    
+    # Storage Settings
+    JOURNAL_COMPACT_AFTER = 200  # Minimum journal entries before the snapshot is compacted
+    JOURNAL_COMPACT_RATIO = 0.5  # ...and only once the journal has this many entries per snapshot record (keeps compaction amortized O(1))
+    SCRAPE_CACHE_MAX_MB = 500  # Least-recently-used scraped folders are evicted above this
+    
+    # HTTP Caching Settings
+    HTTP_COMPRESS_MIN_BYTES = 1024  # Smaller JSON/HTML responses are sent uncompressed
+    HTTP_GZIP_LEVEL = 6
+    HTTP_BROTLI_QUALITY = 5  # Used when the optional `brotli` package is installed
+    MEDIA_CACHE_MAX_AGE = timedelta(days=7)  # Browser cache lifetime for scraped images and thumbnails
+    THUMBNAIL_SIZE = 320  # Longest side (px) of result page previews; needs the optional Pillow package
+    THUMBNAIL_QUALITY = 80
+    EXPORT_BATCH_ROWS = 500  # CSV/JSONL exports are streamed to the client in chunks of this many rows
+    
+    # Profiling Settings
+    PROFILING_ENABLED = os.environ.get('SEO_PROFILING') == '1'  # Profile every background task
+    PROFILING_MODE = os.environ.get('SEO_PROFILING_MODE', 'sampling')  # 'sampling' (folded stacks) or 'cprofile'
+    PROFILING_SAMPLE_INTERVAL = 0.005  # Seconds between stack samples
+    PROFILE_DIR = "profiles"
     
     # SEO Settings
     MIN_WORD_COUNT = 500
@@ -0,0 +1,129 @@
+# http_cache.py
+
+import os
+import gzip
+import json
+import hashlib
+import threading
+from datetime import datetime, timezone
+from flask import request, current_app
+from werkzeug.http import is_resource_modified
+from config import Config
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/html', 'text/plain', 'text/css', 'application/javascript')
+THUMBNAIL_DIR = 'thumbs'  # Har scraped folder ke andar - folder evict hone par thumbnails bhi saath jaate hain
+
+def file_validators(*paths):
+    """
+    Files ke (inode, mtime, size) se ETag + sabse naya mtime. Payload banaye/load kiye bina hi 304 decide
+    ho jaata hai - jaise compare mein dono scan files padhne se pehle. Inode isliye ki atomic replace
+    (recategorize mtime wapas rakhta hai) same size par bhi naya ETag de.
+    """
+    stats = [os.stat(path) for path in paths]
+    key = '|'.join(f"{os.path.basename(path)}:{stat.st_ino}:{stat.st_mtime_ns}:{stat.st_size}" for path, stat in zip(paths, stats))
+    last_modified = datetime.fromtimestamp(max(stat.st_mtime for stat in stats), timezone.utc)
+    return hashlib.md5(key.encode('utf-8')).hexdigest(), last_modified
+
+def not_modified(etag, last_modified=None, extra='', cache_control='no-cache'):
+    """Client ke If-None-Match / If-Modified-Since match karein to 304 response, warna None"""
+    etag = _vary_etag(etag, extra)
+    if is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        return None
+    response = current_app.response_class(status=304)
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response
+
+def cached_json(payload, etag=None, last_modified=None, extra='', cache_control='no-cache'):
+    """
+    JSON response ETag (weak - gzip/br encodings ke beech same rehta hai) aur Last-Modified ke saath.
+    etag na ho to body ke hash se banta hai. `no-cache` = browser store kare par har baar revalidate.
+    """
+    body = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(_vary_etag(etag, extra) if etag else hashlib.md5(body.encode('utf-8')).hexdigest(), weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
+
+def _vary_etag(etag, extra):
+    """Same files, alag query (page, filters) -> alag ETag"""
+    return hashlib.md5(f"{etag}|{extra}".encode('utf-8')).hexdigest() if extra else etag
+
+def _accepted_encoding():
+    accepted = request.accept_encodings
+    if accepted['br'] and _brotli() is not None:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+def compress_response(response):
+    """after_request hook: text/JSON responses gzip (ya brotli installed ho to br) mein; files aur streams jaise hain"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < Config.HTTP_COMPRESS_MIN_BYTES:
+        return response
+    encoding = _accepted_encoding()
+    if encoding == 'br':
+        data = _brotli().compress(data, quality=Config.HTTP_BROTLI_QUALITY)
+    elif encoding == 'gzip':
+        data = gzip.compress(data, compresslevel=Config.HTTP_GZIP_LEVEL)
+    else:
+        return response
+    response.set_data(data)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def thumbnail_path(source_path):
+    """<scraped folder>/images/x.jpg -> <scraped folder>/thumbs/<size>/x.jpg"""
+    image_folder, name = os.path.split(source_path)
+    return os.path.join(os.path.dirname(image_folder), THUMBNAIL_DIR, str(Config.THUMBNAIL_SIZE), name)
+
+def ensure_thumbnail(source_path):
+    """
+    Cached thumbnail ka path; source se purana ho ya na ho to banata hai. Pillow installed na ho
+    ya image padhi na ja sake to None (caller original serve karta hai).
+    """
+    target = thumbnail_path(source_path)
+    try:
+        if os.path.getmtime(target) >= os.path.getmtime(source_path):
+            return target
+    except OSError:
+        pass
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with Image.open(source_path) as image:
+            image_format = image.format
+            if image_format not in ('JPEG', 'PNG', 'WEBP', 'GIF'):
+                return None
+            image.thumbnail((Config.THUMBNAIL_SIZE, Config.THUMBNAIL_SIZE))
+            if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            # Parallel requests ek hi thumbnail banayein to bhi aadhi file kabhi serve na ho
+            image.save(tmp_path, format=image_format, quality=Config.THUMBNAIL_QUALITY, optimize=True)
+        os.replace(tmp_path, target)
+        return target
+    except (OSError, ValueError) as e:
+        print(f"Thumbnail failed for {source_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
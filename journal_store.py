@@ -0,0 +1,200 @@
+# journal_store.py
+
+import os
+import json
+import threading
+from config import Config
+
+# Ek hi file ke liye saare store instances ek hi lock share karte hain
+_path_locks = {}
+_path_locks_guard = threading.Lock()
+
+def _lock_for(path):
+    with _path_locks_guard:
+        return _path_locks.setdefault(os.path.abspath(path), threading.RLock())
+
+def atomic_write_json(path, data, **dump_kwargs):
+    """Temp file mein likh kar os.replace se swap karta hai - reader ko kabhi half-written file nahi milti"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp.{os.getpid()}.{threading.get_ident()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def iter_json_array(path, chunk_size=1 << 16, with_offsets=False):
+    """
+    Top-level JSON array ke items ek-ek karke (JSONDecoder.raw_decode se). File ek line ki ho ya indented,
+    memory mein ek time par sirf ek chunk aur current item rehta hai.
+    with_offsets: (item, byte_offset, byte_length) - baad mein `read_json_item` se wahi item seedha padh sakte hain.
+    """
+    decoder = json.JSONDecoder()
+    # newline='' - '\r\n' translate hua to byte offsets khisak jaate
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        buffer, pos, opened = '', 0, False
+        byte_pos = 0  # buffer[pos] ka file mein byte offset
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+                byte_pos += 1
+            if pos == len(buffer):
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise ValueError(f"{path}: JSON array ended unexpectedly")
+                continue
+            if not opened:
+                if buffer[pos] != '[':
+                    raise ValueError(f"{path}: not a JSON array")
+                opened = True
+                pos += 1
+                byte_pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                end = None
+            # Item chunk ke beech kat gaya (ya buffer ke bilkul end par khatam hua) - aage ka text jod kar dobara
+            if end is None or end == len(buffer):
+                chunk = f.read(chunk_size)
+                if chunk:
+                    buffer, pos = buffer[pos:] + chunk, 0
+                    continue
+                if end is None:
+                    raise ValueError(f"{path}: invalid JSON array item at offset {pos}")
+            if with_offsets:
+                length = len(buffer[pos:end].encode('utf-8'))
+                yield item, byte_pos, length
+                byte_pos += length
+            else:
+                yield item
+            pos = end
+
+def read_json_item(path, offset, length):
+    """`iter_json_array(with_offsets=True)` ka diya ek item, poori file padhe bina"""
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read(length).decode('utf-8'))
+
+class JournalStore:
+    """
+    JSON list file ke upar append-only journal.
+    Snapshot (`path`) wahi purana JSON list format rehta hai, har single change
+    `path.journal` mein ek line append hota hai (O(1)). Journal jab snapshot ke records ka
+    COMPACT_RATIO hissa (kam se kam `compact_after`) ho jaaye tab snapshot atomically rewrite karke
+    journal truncate hota hai - har rewrite se pehle utne hi appends, isliye total kaam linear.
+    defer=True wale changes memory mein turant, disk par `flush()` par ek saath.
+    read_only: sirf padhta hai, changes memory tak - jab file koi aur process likhta ho.
+    """
+    def __init__(self, path, key_field, compact_after=None, read_only=False):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.key_field = key_field
+        self.compact_after = compact_after or Config.JOURNAL_COMPACT_AFTER
+        self._records = {}
+        self._journal_ops = 0
+        self._pending = []
+        self.read_only = read_only
+        self._lock = _lock_for(path)
+
+    def load(self):
+        """Snapshot load karke journal replay karta hai, records ki list return karta hai"""
+        with self._lock:
+            self._records = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    snapshot = json.load(f)
+                for record in snapshot:
+                    self._records[record[self.key_field]] = record
+            except FileNotFoundError:
+                pass
+
+            self._journal_ops = 0
+            torn_write = False
+            try:
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            # Crash ke time adhuri likhi aakhri line - ignore
+                            torn_write = True
+                            continue
+                        if entry['op'] == 'put':
+                            self._records[entry['record'][self.key_field]] = entry['record']
+                        elif entry['op'] == 'delete':
+                            self._records.pop(entry['key'], None)
+                        self._journal_ops += 1
+            except FileNotFoundError:
+                pass
+            if torn_write and not self.read_only:
+                # Aage ki appends adhuri line se na judein, isliye turant compact karein
+                self.compact()
+            return list(self._records.values())
+
+    def values(self):
+        with self._lock:
+            return list(self._records.values())
+
+    def get(self, key):
+        with self._lock:
+            return self._records.get(key)
+
+    def put(self, record, defer=False):
+        """Single record insert/update - sirf ek journal line append hoti hai"""
+        with self._lock:
+            self._records[record[self.key_field]] = record
+            self._append({'op': 'put', 'record': record}, defer)
+
+    def delete(self, key, defer=False):
+        with self._lock:
+            if self._records.pop(key, None) is not None:
+                self._append({'op': 'delete', 'key': key}, defer)
+
+    def flush(self):
+        """Deferred changes ek hi write mein journal par (blocking I/O - event loop se executor mein chalayein)"""
+        with self._lock:
+            if not self._pending:
+                return
+            entries, self._pending = self._pending, []
+            self._write_entries(entries)
+
+    def replace_all(self, records):
+        """Poori list ek saath replace karta hai (atomic snapshot swap)"""
+        with self._lock:
+            self._records = {record[self.key_field]: record for record in records}
+            self.compact()
+
+    def compact(self):
+        """Current state ka snapshot atomically likhta hai aur journal khali karta hai"""
+        if self.read_only:
+            return
+        with self._lock:
+            atomic_write_json(self.path, list(self._records.values()), indent=2, ensure_ascii=False)
+            # Snapshot ke baad crash hone par bhi journal replay idempotent hai
+            open(self.journal_path, 'w', encoding='utf-8').close()
+            self._journal_ops = 0
+            # Pending changes snapshot mein aa chuke
+            self._pending = []
+
+    def _append(self, entry, defer=False):
+        if self.read_only:
+            return
+        if defer:
+            self._pending.append(entry)
+        else:
+            self._write_entries([entry])
+
+    def _write_entries(self, entries):
+        directory = os.path.dirname(self.journal_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries))
+        self._journal_ops += len(entries)
+        if self._journal_ops >= max(self.compact_after, len(self._records) * Config.JOURNAL_COMPACT_RATIO):
+            self.compact()
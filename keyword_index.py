@@ -0,0 +1,167 @@
+# keyword_index.py
+
+import os
+import re
+import json
+import math
+import heapq
+import threading
+from urllib.parse import urlparse, unquote
+from analyzer_logic import sanitize_url_for_filename
+from journal_store import atomic_write_json
+from url_delta_index import url_id
+
+INDEX_DIR = os.path.join('monitoring_data', 'keyword_index')
+
+# Field weights - title/headings ka match slug se zyada important hai
+URL_WEIGHT, HEADING_WEIGHT, TITLE_WEIGHT = 1.0, 2.0, 3.0
+# Transliteration skeleton match exact match se kam score karta hai
+SKELETON_FACTOR = 0.5
+
+STOP_WORDS = {
+    'www', 'html', 'htm', 'php', 'aspx', 'amp', 'com', 'in', 'org', 'net', 'the', 'and', 'for', 'of', 'to', 'a', 'an',
+    'is', 'on', 'with', 'ki', 'ka', 'ke', 'ko', 'hai', 'se', 'me', 'mein', 'aur', 'kaise', 'kya', 'category', 'tag', 'page',
+}
+TOKEN_SPLIT_RE = re.compile(r'[^\w]+|_')
+TRANSLIT_RULES = [('ph', 'f'), ('aa', 'a'), ('ee', 'i'), ('oo', 'u'), ('w', 'v'), ('z', 'j'), ('q', 'k'), ('ck', 'k')]
+DOUBLE_LETTER_RE = re.compile(r'([a-z])\1+')
+VOWELS_RE = re.compile(r'[aeiouy]')
+
+def normalize_token(token):
+    """Roman Hindi ke alag-alag spellings ko ek form mein laata hai (sarkaari -> sarkari, naukaree -> naukari)"""
+    if not token.isascii():
+        return token
+    for old, new in TRANSLIT_RULES:
+        token = token.replace(old, new)
+    return DOUBLE_LETTER_RE.sub(r'\1', token)
+
+def skeleton_key(token):
+    """Consonant skeleton - yojna/yojana, naukri/naukari jaise schwa variants ko match karta hai"""
+    if not token.isascii() or len(token) < 4:
+        return None
+    return '~' + token[0] + VOWELS_RE.sub('', token[1:])
+
+def tokenize(text):
+    """Text ko normalized tokens mein todta hai (Devanagari tokens as-is rehte hain)"""
+    tokens = []
+    for raw in TOKEN_SPLIT_RE.split(text.lower()):
+        if len(raw) < 2 or raw.isdigit() or raw in STOP_WORDS:
+            continue
+        tokens.append(normalize_token(raw))
+    return tokens
+
+def url_text(url):
+    """URL ka sirf path/slug hissa (percent-encoded Hindi slugs decode karke)"""
+    parsed = urlparse(url)
+    return unquote(f"{parsed.path} {parsed.query}")
+
+class KeywordIndex:
+    """
+    Competitor URLs ka inverted index: token -> {doc_id: weight}.
+    Har competitor ke documents alag file mein rehte hain taaki scan ke baad sirf
+    usi competitor ka hissa update ho.
+    """
+    def __init__(self):
+        self._postings = {}
+        self._docs = {}          # doc_id -> {'site', 'competitor', 'url', 'title', 'headings'}
+        self._site_docs = {}     # site_url -> set(doc_id)
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def _site_file(self, site_url):
+        return os.path.join(INDEX_DIR, f"{sanitize_url_for_filename(site_url)}.json")
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if os.path.isdir(INDEX_DIR):
+                for filename in os.listdir(INDEX_DIR):
+                    if not filename.endswith('.json'):
+                        continue
+                    with open(os.path.join(INDEX_DIR, filename), 'r', encoding='utf-8') as f:
+                        site_data = json.load(f)
+                    for url, title, headings in site_data['docs']:
+                        self._add_doc(site_data['site'], site_data['competitor'], url, title, headings)
+            self._loaded = True
+
+    def _doc_terms(self, doc):
+        terms = {}
+        fields = [(url_text(doc['url']), URL_WEIGHT), (doc['title'], TITLE_WEIGHT), (' '.join(doc['headings']), HEADING_WEIGHT)]
+        for text, weight in fields:
+            for token in tokenize(text):
+                terms[token] = max(terms.get(token, 0), weight)
+                skeleton = skeleton_key(token)
+                if skeleton:
+                    terms[skeleton] = max(terms.get(skeleton, 0), weight * SKELETON_FACTOR)
+        return terms
+
+    def _add_doc(self, site_url, competitor_name, url, title='', headings=None):
+        doc_id = url_id(url)
+        if doc_id in self._docs:
+            self._remove_doc(doc_id)
+        doc = {'site': site_url, 'competitor': competitor_name, 'url': url, 'title': title or '', 'headings': headings or []}
+        self._docs[doc_id] = doc
+        self._site_docs.setdefault(site_url, set()).add(doc_id)
+        for term, weight in self._doc_terms(doc).items():
+            self._postings.setdefault(term, {})[doc_id] = weight
+
+    def _remove_doc(self, doc_id):
+        doc = self._docs.pop(doc_id, None)
+        if not doc:
+            return
+        self._site_docs.get(doc['site'], set()).discard(doc_id)
+        for term in self._doc_terms(doc):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[term]
+
+    def _save_site(self, site_url):
+        doc_ids = self._site_docs.get(site_url, set())
+        competitor_name = next((self._docs[d]['competitor'] for d in doc_ids), '')
+        atomic_write_json(self._site_file(site_url), {
+            'site': site_url,
+            'competitor': competitor_name,
+            'docs': [[self._docs[d]['url'], self._docs[d]['title'], self._docs[d]['headings']] for d in doc_ids]
+        }, ensure_ascii=False)
+
+    def sync_competitor(self, competitor, url_items):
+        """Scan ke baad competitor ke documents ko current sitemap se sync karta hai - sirf added/removed URLs touch hote hain"""
+        self._ensure_loaded()
+        with self._lock:
+            site_url = competitor['url']
+            current = {url_id(item['url']): item['url'] for item in url_items}
+            existing = self._site_docs.get(site_url, set())
+            for doc_id in existing - current.keys():
+                self._remove_doc(doc_id)
+            for doc_id in current.keys() - existing:
+                self._add_doc(site_url, competitor['name'], current[doc_id])
+            self._save_site(site_url)
+
+    def set_document_text(self, competitor, url, title, headings):
+        """Fetch kiye gaye page ka title aur headings index mein jodta hai"""
+        self._ensure_loaded()
+        with self._lock:
+            self._add_doc(competitor['url'], competitor['name'], url, title, headings)
+            self._save_site(competitor['url'])
+
+    def search(self, query, limit=20):
+        """Topic query ke liye ranked (TF-weight x IDF) results return karta hai"""
+        self._ensure_loaded()
+        with self._lock:
+            total_docs = len(self._docs) or 1
+            scores = {}
+            for token in set(tokenize(query)):
+                for term in filter(None, (token, skeleton_key(token))):
+                    posting = self._postings.get(term)
+                    if not posting:
+                        continue
+                    idf = math.log(1 + total_docs / len(posting))
+                    for doc_id, weight in posting.items():
+                        scores[doc_id] = scores.get(doc_id, 0.0) + weight * idf
+            top = heapq.nlargest(limit, scores.items(), key=lambda pair: pair[1])
+            return [{**self._docs[doc_id], 'score': round(score, 3)} for doc_id, score in top]
@@ -0,0 +1,177 @@
+# link_graph.py
+
+import os
+import json
+from array import array
+from urllib.parse import urljoin, urldefrag, urlparse
+from journal_store import atomic_write_json
+from scan_index import scan_meta_path
+
+REPORT_LIST_LIMIT = 1000
+TOP_PAGES_LIMIT = 50
+
+def site_host(url):
+    return urlparse(url).netloc.lower().removeprefix('www.')
+
+def extract_internal_links(soup, page_url, host, limit):
+    """Page ke same-host <a href> links (fragment hata kar, page par unique, self-link nahi)"""
+    links, seen = [], {page_url}
+    for tag in soup.find_all('a', href=True):
+        href = tag['href'].strip()
+        if not href or href.startswith(('mailto:', 'tel:', 'javascript:')):
+            continue
+        link = urldefrag(urljoin(page_url, href))[0]
+        parsed = urlparse(link)
+        if parsed.scheme not in ('http', 'https') or parsed.netloc.lower().removeprefix('www.') != host:
+            continue
+        if link not in seen:
+            seen.add(link)
+            links.append(link)
+            if len(links) >= limit:
+                break
+    return links
+
+class LinkGraphBuilder:
+    """
+    Crawl ke dauraan link graph: URL -> uint32 node id, edges do `array('I')` mein
+    (src, dst) - 100k pages / lakhon edges par bhi sirf 8 bytes per edge.
+    """
+    def __init__(self):
+        self.node_ids = {}
+        self.urls = []
+        self.src = array('I')
+        self.dst = array('I')
+        self.status = {}    # node id -> http_status (sirf checked pages)
+        self.aliases = {}   # redirect wale URL ka node -> final_url ka node
+
+    def node(self, url):
+        node_id = self.node_ids.get(url)
+        if node_id is None:
+            node_id = self.node_ids[url] = len(self.urls)
+            self.urls.append(url)
+        return node_id
+
+    def add_page(self, result):
+        """Checked page ka status aur outlinks graph mein daalta hai"""
+        source = self.node(result['url'])
+        self.status[source] = result.get('http_status')
+        final_url = result.get('final_url')
+        if final_url and final_url != result['url']:
+            self.aliases[source] = self.node(final_url)
+            self.status.setdefault(self.aliases[source], result.get('http_status'))
+        for link in result.get('links') or ():
+            target = self.node(link)
+            self.src.append(source)
+            self.dst.append(target)
+
+    def unchecked(self):
+        """Links mein mile par abhi tak check na hue URLs"""
+        return [url for node_id, url in enumerate(self.urls) if node_id not in self.status]
+
+    def remap(self):
+        """node id -> redirect resolve hone ke baad wala node id (bina redirect wale nodes khud par)"""
+        # numpy sirf crawl analysis mein chahiye - normal scans aur app startup par import nahi hota
+        import numpy as np
+        remap = np.arange(len(self.urls), dtype=np.uint32)
+        if self.aliases:
+            remap[np.fromiter(self.aliases.keys(), dtype=np.uint32)] = np.fromiter(self.aliases.values(), dtype=np.uint32)
+        return remap
+
+    def to_csr(self, remap=None):
+        """(indptr, indices) CSR - redirect aliases resolve karke, duplicate edges hata kar"""
+        import numpy as np
+        n = len(self.urls)
+        remap = self.remap() if remap is None else remap
+        src = remap[np.frombuffer(self.src, dtype=np.uint32)]
+        dst = remap[np.frombuffer(self.dst, dtype=np.uint32)]
+        # 64-bit key se sort + unique: ek hi (src, dst) do baar count na ho, self-loops bahar
+        keys = np.unique((src.astype(np.uint64) << np.uint64(32)) | dst)
+        src = (keys >> np.uint64(32)).astype(np.uint32)
+        dst = (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+        keep = src != dst
+        src, dst = src[keep], dst[keep]
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return indptr, dst
+
+def pagerank(indptr, indices, damping=0.85, max_iterations=100, tol=1e-6):
+    """Vectorized power iteration; dangling pages ka rank sab nodes mein barabar baant-ta hai"""
+    import numpy as np
+    n = len(indptr) - 1
+    if n == 0:
+        return np.zeros(0)
+    out_degree = np.diff(indptr)
+    edge_source = np.repeat(np.arange(n, dtype=np.uint32), out_degree)
+    dangling = out_degree == 0
+    inverse_degree = np.where(dangling, 0.0, 1.0 / np.maximum(out_degree, 1))
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iterations):
+        contributions = np.bincount(indices, weights=(rank * inverse_degree)[edge_source], minlength=n)
+        new_rank = (1 - damping) / n + damping * (contributions + rank[dangling].sum() / n)
+        converged = np.abs(new_rank - rank).sum() < tol
+        rank = new_rank
+        if converged:
+            break
+    return rank
+
+def _is_broken(http_status):
+    return not isinstance(http_status, int) or http_status >= 400
+
+def analyze_link_graph(builder, scan_file, sitemap_urls):
+    """
+    Inlinks, orphans (sitemap mein hai par kahin se link nahi), broken internal links aur
+    PageRank compute karke `meta/<scan_id>.graph.npz` + `.linkgraph.json` likhta hai.
+    Return: per-URL {'inlinks', 'pagerank'} lookup aur report.
+    """
+    import numpy as np
+    remap = builder.remap()
+    indptr, indices = builder.to_csr(remap)
+    n = len(builder.urls)
+    inlinks = np.bincount(indices, minlength=n)
+    ranks = pagerank(indptr, indices)
+    # 1.0 = average page - sites ke beech compare karna aasaan
+    scores = ranks * n if n else ranks
+
+    sitemap_ids = np.fromiter((builder.node_ids[item['url']] for item in sitemap_urls if item['url'] in builder.node_ids), dtype=np.int64)
+    # Redirect wale sitemap URL ke links uske final page par gine jaate hain - orphan wahi jiske target ke bhi inlinks 0
+    orphan_ids = sitemap_ids[inlinks[remap[sitemap_ids]] == 0] if len(sitemap_ids) else sitemap_ids
+
+    broken_targets = np.zeros(n, dtype=bool)
+    for node_id, http_status in builder.status.items():
+        broken_targets[node_id] = _is_broken(http_status)
+    broken_edges = np.flatnonzero(broken_targets[indices])
+    edge_source = np.repeat(np.arange(n), np.diff(indptr))
+
+    top_ids = np.argsort(-scores)[:TOP_PAGES_LIMIT]
+    report = {
+        'nodes': n,
+        'edges': int(len(indices)),
+        'orphan_count': int(len(orphan_ids)),
+        'orphans': [builder.urls[i] for i in orphan_ids[:REPORT_LIST_LIMIT]],
+        'broken_link_count': int(len(broken_edges)),
+        'broken_links': [{'source': builder.urls[edge_source[e]], 'target': builder.urls[indices[e]], 'status': builder.status.get(int(indices[e]))}
+                         for e in broken_edges[:REPORT_LIST_LIMIT]],
+        'top_pages': [{'url': builder.urls[i], 'pagerank': round(float(scores[i]), 4), 'inlinks': int(inlinks[i])} for i in top_ids],
+    }
+
+    graph_path = scan_meta_path(scan_file, 'graph')[:-len('.json')] + '.npz'
+    os.makedirs(os.path.dirname(graph_path), exist_ok=True)
+    with open(graph_path, 'wb') as f:
+        np.savez_compressed(f, indptr=indptr, indices=indices, pagerank=scores.astype(np.float32),
+                            urls=np.frombuffer('\n'.join(builder.urls).encode('utf-8'), dtype=np.uint8))
+    atomic_write_json(scan_meta_path(scan_file, 'linkgraph'), report, ensure_ascii=False)
+
+    def lookup(url):
+        node_id = builder.node_ids.get(url)
+        if node_id is None:
+            return {}
+        node_id = remap[node_id]
+        return {'inlinks': int(inlinks[node_id]), 'pagerank': round(float(scores[node_id]), 4)}
+    return lookup, report
+
+def load_link_graph_report(scan_file):
+    try:
+        with open(scan_meta_path(scan_file, 'linkgraph'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
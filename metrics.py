@@ -0,0 +1,136 @@
+# metrics.py
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(label_names, label_values, extra=None):
+    pairs = list(zip(label_names, label_values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # labels -> [bucket_counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, **labels):
+        key = tuple(str(labels.get(n, '')) for n in self.label_names)
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if position < len(self.buckets):
+                series[0][position] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (bucket_counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', bound))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, key, ('le', '+Inf'))} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {round(total, 6)}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, help_text, label_names, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, label_names, **kwargs)
+            return metric
+
+    def histogram(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def counter(self, name, help_text, label_names=()):
+        return self._get_or_create(Counter, name, help_text, label_names)
+
+    def render(self):
+        """Prometheus text exposition format"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+HTTP_PHASE_SECONDS = REGISTRY.histogram('seo_http_phase_seconds', 'Per-URL HTTP phase timings (dns, connect, ttfb, download, parse, total).', ('phase', 'host'))
+HTTP_REQUESTS_TOTAL = REGISTRY.counter('seo_http_requests_total', 'URL health checks by host and status class.', ('host', 'status_class'))
+TASK_PHASE_SECONDS = REGISTRY.histogram('seo_task_phase_seconds', 'Phase timings of background tasks.', ('task', 'phase'))
+OPENAI_REQUEST_SECONDS = REGISTRY.histogram('seo_openai_request_seconds', 'OpenAI ChatCompletion latency.', ('model', 'outcome'))
+OPENAI_TOKENS_TOTAL = REGISTRY.counter('seo_openai_tokens_total', 'Tokens consumed by OpenAI calls.', ('model',))
+PUBLISH_SECONDS = REGISTRY.histogram('seo_publish_seconds', 'WordPress publish latency per site.', ('site', 'outcome'))
+STARTUP_SECONDS = REGISTRY.histogram('seo_startup_seconds', 'App import time and lazy component initialization.', ('phase',))
+
+@contextmanager
+def task_phase(task, phase, timings=None):
+    """Task ke ek phase ka time histogram mein daalta hai aur `timings` dict (status record) mein ms store karta hai"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        TASK_PHASE_SECONDS.observe(elapsed, task=task, phase=phase)
+        if timings is not None:
+            timings[phase] = round(elapsed * 1000, 1)
+
+class PhaseTimer:
+    """Sequential phases ko bina extra indentation ke time karta hai: timer.mark('page_load')"""
+    def __init__(self, task, timings):
+        self.task = task
+        self.timings = timings
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        elapsed = now - self._last
+        self._last = now
+        TASK_PHASE_SECONDS.observe(elapsed, task=self.task, phase=phase)
+        self.timings[phase] = round(elapsed * 1000, 1)
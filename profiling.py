@@ -0,0 +1,100 @@
+# profiling.py
+
+import os
+import sys
+import time
+import cProfile
+import threading
+from collections import Counter as StackCounter
+from config import Config
+
+class SamplingProfiler:
+    """
+    Low-overhead sampling profiler: ek background thread har `interval` seconds
+    par target thread ka stack padhta hai aur folded stacks count karta hai
+    (flamegraph.pl / speedscope seedha is format ko khol lete hain).
+    """
+    def __init__(self, thread_id, interval=None):
+        self.thread_id = thread_id
+        self.interval = interval or Config.PROFILING_SAMPLE_INTERVAL
+        self.samples = StackCounter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _frame_label(self, frame):
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def write_folded(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+def _profile_output_dir(task_info):
+    """Profile ko task ke output ke paas rakhta hai (scan file ya scraped folder), warna Config.PROFILE_DIR"""
+    if task_info.get('file'):
+        return os.path.join(os.path.dirname(task_info['file']), 'meta')
+    if task_info.get('scraped_file'):
+        return os.path.dirname(task_info['scraped_file'])
+    return Config.PROFILE_DIR
+
+def run_profiled(target, args, task_id, status_dict, enabled=False, mode=None):
+    """
+    Task ko profiler ke andar chalata hai agar per-task `enabled` ya Config.PROFILING_ENABLED on ho.
+    Off hone par seedha `target(*args)` - koi overhead nahi.
+    """
+    if not (enabled or Config.PROFILING_ENABLED):
+        return target(*args)
+
+    mode = mode or Config.PROFILING_MODE
+    started = time.perf_counter()
+    # Target khud 'complete' set kar deta hai, profile uske baad likhi jaati hai - dashboard tab tak poll karta rahe
+    if task_id in status_dict:
+        status_dict[task_id]['profiling'] = True
+    if mode == 'cprofile':
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(target, *args)
+        finally:
+            _save_profile(task_id, status_dict, started, lambda path: profiler.dump_stats(path), 'prof')
+    else:
+        profiler = SamplingProfiler(threading.get_ident())
+        profiler.start()
+        try:
+            return target(*args)
+        finally:
+            profiler.stop()
+            _save_profile(task_id, status_dict, started, profiler.write_folded, 'folded')
+
+def _save_profile(task_id, status_dict, started, writer, extension):
+    task_info = status_dict.get(task_id, {})
+    try:
+        output_dir = _profile_output_dir(task_info)
+        os.makedirs(output_dir, exist_ok=True)
+        path = os.path.join(output_dir, f"{task_id}.profile.{extension}")
+        writer(path)
+        task_info['profile_file'] = path
+        task_info['profile_seconds'] = round(time.perf_counter() - started, 2)
+    except Exception as e:
+        print(f"Could not save profile for task {task_id}: {e}")
+    finally:
+        task_info['profiling'] = False
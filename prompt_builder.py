@@ -0,0 +1,227 @@
+# prompt_builder.py
+
+import re
+import threading
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from config import Config
+
+# Article ke bahar ke hisse - inka text prompt mein sirf tokens kharch karta hai
+BOILERPLATE_TAGS = ['script', 'style', 'noscript', 'iframe', 'svg', 'nav', 'aside', 'footer', 'form', 'button', 'template']
+BOILERPLATE_HINT = re.compile(r'(^|[-_ ])(nav|navbar|menu|sidebar|breadcrumbs?|comments?|share|sharing|social|related|newsletter|subscribe|cookie|popup|modal|advert|ads|widget|promo|footer)([-_ ]|$)', re.IGNORECASE)
+BOILERPLATE_LINE = re.compile(r'(©|copyright|all rights reserved|follow us|share (this|on)|subscribe|also read|read more|click here|join (our|us)'
+                              r'|यह भी पढ़ें|ये भी पढ़ें|हमें फॉलो करें|शेयर करें|ज़रूर पढ़ें|जरूर पढ़ें)', re.IGNORECASE)
+CONTENT_TAGS = ['h1', 'h2', 'h3', 'h4', 'p', 'li', 'img']
+# Isse kam main-content text mile to page ka structure ajeeb hai - caller visible elements par fall back karta hai
+MIN_MAIN_CONTENT_WORDS = 80
+
+def _clean(text):
+    return re.sub(r'\s+', ' ', text).strip()
+
+# --- Token counting ---
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """tiktoken optional hai; na ho to False (heuristic use hota hai)"""
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.encoding_for_model(Config.AI_MODEL)
+            except Exception:
+                _encoding = False
+        return _encoding
+
+def count_tokens(text):
+    """
+    Local token count. tiktoken ho to exact; warna conservative estimate:
+    ASCII ~4 chars/token, Devanagari jaise non-ASCII ~1 token/char (BPE mein Hindi mehngi padti hai).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii) // 4 + non_ascii + 1
+
+# --- Main content extraction ---
+
+def _is_boilerplate(tag):
+    hints = ' '.join(tag.get('class', [])) + ' ' + (tag.get('id') or '') + ' ' + (tag.get('role') or '')
+    if tag.get('hidden') is not None or tag.get('aria-hidden') == 'true' or 'display:none' in (tag.get('style') or '').replace(' ', ''):
+        return True
+    return bool(BOILERPLATE_HINT.search(hints)) or tag.get('role') in ('navigation', 'complementary', 'contentinfo')
+
+def _text_density(tag):
+    return sum(len(p.get_text(strip=True)) for p in tag.find_all('p', recursive=False))
+
+def _find_main_root(soup):
+    """<article>/<main> (sabse zyada text wala) - na mile to jis container ke seedhe <p> mein sabse zyada text ho"""
+    candidates = soup.find_all('article') or soup.find_all('main') or soup.find_all(attrs={'role': 'main'})
+    if candidates:
+        return max(candidates, key=lambda tag: len(tag.get_text(strip=True)))
+    containers = soup.find_all(['div', 'section', 'td'])
+    best = max(containers, key=_text_density, default=None)
+    if best is not None and _text_density(best) > 0:
+        return best
+    return soup.body or soup
+
+def extract_main_content(html, page_url, h1=None):
+    """HTML se sirf article body ka markdown - navigation, sidebars, footers, share/related widgets ke bina"""
+    soup = BeautifulSoup(html, 'lxml')
+    page_h1 = soup.find('h1')
+    h1 = h1 or (page_h1.get_text(' ', strip=True) if page_h1 else (soup.title.get_text(strip=True) if soup.title else ''))
+    root = _find_main_root(soup)
+    for tag in root.find_all(BOILERPLATE_TAGS):
+        tag.decompose()
+    root_text = len(root.get_text(strip=True))
+    for tag in root.find_all(_is_boilerplate):
+        # "share-enabled" jaisi class wala wrapper khud article ho sakta hai - bade hisse ko nahi hatate
+        if not tag.decomposed and len(tag.get_text(strip=True)) < root_text / 2:
+            tag.decompose()
+
+    lines = [f"# {_clean(h1)}"]
+    for el in root.find_all(CONTENT_TAGS):
+        if el.decomposed:
+            continue
+        if el.name == 'img':
+            src = el.get('src') or el.get('data-src')
+            if src and 'data:image' not in src:
+                lines.append(f"![{_clean(el.get('alt') or 'image')}]({urljoin(page_url, src)})")
+        elif el.name == 'h1':
+            continue
+        elif el.name.startswith('h'):
+            text = _clean(el.get_text(' '))
+            if text:
+                lines.append(f"{'#' * int(el.name[1])} {text}")
+        elif el.name == 'p' and el.find_parent('li') is not None:
+            # <li><p>..</p></li> - text li ke saath aa chuka hai
+            continue
+        else:
+            text = _clean(el.get_text(' '))
+            if text:
+                lines.append(f"- {text}" if el.name == 'li' else text)
+    return '\n\n'.join(lines) + '\n\n'
+
+def word_count(markdown_content):
+    return len(re.sub(r'!\[[^\]]*\]\([^)]*\)', ' ', markdown_content).split())
+
+# --- Compaction and chunking ---
+
+def compact_markdown(markdown_content):
+    """Duplicate blocks (menus/widgets jo har jagah dohraaye jaate hain) aur chhoti boilerplate lines hata-ta hai"""
+    seen, blocks = set(), []
+    for block in markdown_content.split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+        key = block.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        if len(block) < 120 and not block.startswith(('#', '![')) and BOILERPLATE_LINE.search(block):
+            continue
+        blocks.append(block)
+    return '\n\n'.join(blocks) + '\n\n'
+
+def _split_block(block, max_tokens):
+    """Budget se bada ek block - pehle sentences, phir words par"""
+    pieces, current = [], ''
+    for sentence in re.split(r'(?<=[.!?।])\s+', block):
+        if count_tokens(sentence) > max_tokens:
+            words = sentence.split()
+            step = max(1, len(words) * max_tokens // max(count_tokens(sentence), 1))
+            sentences = [' '.join(words[i:i + step]) for i in range(0, len(words), step)]
+        else:
+            sentences = [sentence]
+        for part in sentences:
+            candidate = f"{current} {part}".strip()
+            if current and count_tokens(candidate) > max_tokens:
+                pieces.append(current)
+                current = part
+            else:
+                current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_into_chunks(markdown_content, max_tokens):
+    """
+    Block (paragraph) boundaries par greedy packing; aadha budget bhar chuka ho to naya heading
+    naye chunk se shuru hota hai taaki sections beech mein na kate.
+    """
+    chunks, current, current_tokens = [], [], 0
+    for block in markdown_content.split('\n\n'):
+        block = block.strip()
+        if not block:
+            continue
+        block_tokens = count_tokens(block) + 1
+        parts = [block] if block_tokens <= max_tokens else _split_block(block, max_tokens)
+        for part in parts:
+            part_tokens = count_tokens(part) + 1
+            starts_section = part.startswith('#') and current_tokens > max_tokens // 2
+            if current and (current_tokens + part_tokens > max_tokens or starts_section):
+                chunks.append('\n\n'.join(current))
+                current, current_tokens = [], 0
+            current.append(part)
+            current_tokens += part_tokens
+    if current:
+        chunks.append('\n\n'.join(current))
+    return chunks
+
+def truncate_to_tokens(text, max_tokens):
+    """Budget tak ka shuruaati text - chhote pieces greedily jod kar, block/sentence boundary par kata hua"""
+    kept, used = [], 0
+    for piece in split_into_chunks(text, max(64, max_tokens // 8)):
+        piece_tokens = count_tokens(piece) + 1
+        if used + piece_tokens > max_tokens:
+            break
+        kept.append(piece)
+        used += piece_tokens
+    return '\n\n'.join(kept)
+
+# --- Prompts ---
+
+def build_ai_prompt(h1, markdown_content, publisher_name):
+    """Scraped markdown se rewrite prompt banata hai (cache hit par naye publisher ke liye bhi)"""
+    content_lower = markdown_content.lower()
+    if "recruitment" in content_lower or "apprentice" in content_lower:
+        content_type, target_keywords = "Job Notification", f"{h1.lower()}, सरकारी नौकरी 2025"
+    elif "tips" in content_lower or "how to" in content_lower:
+        content_type, target_keywords = "Tips & Tricks", f"{h1.lower()}, गूगल रैंकिंग टिप्स"
+    else:
+        content_type, target_keywords = "News Article", f"{h1.lower()}, ताज़ा खबर"
+
+    return f"""... (नमस्ते AI, मेरे पास एक लेख है जो मैंने एक वेबसाइट से लिया है। मैं चाहता हूँ कि तुम इस लेख को पढ़ो और इसे अपने शब्दों में दोबारा लिखो ताकि यह बिल्कुल नया, मूल, और Google में पहले रैंक पर आने लायक लगे। यहाँ कुछ खास बातें हैं जो तुम्हें ध्यान रखनी हैं:
+
+    1. **भाषा**: बहुत ही सरल और आसान हिंदी में लिखना, जैसे कोई दोस्त बात कर रहा हो, ताकि हर कोई समझ सके और लगे कि इंसान ने लिखा है, न कि AI ने।
+    2. **SEO फोकस**: लेख को Google रैंकिंग और इंडेक्सिंग के लिए ऑप्टिमाइज़ करना। इसके लिए इन कीवर्ड्स का सही इस्तेमाल करना: '{target_keywords}'। कीवर्ड्स को टाइटल, सबहेडिंग्स (H2, H3), और बॉडी में 2-3 बार naturally डालना, पर कीवर्ड स्टफिंग न करना।
+    3. **लेख का प्रकार**: यह एक '{content_type}' लेख है। इसे पढ़कर उसी के हिसाब से भावनाएँ जोड़ना (जैसे उत्साह, जरूरत का अहसास), ताकि लोग इसे पसंद करें और शेयर करें।
+    4. **परिचय**: लेख की शुरुआत में एक छोटा सा परिचय देना जो पाठकों का ध्यान खींचे और मुख्य विषय को समझाए।
+    5. **महत्वपूर्ण जानकारी**: लेख में दी गई तारीख, समय, घोषणा, कदम (steps), और दूसरी जरूरी बातों को समझना और अपने तरीके से लिखना, पर मूल संदेश वही रखना।
+    6. **बेहतर और आकर्षक बनाना**: मूल लेख से भी अच्छा बनाना। नई पंक्तियाँ, रोचक शब्द, और आसान भाषा जोड़कर इसे मजेदार बनाना, ताकि लोग पूरा पढ़ें।
+    7. **इमेज प्लेसमेंट**: बताना कि इमेज कहाँ-कहाँ लगानी चाहिए (जैसे परिचय के बाद, हर सबहेडिंग के नीचे या स्टेप्स के साथ), और हर इमेज के लिए alt text में कीवर्ड डालना।
+    8. **प्रकाशक का नाम**: लेख के अंत में लिखना कि '{publisher_name}' इस लेख पर आपकी राय, पसंद या समर्थन चाहता है।
+    9. **SEO टिप्स**: टाइटल 60 अक्षरों से कम रखना, मेटा डिस्क्रिप्शन 150-160 अक्षरों में लिखना, और LSI कीवर्ड्स (जैसे लेख से संबंधित शब्द जो मूल में न हों, मिसाल के तौर पर 'जॉब अपडेट', 'आवेदन कैसे करें') डालना।
+    10. **उन्नत निष्कर्ष**: लेख के अंत में एक निष्कर्ष देना जो पाठकों को कुछ करने के लिए प्रेरित करे (जैसे आवेदन करना, शेयर करना) और मुख्य बिंदुओं को दोहराए।
+
+    यहाँ मूल लेख है जो तुम्हें दोबारा लिखना है:\n\n{markdown_content}\n\n
+    अब इसे नए तरीके से लिखो और अंत में एक टेबल देना जिसमें ये हों:
+    - **Content**: नया लिखा हुआ लेख
+    - **Keywords**: इस्तेमाल किए गए मुख्य कीवर्ड्स
+    - **Title Suggestion**: आकर्षक टाइटल (60 अक्षरों से कम)
+    - **Tags**: संबंधित टैग्स (5-7)) ..."""
+
+def build_map_prompt(h1, chunk, index, total):
+    """Map step: lambe article ke ek hisse se sirf tathya (notes) - rewrite reduce step mein hota hai"""
+    return f"""यह एक लंबे लेख ('{h1}') का हिस्सा {index}/{total} है। इसे दोबारा मत लिखो - सिर्फ़ इसके सभी तथ्य छोटे bullet points में निकालो।
+तारीखें, संख्याएँ, नाम, योग्यता, फीस, steps, links और image markers (![...](...)) जैसे के तैसे रखना। Headings (##) बनाए रखना। कोई नई जानकारी मत जोड़ना।
+
+{chunk}"""
+
+def needs_map_reduce(markdown_content):
+    return count_tokens(markdown_content) > Config.AI_ARTICLE_TOKEN_BUDGET
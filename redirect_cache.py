@@ -0,0 +1,110 @@
+# redirect_cache.py
+
+import os
+import threading
+from datetime import datetime, timedelta
+from journal_store import JournalStore
+from config import Config
+
+REDIRECT_CACHE_FILE = os.path.join('monitoring_data', 'redirect_cache.json')
+PERMANENT_REDIRECTS = (301, 308)
+MAX_LOCAL_HOPS = 10
+
+class RedirectCache:
+    """
+    Permanent (301/308) redirect chains ka cross-scan cache, URL se keyed.
+    Har record: {'url', 'hops': [{'url', 'status'}, ...], 'target', 'verified_at'}
+    Site scans aur competitor scans dono yahi ek shared instance use karte hain.
+    read_only (shard workers): file kabhi nahi likhta; har change `observations` mein jaata hai
+    jise coordinator apne instance par `apply()` karta hai - file ka writer ek hi process rahe.
+    Writes memory mein turant, disk par `flush()` par batch mein - scan loop ise executor se bulata hai.
+    """
+    def __init__(self, path=REDIRECT_CACHE_FILE, read_only=False):
+        self._store = JournalStore(path, 'url', read_only=read_only)
+        self.observations = [] if read_only else None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            with self._load_lock:
+                if not self._loaded:
+                    self._store.load()
+                    self._loaded = True
+
+    def get(self, url):
+        self._ensure_loaded()
+        return self._store.get(url)
+
+    def is_fresh(self, record):
+        """TTL ke andar verify hua record bina kisi request ke use ho sakta hai"""
+        try:
+            verified_at = datetime.fromisoformat(record['verified_at'])
+        except (KeyError, ValueError):
+            return False
+        return datetime.now() - verified_at < Config.REDIRECT_CACHE_TTL
+
+    def next_hop(self, record):
+        """Pehle hop ka expected Location (verification ke liye)"""
+        hops = record['hops']
+        return hops[1]['url'] if len(hops) > 1 else record['target']
+
+    def remember(self, url, hops, target, verified_at=None):
+        """Sirf poori tarah permanent chains cache hoti hain; temporary hop aane par purana record hat jaata hai"""
+        self._ensure_loaded()
+        verified_at = verified_at or datetime.now().isoformat()
+        if hops and all(hop['status'] in PERMANENT_REDIRECTS for hop in hops) and target != url:
+            self._store.put({'url': url, 'hops': hops, 'target': target, 'verified_at': verified_at}, defer=True)
+        else:
+            self._store.delete(url, defer=True)
+        self._observe('remember', url, hops, target, verified_at)
+
+    def mark_verified(self, url, verified_at=None):
+        record = self.get(url)
+        verified_at = verified_at or datetime.now().isoformat()
+        if record:
+            self._store.put({**record, 'verified_at': verified_at}, defer=True)
+        self._observe('verified', url, verified_at)
+
+    def forget(self, url):
+        self._ensure_loaded()
+        self._store.delete(url, defer=True)
+        self._observe('forget', url)
+
+    def _observe(self, op, *args):
+        if self.observations is not None:
+            self.observations.append([op, *args])
+
+    def apply(self, observations):
+        """Read-only instance (doosre process) ke observations isi cache par, usi order mein"""
+        handlers = {'remember': self.remember, 'verified': self.mark_verified, 'forget': self.forget}
+        for op, *args in observations:
+            handlers[op](*args)
+        self.flush()
+
+    def flush(self):
+        """Pending writes journal mein (blocking - async code `asyncio.to_thread` se bulaye)"""
+        self._store.flush()
+
+    def resolve(self, url):
+        """Known permanent redirects ko locally follow karta hai (koi network request nahi)"""
+        self._ensure_loaded()
+        seen = {url}
+        for _ in range(MAX_LOCAL_HOPS):
+            record = self._store.get(url)
+            if not record or record['target'] in seen:
+                break
+            url = record['target']
+            seen.add(url)
+        return url
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_redirect_cache():
+    """Process-wide ek hi instance, taaki ek file par do in-memory copies na banein"""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = RedirectCache()
+        return _shared_cache
@@ -0,0 +1,113 @@
+# revisit_schedule.py
+
+import random
+from datetime import datetime, timedelta, timezone
+from config import Config
+from url_delta_index import parse_lastmod
+
+# Purana fixed schedule (09:00 + 18:00, har competitor) - savings isi se compare hoti hain
+FIXED_SCANS_PER_DAY = 2
+RATE_SMOOTHING = 0.5  # Naye observation ka weight (EWMA)
+
+def lastmod_publish_rate(sitemap_urls, now):
+    """
+    Sitemap lastmod deltas se posts per day. Aakhri post se ab tak ka gap bhi ek interval gina jaata hai,
+    isliye chup ho chuki site ka rate apne aap girta hai. Do se kam distinct lastmod ho to None.
+    """
+    cutoff = now - Config.COMPETITOR_RATE_WINDOW
+    # Minute tak round - sitemap regenerate hone par ek saath bane lastmod ek hi event hain
+    stamps = sorted({lastmod.replace(second=0, microsecond=0) for lastmod in
+                     (parse_lastmod(item.get('last_modified')) for item in sitemap_urls)
+                     if lastmod and cutoff < lastmod <= now})
+    if len(stamps) < 2:
+        return None
+    intervals = [later - earlier for earlier, later in zip(stamps, stamps[1:])] + [now - stamps[-1]]
+    mean_days = sum(intervals, timedelta()) / len(intervals) / timedelta(days=1)
+    return 1 / max(mean_days, 1 / 24 / 60)
+
+def observed_publish_rate(sitemap_urls, new_count, previous_scan_at, now):
+    """lastmod se; sitemap mein lastmod na ho to pichle scan ke baad mile naye URLs / beeta time"""
+    rate = lastmod_publish_rate(sitemap_urls, now)
+    if rate is None and previous_scan_at:
+        elapsed_days = (now - previous_scan_at) / timedelta(days=1)
+        if elapsed_days > 0:
+            rate = new_count / elapsed_days
+    return rate
+
+def revisit_interval(rate_per_day):
+    """Itna gap ki har visit par ~COMPETITOR_POSTS_PER_VISIT naye posts milein, min/max ke beech"""
+    if rate_per_day is None:
+        return Config.COMPETITOR_SCAN_INTERVAL
+    if rate_per_day <= 0:
+        return Config.COMPETITOR_MAX_REVISIT
+    interval = timedelta(days=Config.COMPETITOR_POSTS_PER_VISIT / rate_per_day)
+    return min(max(interval, Config.COMPETITOR_MIN_REVISIT), Config.COMPETITOR_MAX_REVISIT)
+
+def plan_next_scan(competitor, sitemap_urls, new_count, previous_scan_at, now=None):
+    """Scan ke baad competitor ka rate (EWMA), interval aur jitter ke saath agla scan time update karta hai"""
+    now = now or datetime.now(timezone.utc)
+    observed = observed_publish_rate(sitemap_urls, new_count, previous_scan_at, now)
+    rate = competitor.get('publish_rate_per_day')
+    if observed is not None:
+        rate = observed if rate is None else RATE_SMOOTHING * observed + (1 - RATE_SMOOTHING) * rate
+        competitor['publish_rate_per_day'] = round(rate, 4)
+    interval = revisit_interval(rate)
+    competitor['revisit_interval_hours'] = round(interval / timedelta(hours=1), 2)
+    return schedule_at(competitor, now + jittered(interval))
+
+def plan_retry(competitor, now=None):
+    now = now or datetime.now(timezone.utc)
+    return schedule_at(competitor, now + jittered(revisit_interval(competitor.get('publish_rate_per_day'))))
+
+def jittered(interval):
+    """±COMPETITOR_REVISIT_JITTER - same interval wale competitors ek hi second par na takrayein"""
+    return interval * (1 + random.uniform(-Config.COMPETITOR_REVISIT_JITTER, Config.COMPETITOR_REVISIT_JITTER))
+
+def schedule_at(competitor, when):
+    competitor['next_scan_at'] = when.isoformat()
+    return when.timestamp()
+
+def stagger_overdue(competitor, now=None):
+    """Monitoring start par jo competitors due ho chuke (ya kabhi scan nahi hue) unhe stagger window mein phaila deta hai"""
+    now = now or datetime.now(timezone.utc)
+    due = next_scan_time(competitor)
+    if due is not None and due > now.timestamp():
+        return due
+    offset = random.uniform(0, Config.COMPETITOR_START_STAGGER.total_seconds())
+    return schedule_at(competitor, now + timedelta(seconds=offset))
+
+def next_scan_time(competitor):
+    try:
+        return datetime.fromisoformat(competitor['next_scan_at']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def schedule_overview(competitors):
+    """Aane wale scans (sabse pehle wala upar) aur fixed 2x/day schedule ke mukable kitna scan kaam bacha"""
+    upcoming = []
+    scans_per_day = urls_per_day = fixed_urls_per_day = 0.0
+    for competitor in competitors:
+        interval_hours = competitor.get('revisit_interval_hours') or Config.COMPETITOR_SCAN_INTERVAL / timedelta(hours=1)
+        total_urls = (competitor.get('last_scan_data') or {}).get('total_urls') or 0
+        scans_per_day += 24 / interval_hours
+        urls_per_day += total_urls * 24 / interval_hours
+        fixed_urls_per_day += total_urls * FIXED_SCANS_PER_DAY
+        upcoming.append({
+            'name': competitor['name'],
+            'url': competitor['url'],
+            'next_scan_at': competitor.get('next_scan_at'),
+            'revisit_interval_hours': round(interval_hours, 2),
+            'publish_rate_per_day': competitor.get('publish_rate_per_day'),
+            'last_scan': competitor.get('last_scan'),
+        })
+    upcoming.sort(key=lambda item: item['next_scan_at'] or '')
+    fixed_scans_per_day = FIXED_SCANS_PER_DAY * len(competitors)
+    return {
+        'upcoming': upcoming,
+        'scans_per_day': round(scans_per_day, 2),
+        'fixed_scans_per_day': fixed_scans_per_day,
+        'sitemap_urls_per_day': int(urls_per_day),
+        'fixed_sitemap_urls_per_day': int(fixed_urls_per_day),
+        # Negative = hourly publish karne wale sites ke liye fixed schedule se zyada scans
+        'work_saved_pct': round((1 - urls_per_day / fixed_urls_per_day) * 100, 1) if fixed_urls_per_day else None,
+    }
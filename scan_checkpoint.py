@@ -0,0 +1,167 @@
+# scan_checkpoint.py
+
+import os
+import json
+import glob
+from datetime import datetime
+from config import Config
+from journal_store import atomic_write_json
+
+class ScanCheckpoint:
+    """
+    Chalte hue scan ke partial results disk par rakhta hai:
+    `meta/<scan_id>.sitemap.json` - discovered sitemap entries (ek baar likha jaata hai)
+    `meta/<scan_id>.partial.jsonl` - har checked URL ka result, ek line per URL
+    `meta/<scan_id>.progress.json` - chhota status (base_url, total, checked), har flush par update;
+    dashboard sirf yahi padhta hai
+    Process restart ke baad isi se scan resume hota hai.
+    """
+    def __init__(self, site_scan_dir, scan_id):
+        self.site_scan_dir = site_scan_dir
+        self.scan_id = scan_id
+        meta_dir = os.path.join(site_scan_dir, 'meta')
+        self.sitemap_path = os.path.join(meta_dir, f"{scan_id}.sitemap.json")
+        self.partial_path = os.path.join(meta_dir, f"{scan_id}.partial.jsonl")
+        self.progress_path = os.path.join(meta_dir, f"{scan_id}.progress.json")
+        self.final_path = os.path.join(site_scan_dir, f"{scan_id}.json")
+        self._file = None
+        self._unflushed = 0
+        self._checked = 0
+        self._progress = None  # Sirf sitemap wale (resumable) scans ka; merge jaise use mein None
+
+    def save_sitemap(self, base_url, sitemap_urls, options=None):
+        started_at = datetime.now().isoformat()
+        atomic_write_json(self.sitemap_path, {
+            'scan_id': self.scan_id,
+            'base_url': base_url,
+            'started_at': started_at,
+            'options': options or {},
+            'urls': sitemap_urls
+        }, ensure_ascii=False)
+        self._progress = {'scan_id': self.scan_id, 'base_url': base_url, 'started_at': started_at,
+                          'options': options or {}, 'total_urls': len(sitemap_urls), 'checked_urls': 0}
+        self._write_progress()
+
+    def load_sitemap(self):
+        """(sitemap_urls, options) - resume par scan mode (jaise crawl) wahi rehta hai"""
+        with open(self.sitemap_path, 'r', encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        self._progress = {'scan_id': self.scan_id, 'base_url': checkpoint['base_url'], 'started_at': checkpoint.get('started_at'),
+                          'options': checkpoint.get('options', {}), 'total_urls': len(checkpoint['urls']), 'checked_urls': self._checked}
+        return checkpoint['urls'], checkpoint.get('options', {})
+
+    def iter_results(self):
+        """Partial file ke saare complete results (adhuri aakhri line chhod kar)"""
+        try:
+            with open(self.partial_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break
+                    yield json.loads(line)
+        except FileNotFoundError:
+            return
+
+    def load_done_urls(self):
+        """Pehle se checked URLs; crash ki adhuri aakhri line truncate kar deta hai"""
+        done, good_bytes = set(), 0
+        try:
+            with open(self.partial_path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        done.add(json.loads(line)['url'])
+                    except ValueError:
+                        break
+                    good_bytes += len(line)
+            with open(self.partial_path, 'r+b') as f:
+                f.truncate(good_bytes)
+        except FileNotFoundError:
+            pass
+        self._checked = len(done)
+        return done
+
+    def append(self, result):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.partial_path), exist_ok=True)
+            self._file = open(self.partial_path, 'a', encoding='utf-8')
+        self._file.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._unflushed += 1
+        self._checked += 1
+        if self._unflushed >= Config.SCAN_CHECKPOINT_EVERY:
+            self.flush()
+
+    def flush(self):
+        if self._file:
+            self._file.flush()
+            self._unflushed = 0
+            self._write_progress()
+
+    def _write_progress(self):
+        if self._progress is not None:
+            self._progress['checked_urls'] = self._checked
+            atomic_write_json(self.progress_path, self._progress, ensure_ascii=False)
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._write_progress()
+
+    def finalize(self, transform=None):
+        """Partial results ko row-by-row final `<scan_id>.json` array mein stream karta hai (optional per-row transform ke saath)"""
+        self.close()
+        tmp_path = f"{self.final_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('[\n')
+            for i, result in enumerate(self.iter_results()):
+                if transform:
+                    result = transform(result)
+                out.write(('' if i == 0 else ',\n') + '    ' + json.dumps(result))
+            out.write('\n]\n')
+        os.replace(tmp_path, self.final_path)
+        return self.final_path
+
+    def cleanup(self):
+        self.close()
+        for path in (self.partial_path, self.sitemap_path, self.progress_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+def _count_lines(path):
+    """Complete lines, bina JSON parse kiye"""
+    try:
+        with open(path, 'rb') as f:
+            return sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+    except FileNotFoundError:
+        return 0
+
+def _legacy_progress(sitemap_path):
+    """Progress file se pehle ke checkpoints: ek baar sitemap padh kar progress file bana deta hai"""
+    with open(sitemap_path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    done = ScanCheckpoint(os.path.dirname(os.path.dirname(sitemap_path)), checkpoint['scan_id'])
+    progress = {'scan_id': checkpoint['scan_id'], 'base_url': checkpoint['base_url'], 'started_at': checkpoint.get('started_at'),
+                'options': checkpoint.get('options', {}), 'total_urls': len(checkpoint['urls']),
+                'checked_urls': _count_lines(done.partial_path)}
+    atomic_write_json(done.progress_path, progress, ensure_ascii=False)
+    return progress
+
+def list_incomplete_scans(scan_data_dir):
+    """
+    Beech mein ruke hue scans (jinka sitemap checkpoint hai par final file nahi). Har scan ki sirf
+    chhoti progress file padhi jaati hai - URL list aur partial results nahi.
+    """
+    incomplete = []
+    for sitemap_path in glob.glob(os.path.join(scan_data_dir, '*', 'meta', '*.sitemap.json')):
+        progress_path = sitemap_path[:-len('.sitemap.json')] + '.progress.json'
+        try:
+            try:
+                with open(progress_path, 'r', encoding='utf-8') as f:
+                    progress = json.load(f)
+            except FileNotFoundError:
+                progress = _legacy_progress(sitemap_path)
+        except (FileNotFoundError, ValueError, KeyError):
+            continue
+        incomplete.append(progress)
+    return incomplete
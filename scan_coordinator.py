@@ -0,0 +1,452 @@
+# scan_coordinator.py
+
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import asyncio
+import logging
+import argparse
+import threading
+import subprocess
+import multiprocessing
+from contextlib import contextmanager
+from config import Config
+from analyzer_logic import SCAN_DATA_DIR, sanitize_url_for_filename, get_all_sitemap_urls, check_url_health, create_timing_trace_config
+from redirect_cache import RedirectCache, get_redirect_cache
+from url_categorizer import get_matcher
+from scan_checkpoint import ScanCheckpoint
+from scan_index import build_scan_index, build_scan_summary
+from metrics import task_phase
+from seo_audit import SiteAudit
+from scan_priority import PreviousScan
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    base_url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_urls INTEGER,
+    error TEXT,
+    created_at REAL NOT NULL,
+    sitemap_done_at REAL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    shard_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    checked INTEGER NOT NULL DEFAULT 0,
+    results TEXT,
+    redirects TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS shards_by_job ON shards(job_id, status);
+"""
+
+class LeaseLost(Exception):
+    """Shard ki lease expire ho kar kisi aur worker ko mil gayi - iska result ab nahi likhna"""
+
+class ShardBroker:
+    """
+    SQLite par scan shards ki queue. Har site scan ek job hai: pehle ek 'sitemap' shard
+    (URLs nikalna), phir Config.SCAN_SHARD_SIZE ke 'urls' shards. Worker (local process ya
+    doosra node jo same DB file dekhta hai) lease ke saath shard claim karta hai; lease renew na
+    ho to shard wapas queue mein chala jaata hai.
+    """
+    def __init__(self, path=None):
+        self.path = path or Config.SCAN_SHARD_DB
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connection() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+            # Purani queue DB mein redirects column nahi tha
+            if 'redirects' not in {row['name'] for row in conn.execute('PRAGMA table_info(shards)')}:
+                conn.execute('ALTER TABLE shards ADD COLUMN redirects TEXT')
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA busy_timeout=30000')
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self):
+        """BEGIN IMMEDIATE: claim karte waqt do workers ek hi shard na utha lein"""
+        conn = self._connect()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            yield conn
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+    def create_job(self, job_id, base_url):
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM shards WHERE job_id = ?", (job_id,))
+            conn.execute("INSERT OR REPLACE INTO jobs (job_id, base_url, status, created_at) VALUES (?, ?, 'running', ?)", (job_id, base_url, time.time()))
+            conn.execute("INSERT INTO shards (job_id, kind, seq, payload) VALUES (?, 'sitemap', 0, ?)", (job_id, base_url))
+
+    def claim(self, worker_id):
+        """Agla pending shard (sitemap shards pehle, purane jobs pehle); site par SCAN_MAX_SHARDS_PER_SITE se zyada nahi"""
+        now = time.time()
+        with self._transaction() as conn:
+            # Jin workers ne lease renew nahi ki unke shards wapas queue mein
+            conn.execute("""
+                UPDATE shards SET worker = NULL,
+                    status = CASE WHEN attempts >= :max THEN 'error' ELSE 'pending' END,
+                    error = CASE WHEN attempts >= :max THEN 'Worker stopped responding' ELSE error END
+                WHERE status = 'running' AND lease_until < :now""", {'max': Config.SCAN_SHARD_MAX_ATTEMPTS, 'now': now})
+            row = conn.execute("""
+                SELECT s.shard_id, s.job_id, s.kind, s.seq, s.payload FROM shards s JOIN jobs j ON j.job_id = s.job_id
+                WHERE s.status = 'pending' AND j.status = 'running'
+                  AND (SELECT COUNT(*) FROM shards r WHERE r.job_id = s.job_id AND r.status = 'running') < ?
+                ORDER BY s.kind = 'urls', j.created_at, s.seq LIMIT 1""", (Config.SCAN_MAX_SHARDS_PER_SITE,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE shards SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1 WHERE shard_id = ?",
+                         (worker_id, now + Config.SCAN_SHARD_LEASE.total_seconds(), row['shard_id']))
+            return dict(row)
+
+    def renew(self, shard_id, worker_id, checked):
+        """Lease aage badhata hai aur progress likhta hai; False = lease kisi aur ke paas ja chuki"""
+        with self._connection() as conn:
+            cursor = conn.execute("UPDATE shards SET lease_until = ?, checked = ? WHERE shard_id = ? AND worker = ? AND status = 'running'",
+                                  (time.time() + Config.SCAN_SHARD_LEASE.total_seconds(), checked, shard_id, worker_id))
+            return cursor.rowcount == 1
+
+    def complete_sitemap(self, shard_id, worker_id, sitemap_urls, previous_scan=None):
+        """
+        URLs ko shards mein baantta hai; har shard ke saath uske URLs ki pichle scan wali rows
+        (PreviousScan.shard_rows) bhi - workers ko poora pichla scan nahi padhna padta.
+        """
+        # Payloads transaction se pehle - shard_rows pichli scan file padhta hai, DB lock itni der nahi
+        size = Config.SCAN_SHARD_SIZE
+        payloads = []
+        for start in range(0, len(sitemap_urls), size):
+            urls = sitemap_urls[start:start + size]
+            previous = previous_scan.shard_rows(item['url'] for item in urls) if previous_scan else {}
+            payloads.append((json.dumps({'urls': urls, 'previous': previous}, ensure_ascii=False), len(urls)))
+        with self._transaction() as conn:
+            shard = conn.execute("SELECT job_id FROM shards WHERE shard_id = ? AND worker = ? AND status = 'running'", (shard_id, worker_id)).fetchone()
+            if shard is None:
+                raise LeaseLost(shard_id)
+            job_id = shard['job_id']
+            if not sitemap_urls:
+                conn.execute("UPDATE shards SET status = 'error', error = ? WHERE shard_id = ?", ('No URLs found or sitemap not accessible.', shard_id))
+                return
+            shards = [(job_id, seq, payload, count) for seq, (payload, count) in enumerate(payloads, start=1)]
+            conn.executemany("INSERT INTO shards (job_id, kind, seq, payload, size) VALUES (?, 'urls', ?, ?, ?)", shards)
+            conn.execute("UPDATE shards SET status = 'done', checked = ? WHERE shard_id = ?", (len(sitemap_urls), shard_id))
+            conn.execute("UPDATE jobs SET total_urls = ?, sitemap_done_at = ? WHERE job_id = ?", (len(sitemap_urls), time.time(), job_id))
+
+    def complete_urls(self, shard_id, worker_id, results, redirects=()):
+        """redirects: worker ke read-only redirect cache ke observations - coordinator merge par apply karta hai"""
+        payload = ''.join(json.dumps(result, ensure_ascii=False) + '\n' for result in results)
+        with self._connection() as conn:
+            cursor = conn.execute("UPDATE shards SET status = 'done', results = ?, redirects = ?, checked = ?, lease_until = NULL WHERE shard_id = ? AND worker = ? AND status = 'running'",
+                                  (payload, json.dumps(list(redirects), ensure_ascii=False), len(results), shard_id, worker_id))
+            if cursor.rowcount != 1:
+                raise LeaseLost(shard_id)
+
+    def fail(self, shard_id, worker_id, error):
+        """Attempts bache hon to shard dobara queue mein, warna error (poora job fail)"""
+        with self._connection() as conn:
+            conn.execute("""
+                UPDATE shards SET worker = NULL, error = ?,
+                    status = CASE WHEN attempts >= ? THEN 'error' ELSE 'pending' END
+                WHERE shard_id = ? AND worker = ?""", (error, Config.SCAN_SHARD_MAX_ATTEMPTS, shard_id, worker_id))
+
+    def job_progress(self, job_id):
+        with self._connection() as conn:
+            job = conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if job is None:
+                return None
+            rows = conn.execute("SELECT kind, status, COUNT(*) AS shards, SUM(checked) AS checked FROM shards WHERE job_id = ? GROUP BY kind, status", (job_id,)).fetchall()
+            error = conn.execute("SELECT error FROM shards WHERE job_id = ? AND status = 'error' LIMIT 1", (job_id,)).fetchone()
+        url_rows = [row for row in rows if row['kind'] == 'urls']
+        sitemap_done = job['sitemap_done_at'] is not None
+        shards_total = sum(row['shards'] for row in url_rows)
+        shards_done = sum(row['shards'] for row in url_rows if row['status'] == 'done')
+        return {
+            'job_id': job_id, 'base_url': job['base_url'], 'status': job['status'],
+            'total_urls': job['total_urls'] or 0,
+            # Complete job ke shards delete ho chuke hote hain
+            'checked': job['total_urls'] or 0 if job['status'] == 'complete' else sum(row['checked'] or 0 for row in url_rows),
+            'shards_total': shards_total, 'shards_done': shards_done,
+            'shards_running': sum(row['shards'] for row in url_rows if row['status'] == 'running'),
+            'error': error['error'] if error else None,
+            'ready': sitemap_done and shards_total > 0 and shards_done == shards_total,
+            'created_at': job['created_at'], 'sitemap_done_at': job['sitemap_done_at'],
+        }
+
+    def iter_job_results(self, job_id):
+        """Shard order mein saare result rows - ek waqt par ek shard memory mein"""
+        conn = self._connect()
+        try:
+            shard_ids = [row['shard_id'] for row in conn.execute("SELECT shard_id FROM shards WHERE job_id = ? AND kind = 'urls' ORDER BY seq", (job_id,))]
+            for shard_id in shard_ids:
+                results = conn.execute("SELECT results FROM shards WHERE shard_id = ?", (shard_id,)).fetchone()['results'] or ''
+                for line in results.splitlines():
+                    yield json.loads(line)
+        finally:
+            conn.close()
+
+    def iter_job_redirects(self, job_id):
+        """Shard order mein redirect cache observations"""
+        with self._connection() as conn:
+            rows = conn.execute("SELECT redirects FROM shards WHERE job_id = ? AND kind = 'urls' ORDER BY seq", (job_id,)).fetchall()
+        for row in rows:
+            yield from json.loads(row['redirects'] or '[]')
+
+    def finish_job(self, job_id, status, error=None):
+        """Job band; shards (aur unke results) DB se hat jaate hain - final output scans/<site>/ mein hai"""
+        with self._transaction() as conn:
+            conn.execute("UPDATE jobs SET status = ?, error = ? WHERE job_id = ?", (status, error, job_id))
+            conn.execute("DELETE FROM shards WHERE job_id = ?", (job_id,))
+
+    def list_jobs(self, limit=50):
+        with self._connection() as conn:
+            job_ids = [row['job_id'] for row in conn.execute("SELECT job_id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,))]
+        return [self.job_progress(job_id) for job_id in job_ids]
+
+# --- Worker ---
+
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+async def _fetch_sitemap(base_url):
+    import aiohttp
+    async with aiohttp.ClientSession() as session:
+        return await get_all_sitemap_urls(session, base_url)
+
+def _plan_job(shard):
+    """Sitemap shard: site ke URLs + pichla complete scan (compact; audit reuse, content_changed ke liye)"""
+    base_url = shard['payload']
+    sitemap_urls = asyncio.run(_fetch_sitemap(base_url))
+    site_scan_dir = os.path.join(SCAN_DATA_DIR, sanitize_url_for_filename(base_url))
+    previous_scan = PreviousScan.load(site_scan_dir, shard['job_id']) if sitemap_urls else None
+    return sitemap_urls, previous_scan
+
+async def _check_shard(broker, shard, worker_id):
+    """
+    Shard ke URLs wahi check_url_health se - rows normal scan jaise hi bante hain. Redirect cache
+    read-only: cache file sirf coordinator likhta hai, worker ke observations result ke saath jaate hain.
+    """
+    import aiohttp
+    payload = json.loads(shard['payload'])
+    if isinstance(payload, list):
+        # Purane format ke shards (sirf URLs)
+        payload = {'urls': payload, 'previous': {}}
+    urls = payload['urls']
+    previous_scan = PreviousScan(rows=payload['previous'])
+    semaphore = asyncio.Semaphore(Config.SCAN_SHARD_CONCURRENCY)
+    redirect_cache = RedirectCache(read_only=True)
+    matcher = get_matcher()
+    renew_every = Config.SCAN_SHARD_LEASE.total_seconds() / 3
+    last_renew = time.monotonic()
+    results = []
+    async with aiohttp.ClientSession(trace_configs=[create_timing_trace_config()]) as session:
+        tasks = [check_url_health(session, url_data, semaphore, redirect_cache, None, previous_scan) for url_data in urls]
+        for future in asyncio.as_completed(tasks):
+            result = await future
+            result['category'] = matcher.categorize(result.get('final_url', result['url']))
+            result['content_changed'] = previous_scan.content_changed(result)
+            results.append(result)
+            if time.monotonic() - last_renew > renew_every:
+                last_renew = time.monotonic()
+                if not broker.renew(shard['shard_id'], worker_id, len(results)):
+                    raise LeaseLost(shard['shard_id'])
+    return results, redirect_cache.observations
+
+def run_worker(db_path=None, idle_exit=None):
+    """
+    Shards claim karke chalata hai jab tak kaam mile. idle_exit (seconds) ho to utni der
+    khali rehne par exit - coordinator ke local workers aise hi band hote hain.
+    """
+    try:
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+    except AttributeError:
+        pass
+    broker = ShardBroker(db_path)
+    worker_id = _worker_id()
+    idle_since = time.monotonic()
+    while True:
+        shard = broker.claim(worker_id)
+        if shard is None:
+            if idle_exit is not None and time.monotonic() - idle_since > idle_exit:
+                return
+            time.sleep(1)
+            continue
+        try:
+            if shard['kind'] == 'sitemap':
+                broker.complete_sitemap(shard['shard_id'], worker_id, *_plan_job(shard))
+            else:
+                broker.complete_urls(shard['shard_id'], worker_id, *asyncio.run(_check_shard(broker, shard, worker_id)))
+        except LeaseLost:
+            logging.warning(f"Shard {shard['shard_id']} was reassigned; dropping this worker's result")
+        except Exception as e:
+            logging.error(f"Shard {shard['shard_id']} ({shard['kind']}) failed: {e}")
+            broker.fail(shard['shard_id'], worker_id, str(e))
+        idle_since = time.monotonic()
+
+# --- Coordinator (app side) ---
+
+_local_workers = []
+_local_workers_lock = threading.Lock()
+
+def ensure_local_workers(count, db_path=None):
+    """
+    `count` local worker processes chalte rahein. Alag interpreter (python scan_coordinator.py worker)
+    se - app module dobara import nahi hota, har process apna core aur event loop leta hai.
+    """
+    with _local_workers_lock:
+        _local_workers[:] = [process for process in _local_workers if process.poll() is None]
+        while len(_local_workers) < count:
+            command = [sys.executable, os.path.abspath(__file__), 'worker', '--processes', '1',
+                       '--idle-exit', str(Config.SCAN_WORKER_IDLE_EXIT), '--db', db_path or Config.SCAN_SHARD_DB]
+            _local_workers.append(subprocess.Popen(command, cwd=os.getcwd()))
+        return len(_local_workers)
+
+def _merge_job(broker, progress, status):
+    """Shard results -> normal `scans/<site>/<scan_id>.json` + index + summary (single-process scan jaisa hi output)"""
+    job_id, base_url = progress['job_id'], progress['base_url']
+    timings = status.setdefault('timings', {})
+    timings['sitemap_fetch'] = round((progress['sitemap_done_at'] - progress['created_at']) * 1000, 1)
+    timings['url_checks'] = round((time.time() - progress['sitemap_done_at']) * 1000, 1)
+    status['message'] = f"Merging {progress['shards_total']} shards..."
+    checkpoint = ScanCheckpoint(os.path.join(SCAN_DATA_DIR, sanitize_url_for_filename(base_url)), job_id)
+    # Per-page audit workers mein hi ho chuka; duplicate titles/descriptions poori site dekh kar yahan
+    audit = SiteAudit()
+    with task_phase('sharded_scan', 'merge', timings):
+        for row in broker.iter_job_results(job_id):
+            audit.add(row)
+            checkpoint.append(row)
+        filename = checkpoint.finalize(audit.annotate)
+        audit_report = audit.write_report(filename)
+        build_scan_index(filename, map(audit.annotate, checkpoint.iter_results()))
+    build_scan_summary(filename, map(audit.annotate, checkpoint.iter_results()), base_url, timings, audit_report=audit_report)
+    checkpoint.cleanup()
+    # Workers ne redirect cache nahi likha - unke observations yahan, is process ke ek hi writer instance par
+    get_redirect_cache().apply(broker.iter_job_redirects(job_id))
+    broker.finish_job(job_id, 'complete')
+    status.update({'status': 'complete', 'progress': 100, 'message': f"Scan complete! {progress['total_urls']} URLs in {progress['shards_total']} shards.", 'file': filename})
+
+def run_sharded_scans(sites, status_dict, coordinator_id=None, processes=None):
+    """
+    sites: [(base_url, scan_id), ...] - har scan_id ka status_dict entry pehle se ho.
+    Jobs broker mein daal kar local workers chalata hai aur har job poora hote hi merge karta hai.
+    Doosre nodes `python scan_coordinator.py worker --db <shared db>` se isi queue se shards lete hain.
+    """
+    broker = ShardBroker()
+    for base_url, scan_id in sites:
+        broker.create_job(scan_id, base_url)
+        status_dict[scan_id].update({'status': 'running', 'progress': 1, 'message': 'Queued for sharded scan...'})
+    pending = {scan_id: base_url for base_url, scan_id in sites}
+    if coordinator_id:
+        status_dict[coordinator_id]['status'] = 'running'
+
+    while pending:
+        workers = ensure_local_workers(processes or Config.SCAN_WORKER_PROCESSES)
+        for scan_id in list(pending):
+            status = status_dict[scan_id]
+            try:
+                progress = broker.job_progress(scan_id)
+                if progress['error']:
+                    broker.finish_job(scan_id, 'error', progress['error'])
+                    status.update({'status': 'error', 'message': progress['error']})
+                    del pending[scan_id]
+                elif progress['ready']:
+                    _merge_job(broker, progress, status)
+                    del pending[scan_id]
+                elif progress['total_urls']:
+                    status['progress'] = max(5, int(progress['checked'] / progress['total_urls'] * 100))
+                    status['message'] = (f"Checking {progress['checked']}/{progress['total_urls']} "
+                                         f"({progress['shards_done']}/{progress['shards_total']} shards done, {progress['shards_running']} running)")
+                else:
+                    status['message'] = 'Fetching sitemaps...'
+            except Exception as e:
+                logging.error(f"Sharded scan {scan_id} failed: {e}")
+                broker.finish_job(scan_id, 'error', str(e))
+                status.update({'status': 'error', 'message': str(e)})
+                del pending[scan_id]
+        if coordinator_id:
+            done = len(sites) - len(pending)
+            status_dict[coordinator_id]['progress'] = int(done / len(sites) * 100)
+            status_dict[coordinator_id]['message'] = f'{done}/{len(sites)} sites finished, {workers} local worker processes'
+        if pending:
+            time.sleep(1)
+
+    if coordinator_id:
+        failed = sum(1 for _, scan_id in sites if status_dict[scan_id]['status'] == 'error')
+        status_dict[coordinator_id].update({'status': 'complete', 'progress': 100,
+                                            'message': f'{len(sites) - failed}/{len(sites)} sites scanned' + (f', {failed} failed' if failed else '')})
+
+def run_sharded_scan(base_url, scan_id, status_dict):
+    run_sharded_scans([(base_url, scan_id)], status_dict)
+
+def main():
+    parser = argparse.ArgumentParser(description='Sharded site scans: worker processes and queue status.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    worker = subparsers.add_parser('worker', help='Claim and run scan shards from the shared queue.')
+    worker.add_argument('--db', default=Config.SCAN_SHARD_DB, help='Shard queue database (shared with the coordinator).')
+    worker.add_argument('--processes', type=int, default=Config.SCAN_WORKER_PROCESSES)
+    worker.add_argument('--idle-exit', type=float, help='Exit after this many idle seconds (default: run forever).')
+    status = subparsers.add_parser('status', help='Show recent sharded scan jobs.')
+    status.add_argument('--db', default=Config.SCAN_SHARD_DB)
+    scan = subparsers.add_parser('scan', help='Scan one or more sites through the shard queue and wait for the results.')
+    scan.add_argument('urls', nargs='+')
+    scan.add_argument('--processes', type=int, default=Config.SCAN_WORKER_PROCESSES)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    if args.command == 'worker':
+        if args.processes <= 1:
+            run_worker(args.db, args.idle_exit)
+            return
+        context = multiprocessing.get_context('spawn')
+        processes = [context.Process(target=run_worker, args=(args.db, args.idle_exit)) for _ in range(args.processes)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    elif args.command == 'status':
+        for job in ShardBroker(args.db).list_jobs():
+            print(f"{job['job_id']}  {job['status']:<9} {job['checked']:>7}/{job['total_urls']:<7} "
+                  f"shards {job['shards_done']}/{job['shards_total']}  {job['base_url']}" + (f"  error: {job['error']}" if job['error'] else ''))
+    else:
+        status_dict = {}
+        sites = []
+        for i, url in enumerate(args.urls):
+            scan_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{i}"
+            status_dict[scan_id] = {'status': 'queued', 'progress': 0, 'url': url}
+            sites.append((url, scan_id))
+        started = time.perf_counter()
+        run_sharded_scans(sites, status_dict, processes=args.processes)
+        for url, scan_id in sites:
+            print(f"{url}: {status_dict[scan_id]['status']} - {status_dict[scan_id]['message']}")
+        print(f"Total: {time.perf_counter() - started:.1f}s")
+
+if __name__ == '__main__':
+    main()
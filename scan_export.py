@@ -0,0 +1,133 @@
+# scan_export.py
+
+import io
+import csv
+import json
+from config import Config
+from journal_store import iter_json_array
+from scan_index import iter_scan_rows, status_class
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'jsonl': ('application/x-ndjson', 'jsonl'),
+}
+SCAN_EXPORT_COLUMNS = ['url', 'http_status', 'category', 'last_modified', 'final_url', 'error', 'response_time_ms',
+                       'redirect_hops', 'canonical_url', 'canonical_mismatch', 'title', 'meta_description', 'word_count',
+                       'page_issues', 'content_hash', 'carried_over']
+DIFF_COLUMNS = ['change', 'url', 'category', 'old_http_status', 'new_http_status', 'old_last_modified',
+                'new_last_modified', 'content_changed']
+OPPORTUNITY_COLUMNS = ['competitor', 'url', 'detected_date', 'analysis.generated_content']
+DIFF_CHANGES = ('added', 'removed', 'updated')
+
+def parse_columns(value, default):
+    """`?columns=url,http_status` -> list; khali ho to default. Nested fields `analysis.topic` jaise"""
+    columns = [column.strip() for column in (value or '').split(',') if column.strip()]
+    return columns or list(default)
+
+def _resolve(row, column):
+    value = row
+    for key in column.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def stream_rows(rows, fmt='csv', columns=None):
+    """
+    Rows ko CSV / JSON Lines chunks mein yield karta hai (Response generator). CSV header turant jaata hai;
+    har EXPORT_BATCH_ROWS rows par ek chunk - memory mein ek batch se zyada kuch nahi.
+    JSONL mein columns na diye hon to poori row.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == 'csv' else None
+    if writer:
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    pending = 0
+    for row in rows:
+        if writer:
+            writer.writerow([_csv_value(_resolve(row, column)) for column in columns])
+        else:
+            if columns:
+                row = {column: _resolve(row, column) for column in columns}
+            buffer.write(json.dumps(row, ensure_ascii=False))
+            buffer.write('\n')
+        pending += 1
+        if pending >= Config.EXPORT_BATCH_ROWS:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    if pending:
+        yield buffer.getvalue()
+
+def _matches_status(http_status, wanted):
+    return str(http_status) == wanted or (isinstance(http_status, int) and status_class(http_status) == wanted)
+
+def iter_scan_export(scan_file, status=None, category=None, issue=None, search=None, changed=False):
+    """Scan file se filtered rows, file stream karte hue (rows API jaise filters: status '404' ya '4xx')"""
+    needle = search.lower() if search else None
+    for row in iter_scan_rows(scan_file):
+        if status and not _matches_status(row.get('http_status'), status):
+            continue
+        if category and (row.get('category') or 'Unknown') != category:
+            continue
+        if issue and issue not in (row.get('page_issues') or ()):
+            continue
+        if needle and needle not in row['url'].lower():
+            continue
+        if changed and not row.get('content_changed'):
+            continue
+        yield row
+
+def iter_scan_diff(old_file, new_file, change=None, search=None):
+    """
+    compare_scan_data wala diff, ek-ek row: purani scan ka sirf compact map (url -> 4 fields) memory mein,
+    nayi scan stream hoti hai. Added/updated nayi file ke order mein, removed aakhir mein.
+    """
+    needle = search.lower() if search else None
+    old_rows = {row['url']: (row.get('last_modified'), row.get('http_status'), row.get('content_hash'), row.get('category'))
+                for row in iter_scan_rows(old_file)}
+    for row in iter_scan_rows(new_file):
+        url = row['url']
+        old = old_rows.pop(url, None)
+        if needle and needle not in url.lower():
+            continue
+        if old is None:
+            if change in (None, 'added'):
+                yield {'change': 'added', 'url': url, 'category': row.get('category'),
+                       'new_http_status': row.get('http_status'), 'new_last_modified': row.get('last_modified')}
+            continue
+        old_last_modified, old_http_status, old_content_hash, _ = old
+        content_changed = old_content_hash != row.get('content_hash') and row.get('content_hash') is not None
+        if change in (None, 'updated') and (content_changed or old_last_modified != row.get('last_modified')
+                                            or old_http_status != row.get('http_status')):
+            yield {'change': 'updated', 'url': url, 'category': row.get('category'),
+                   'old_http_status': old_http_status, 'new_http_status': row.get('http_status'),
+                   'old_last_modified': old_last_modified, 'new_last_modified': row.get('last_modified'),
+                   'content_changed': content_changed}
+    if change not in (None, 'removed'):
+        return
+    for url, (old_last_modified, old_http_status, _, category) in old_rows.items():
+        if needle and needle not in url.lower():
+            continue
+        yield {'change': 'removed', 'url': url, 'category': category,
+               'old_http_status': old_http_status, 'old_last_modified': old_last_modified}
+
+def iter_opportunities(opportunities_file, competitor=None, search=None):
+    needle = search.lower() if search else None
+    for item in iter_json_array(opportunities_file):
+        if competitor and item.get('competitor') != competitor:
+            continue
+        if needle and needle not in (item.get('url') or '').lower():
+            continue
+        yield item
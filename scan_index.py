@@ -0,0 +1,274 @@
+# scan_index.py
+
+import os
+import json
+import math
+import threading
+from datetime import datetime, timezone
+from collections import OrderedDict
+from journal_store import atomic_write_json, iter_json_array
+
+SORTABLE_FIELDS = ['url', 'http_status', 'category', 'last_modified']
+ROW_FIELDS = ['url', 'http_status', 'category', 'last_modified', 'final_url', 'error', 'redirect_hops', 'canonical_mismatch', 'page_issues', 'carried_over']
+INDEX_CACHE_SIZE = 8
+
+_index_cache = OrderedDict()
+_index_cache_lock = threading.Lock()
+
+def list_scan_files(site_dir):
+    """Site ke scan files (sirf <scan_id>.json), newest pehle - uuid naam se nahi, mtime se sort"""
+    scan_files = [f for f in os.listdir(site_dir) if f.endswith('.json') and os.path.isfile(os.path.join(site_dir, f))]
+    return sorted(scan_files, key=lambda f: os.path.getmtime(os.path.join(site_dir, f)), reverse=True)
+
+def iter_scan_rows(scan_file, with_offsets=False):
+    """Scan file ki rows ek-ek karke - poora array memory mein load nahi hota (purani ek-line files bhi)"""
+    return iter_json_array(scan_file, with_offsets=with_offsets)
+
+def scan_meta_path(scan_file, kind):
+    """Scan ke side-car files (index, summary, ...) `<site_dir>/meta/<scan_id>.<kind>.json` mein rehte hain"""
+    site_dir, filename = os.path.split(scan_file)
+    scan_id = os.path.splitext(filename)[0]
+    return os.path.join(site_dir, 'meta', f"{scan_id}.{kind}.json")
+
+def status_class(http_status):
+    if isinstance(http_status, int):
+        return f"{http_status // 100}xx"
+    return str(http_status)
+
+def _sort_key(field):
+    if field == 'http_status':
+        return lambda row: (0, row[1], '') if isinstance(row[1], int) else (1, 0, str(row[1]))
+    position = ROW_FIELDS.index(field)
+    return lambda row: str(row[position] or '')
+
+def build_scan_index(scan_file, results=None):
+    """Scan results se compact rows, har sortable field ka order aur filter postings precompute karta hai"""
+    if results is None:
+        results = iter_scan_rows(scan_file)
+
+    rows = [[item.get(field) for field in ROW_FIELDS] for item in results]
+    by_category, by_status, by_issue = {}, {}, {}
+    for row_id, row in enumerate(rows):
+        by_category.setdefault(row[2] or 'Unknown', []).append(row_id)
+        for issue in row[8] or ():
+            by_issue.setdefault(issue, []).append(row_id)
+        by_status.setdefault(str(row[1]), []).append(row_id)
+        if isinstance(row[1], int):
+            # '4xx' jaise class filters bhi
+            by_status.setdefault(status_class(row[1]), []).append(row_id)
+
+    orders = {}
+    for field in SORTABLE_FIELDS:
+        key = _sort_key(field)
+        orders[field] = sorted(range(len(rows)), key=lambda row_id: key(rows[row_id]))
+
+    index = {
+        'total': len(rows),
+        'fields': ROW_FIELDS,
+        'rows': rows,
+        'orders': orders,
+        'by_category': by_category,
+        'by_status': by_status,
+        'by_issue': by_issue,
+        'category_counts': {k: len(v) for k, v in by_category.items()},
+        'status_counts': {k: len(v) for k, v in by_status.items()},
+        'issue_counts': {k: len(v) for k, v in by_issue.items()},
+    }
+    atomic_write_json(scan_meta_path(scan_file, 'index'), index, ensure_ascii=False)
+    return index
+
+def load_scan_index(scan_file):
+    """Index ko process-level LRU cache se deta hai; purane scans ke liye pehli baar build karta hai"""
+    index_file = scan_meta_path(scan_file, 'index')
+    try:
+        mtime = os.path.getmtime(index_file)
+    except OSError:
+        mtime = None
+    cache_key = (os.path.abspath(scan_file), mtime)
+    with _index_cache_lock:
+        if cache_key in _index_cache:
+            _index_cache.move_to_end(cache_key)
+            return _index_cache[cache_key]
+
+    if mtime is None:
+        index = build_scan_index(scan_file)
+        cache_key = (os.path.abspath(scan_file), os.path.getmtime(index_file))
+    else:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+
+    with _index_cache_lock:
+        _index_cache[cache_key] = index
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+def _ranks(index, field):
+    """rank[row_id] = precomputed order mein position (memory mein ek baar banta hai)"""
+    ranks = index.setdefault('_ranks', {})
+    if field not in ranks:
+        rank = [0] * index['total']
+        for position, row_id in enumerate(index['orders'][field]):
+            rank[row_id] = position
+        ranks[field] = rank
+    return ranks[field]
+
+def query_scan_index(index, page=1, per_page=50, sort='url', order='asc', category=None, http_status=None, issue=None, search=None):
+    """Filter + sort + paginate - response size page size par depend karta hai, site size par nahi"""
+    candidates = None
+    if category:
+        candidates = set(index['by_category'].get(category, []))
+    if http_status:
+        status_ids = set(index['by_status'].get(http_status, []))
+        candidates = status_ids if candidates is None else candidates & status_ids
+    if issue:
+        # Audit se pehle bane indexes mein by_issue nahi hota
+        issue_ids = set(index.get('by_issue', {}).get(issue, []))
+        candidates = issue_ids if candidates is None else candidates & issue_ids
+    row_ids = range(index['total']) if candidates is None else candidates
+
+    rows = index['rows']
+    if search:
+        needle = search.lower()
+        row_ids = [row_id for row_id in row_ids if needle in rows[row_id][0].lower()]
+
+    sort = sort if sort in SORTABLE_FIELDS else 'url'
+    if candidates is None and not search:
+        # Bina filter ke seedha precomputed order slice hota hai
+        ordered = index['orders'][sort]
+    else:
+        ordered = sorted(row_ids, key=_ranks(index, sort).__getitem__)
+
+    per_page = max(1, min(per_page, 500))
+    page = max(1, page)
+    total = len(ordered)
+    positions = range((page - 1) * per_page, min(page * per_page, total))
+    if order == 'desc':
+        page_ids = [ordered[total - 1 - position] for position in positions]
+    else:
+        page_ids = [ordered[position] for position in positions]
+    fields = index['fields']
+    return {
+        'total': total,
+        'page': page,
+        'per_page': per_page,
+        'rows': [dict(zip(fields, rows[row_id])) for row_id in page_ids],
+    }
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile (list pehle se sorted honi chahiye)"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+def build_scan_summary(scan_file, results, base_url, phase_timings=None, link_report=None, audit_report=None, budget=None):
+    """
+    Scan ka chhota rollup (status/category counts, errors, latency percentiles) likhta hai - dashboard isi ko padhta hai.
+    Budget scan mein carried-over rows status/health mein gini jaati hain par latency/bytes mein nahi.
+    """
+    status_counts, category_counts = {}, {}
+    latencies = []
+    span_values = {}
+    error_count = total = bytes_read = head_checks = 0
+    redirected = multi_hop = loops = canonical_mismatches = 0
+    issue_counts = {}
+    pages_audited = audits_reused = 0
+    carried_over = unchecked = 0
+    for item in results:
+        total += 1
+        http_status = item.get('http_status')
+        status_counts[str(http_status)] = status_counts.get(str(http_status), 0) + 1
+        category = item.get('category') or 'Unknown'
+        category_counts[category] = category_counts.get(category, 0) + 1
+        if item.get('unchecked'):
+            # Na is scan mein check hua, na kisi pichle mein - error nahi
+            unchecked += 1
+            continue
+        if item.get('error') or not isinstance(http_status, int) or http_status >= 400:
+            error_count += 1
+        hops = item.get('redirect_hops') or 0
+        redirected += hops > 0
+        multi_hop += hops > 1
+        loops += bool(item.get('redirect_loop'))
+        canonical_mismatches += bool(item.get('canonical_mismatch'))
+        if item.get('page_issues') is not None:
+            pages_audited += 1
+            audits_reused += bool(item.get('audit_reused'))
+            for issue in item['page_issues']:
+                issue_counts[issue] = issue_counts.get(issue, 0) + 1
+        if item.get('carried_over'):
+            carried_over += 1
+            continue
+        bytes_read += item.get('bytes_read') or 0
+        if item.get('check_method') == 'HEAD':
+            head_checks += 1
+        if item.get('response_time_ms') is not None:
+            latencies.append(item['response_time_ms'])
+        for span, value in (item.get('timings') or {}).items():
+            span_values.setdefault(span, []).append(value)
+    latencies.sort()
+    known = total - unchecked
+
+    class_counts = {}
+    for http_status, count in status_counts.items():
+        key = f"{http_status[0]}xx" if http_status.isdigit() else http_status
+        class_counts[key] = class_counts.get(key, 0) + count
+
+    summary = {
+        'scan_id': os.path.splitext(os.path.basename(scan_file))[0],
+        'base_url': base_url,
+        'completed_at': datetime.now().isoformat(),
+        'total_urls': total,
+        'status_counts': status_counts,
+        'status_class_counts': class_counts,
+        'category_counts': category_counts,
+        'error_count': error_count,
+        'health_pct': round((known - error_count) / known * 100, 1) if known else 0,
+        'latency_ms': {
+            'p50': percentile(latencies, 50),
+            'p90': percentile(latencies, 90),
+            'p99': percentile(latencies, 99),
+            'max': latencies[-1] if latencies else None
+        },
+        'bytes_read': bytes_read,
+        'head_checks': head_checks,
+        'redirected_urls': redirected,
+        'multi_hop_redirects': multi_hop,
+        'redirect_loops': loops,
+        'canonical_mismatches': canonical_mismatches,
+        'span_p50_ms': {span: percentile(sorted(values), 50) for span, values in span_values.items()},
+        'span_p99_ms': {span: percentile(sorted(values), 99) for span, values in span_values.items()},
+        'phase_timings_ms': phase_timings or {}
+    }
+    if budget:
+        summary['partial'] = {'budget': budget, 'checked': known - carried_over, 'carried_over': carried_over, 'unchecked': unchecked}
+    if pages_audited:
+        summary['audit'] = {'pages_audited': pages_audited, 'reused': audits_reused, 'issue_counts': issue_counts}
+        if audit_report:
+            summary['audit'].update({key: audit_report[key] for key in ('duplicate_title_groups', 'duplicate_description_groups')})
+    if link_report:
+        summary['link_graph'] = {key: link_report[key] for key in ('nodes', 'edges', 'orphan_count', 'broken_link_count')}
+    atomic_write_json(scan_meta_path(scan_file, 'summary'), summary)
+    # Dashboard ke liye constant-time pointer
+    atomic_write_json(os.path.join(os.path.dirname(scan_file), 'meta', 'latest_summary.json'), summary)
+    return summary
+
+def load_latest_summary(site_dir):
+    try:
+        with open(os.path.join(site_dir, 'meta', 'latest_summary.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def scan_completed_at(scan_file):
+    """
+    Scan kab complete hua (UTC) - summary ke `completed_at` se. File ka mtime rewrite (recategorize) par
+    badal sakta hai; summary na ho (purane scans) tabhi mtime.
+    """
+    try:
+        with open(scan_meta_path(scan_file, 'summary'), 'r', encoding='utf-8') as f:
+            # completed_at local naive time hai (datetime.now())
+            return datetime.fromisoformat(json.load(f)['completed_at']).astimezone(timezone.utc)
+    except (FileNotFoundError, ValueError, KeyError, TypeError):
+        return datetime.fromtimestamp(os.path.getmtime(scan_file), timezone.utc)
@@ -0,0 +1,145 @@
+# scan_priority.py
+
+import os
+import math
+from datetime import datetime, timezone
+from config import Config
+from journal_store import read_json_item
+from scan_index import list_scan_files, iter_scan_rows, scan_completed_at
+from seo_audit import PARSED_FIELDS
+
+# Priority score ke hisse - jitna bada, utna pehle check
+WEIGHT_NEW = 8.0  # Pichle scan mein tha hi nahi
+WEIGHT_ERROR = 6.0  # Pichli baar error / 4xx / 5xx
+WEIGHT_LASTMOD_SINCE = 5.0  # Pichle scan ke baad lastmod badla
+WEIGHT_CHANGED = 3.0  # Pichle scan mein content hash badla tha
+WEIGHT_CARRIED = 2.0  # Pichla scan bhi ise check nahi kar paaya (carried over)
+WEIGHT_RECENT = 2.0  # lastmod jitna naya, utna zyada (age ke saath ghat-ta hai)
+RECENCY_HALF_LIFE_DAYS = 7
+PRIORITY_FIELDS = ('http_status', 'error', 'content_hash', 'content_changed', 'carried_from')
+UNCHECKED_STATUS = 'Not checked'
+
+class PreviousScan:
+    """
+    Site ka latest complete scan, compact form mein: url -> sirf priority aur change detection ke fields,
+    plus reusable pages ka body_hash aur scan file mein row ka (offset, length). Parse fields memory mein
+    nahi rehte - body match hone par hi `reusable_audit` wahi ek row file se padhta hai.
+    Shard payloads (`shard_rows`) mein parse fields embedded hote hain, offset nahi.
+    """
+    def __init__(self, path=None, rows=None, completed_at=None):
+        self.path = path
+        self.rows = rows or {}
+        self.completed_at = completed_at
+        self.scan_id = os.path.splitext(os.path.basename(path))[0] if path else None
+
+    @classmethod
+    def load(cls, site_scan_dir, exclude_scan_id=None):
+        try:
+            scan_files = [name for name in list_scan_files(site_scan_dir) if name != f"{exclude_scan_id}.json"]
+        except FileNotFoundError:
+            return cls()
+        if not scan_files:
+            return cls()
+        # Sabse naya complete scan summary ke completed_at se, mtime se nahi
+        completed = [(scan_completed_at(path), path) for path in (os.path.join(site_scan_dir, name) for name in scan_files)]
+        completed_at, path = max(completed)
+        rows = {}
+        for row, offset, length in iter_scan_rows(path, with_offsets=True):
+            fields = {field: row[field] for field in PRIORITY_FIELDS if row.get(field) is not None}
+            if row.get('body_hash') and row.get('page_issues') is not None:
+                fields['body_hash'] = row['body_hash']
+                fields['offset'] = (offset, length)
+            rows[row['url']] = fields
+        return cls(path, rows, completed_at)
+
+    def reusable_audit(self, url, body_hash):
+        """Body byte-for-byte same ho to pichle scan ke parse fields (reuse_audit ke liye), warna None"""
+        previous = self.rows.get(url)
+        if not previous or previous.get('body_hash') != body_hash:
+            return None
+        return self._parsed_fields(url, previous)
+
+    def _parsed_fields(self, url, previous):
+        if 'offset' not in previous:
+            # Shard payload - parse fields row mein hi hain
+            return previous
+        try:
+            row = read_json_item(self.path, *previous['offset'])
+        except (OSError, ValueError):
+            return None
+        # Scan file beech mein rewrite hui (recategorize) to offset kisi aur row par - reuse nahi
+        if row.get('url') != url or row.get('body_hash') != previous['body_hash']:
+            return None
+        return row
+
+    def shard_rows(self, urls):
+        """Shard payload ke liye in URLs ki rows, parse fields file se bhar kar - worker ke paas scan file nahi hoti"""
+        rows = {}
+        for url in urls:
+            previous = self.rows.get(url)
+            if previous is None:
+                continue
+            fields = {field: value for field, value in previous.items() if field != 'offset'}
+            if 'offset' in previous:
+                parsed = self._parsed_fields(url, previous)
+                if parsed:
+                    fields.update({field: parsed.get(field) for field in PARSED_FIELDS})
+                else:
+                    del fields['body_hash']
+            rows[url] = fields
+        return rows
+
+    def content_changed(self, result):
+        """Is scan mein page ka content hash pichle scan se alag hai?"""
+        previous = self.rows.get(result['url'])
+        return bool(previous and previous.get('content_hash') and result.get('content_hash')
+                    and previous['content_hash'] != result['content_hash'])
+
+def url_priority(lastmod, category, previous_row, previous_scan_at, now):
+    score = 0.0
+    if previous_row is None:
+        score += WEIGHT_NEW
+    else:
+        http_status = previous_row.get('http_status')
+        if previous_row.get('error') or not isinstance(http_status, int) or http_status >= 400:
+            score += WEIGHT_ERROR
+        if previous_row.get('content_changed'):
+            score += WEIGHT_CHANGED
+        if previous_row.get('carried_from'):
+            score += WEIGHT_CARRIED
+    if lastmod:
+        if previous_scan_at and lastmod > previous_scan_at:
+            score += WEIGHT_LASTMOD_SINCE
+        age_days = max(0.0, (now - lastmod).total_seconds() / 86400)
+        score += WEIGHT_RECENT * math.pow(0.5, age_days / RECENCY_HALF_LIFE_DAYS)
+    return score * Config.SCAN_PRIORITY_CATEGORY_WEIGHTS.get(category, 1.0)
+
+def prioritize_urls(url_items, previous_scan, matcher):
+    """Sabse zyada badalne/tootne wale URLs pehle (stable sort - barabar score par sitemap order)"""
+    # url_delta_index khud analyzer_logic import karta hai - module level par circular import hota
+    from url_delta_index import parse_lastmod
+    now = datetime.now(timezone.utc)
+    categories = matcher.categorize_many(item['url'] for item in url_items)
+    scores = [url_priority(parse_lastmod(item.get('last_modified')), category, previous_scan.rows.get(item['url']), previous_scan.completed_at, now)
+              for item, category in zip(url_items, categories)]
+    order = sorted(range(len(url_items)), key=lambda i: -scores[i])
+    return [url_items[i] for i in order]
+
+def carry_over_rows(previous_scan, unchecked_items, matcher):
+    """
+    Budget mein check na ho paaye URLs ke liye pichle scan ki row (`carried_over`, `carried_from` ke saath);
+    jo pichle scan mein bhi nahi the unke liye 'Not checked' row. Pichli scan file stream hoti hai.
+    """
+    pending = {item['url']: item for item in unchecked_items}
+    if previous_scan.path and pending:
+        for row in iter_scan_rows(previous_scan.path):
+            item = pending.pop(row['url'], None)
+            if item is None:
+                continue
+            yield {**row, 'last_modified': item.get('last_modified', row.get('last_modified')),
+                   'carried_over': True, 'carried_from': row.get('carried_from') or previous_scan.scan_id}
+            if not pending:
+                break
+    for item in pending.values():
+        yield {**item, 'http_status': UNCHECKED_STATUS, 'content_hash': None, 'final_url': item['url'], 'error': None,
+               'category': matcher.categorize(item['url']), 'unchecked': True}
@@ -0,0 +1,180 @@
+# scrape_cache.py
+
+import os
+import re
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import requests
+from bs4 import BeautifulSoup
+from config import Config
+from journal_store import JournalStore
+
+CACHE_INDEX_FILE = os.path.join('scraped_data', 'scrape_cache.json')
+TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|amp|ref)$', re.IGNORECASE)
+FINGERPRINT_TAGS = ['h1', 'h2', 'h3', 'h4', 'p', 'li', 'table', 'img']
+PROBE_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+
+def normalize_article_url(url):
+    """Cache key: lowercase host, bina fragment/tracking params, sorted query, trailing slash ka fark nahi"""
+    parsed = urlparse(url.strip())
+    query = sorted((k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k))
+    netloc = parsed.netloc.lower().removeprefix('www.')
+    path = parsed.path.rstrip('/') or '/'
+    return urlunparse((parsed.scheme.lower() or 'https', netloc, path, '', urlencode(query), ''))
+
+def content_fingerprint(html):
+    """Article ke main elements ka hash - ads/nonce/timestamps jaise badlaav isse cache miss nahi karte"""
+    soup = BeautifulSoup(html, 'lxml')
+    for tag in soup(['script', 'style', 'noscript', 'iframe']):
+        tag.decompose()
+    parts = []
+    for el in soup.find_all(FINGERPRINT_TAGS):
+        parts.append(el.get('src', '') if el.name == 'img' else ' '.join(el.get_text(' ', strip=True).split()))
+    return hashlib.md5('\n'.join(parts).encode('utf-8')).hexdigest()
+
+def probe_article(url, entry=None):
+    """
+    Ek requests GET (cache entry ho to conditional): 304 par body nahi aati.
+    Return: {'unchanged': bool, 'etag', 'last_modified', 'fingerprint'} ya network error par None.
+    """
+    headers = dict(PROBE_HEADERS)
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    try:
+        response = requests.get(url, headers=headers, timeout=10)
+    except requests.RequestException:
+        return None
+    if response.status_code == 304 and entry:
+        return {'unchanged': True, 'etag': entry.get('etag'), 'last_modified': entry.get('last_modified'), 'fingerprint': entry.get('fingerprint')}
+    if response.status_code != 200:
+        return None
+    fingerprint = content_fingerprint(response.text)
+    return {
+        'unchanged': bool(entry) and entry.get('fingerprint') == fingerprint,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'fingerprint': fingerprint,
+    }
+
+def _folder_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+class ScrapeCache:
+    """
+    Normalized URL -> scraped folder (markdown, prompt, images manifest) ka index.
+    Disk quota (Config.SCRAPE_CACHE_MAX_MB) se upar jaane par least-recently-used folders hat-te hain.
+    lookup() folder ko pin karta hai (release() tak) - bulk ke doosre workers ka eviction/replace
+    serve ho rahe folder ko nahi hatata. Saare operations ek hi lock ke andar.
+    """
+    def __init__(self, path=CACHE_INDEX_FILE):
+        self._store = JournalStore(path, 'key')
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._pins = {}          # folder -> kitne workers ise abhi use kar rahe hain
+        self._deferred = set()   # replace ho chuke folders jo pin hatne par delete honge
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if not self._loaded:
+                self._store.load()
+                self._loaded = True
+
+    def lookup(self, url):
+        """Valid entry (folder aur files abhi bhi disk par hain) ya None; mili entry ka folder pin ho jaata hai"""
+        with self._lock:
+            self._ensure_loaded()
+            entry = self._store.get(normalize_article_url(url))
+            if not entry:
+                return None
+            files = [entry['scraped_file'], entry['prompt_file']] + [os.path.join(entry['image_folder'], name) for name in entry.get('images', [])]
+            if not all(os.path.exists(path) for path in files):
+                self._store.delete(entry['key'])
+                return None
+            self._pins[entry['folder']] = self._pins.get(entry['folder'], 0) + 1
+            return entry
+
+    def release(self, entry):
+        """lookup() ka pin chhodta hai; is beech replace hua folder ab delete hota hai"""
+        if not entry:
+            return
+        with self._lock:
+            folder = entry['folder']
+            remaining = self._pins.get(folder, 0) - 1
+            if remaining > 0:
+                self._pins[folder] = remaining
+                return
+            self._pins.pop(folder, None)
+            if folder in self._deferred:
+                self._deferred.discard(folder)
+                shutil.rmtree(folder, ignore_errors=True)
+
+    def _remove_folder(self, folder):
+        if self._pins.get(folder):
+            self._deferred.add(folder)
+        else:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    def store(self, url, folder, h1, publisher_name, scraped_file, prompt_file, image_folder, images, validators=None):
+        key = normalize_article_url(url)
+        size_bytes = _folder_size(folder)
+        with self._lock:
+            self._ensure_loaded()
+            previous = self._store.get(key)
+            now = datetime.now().isoformat()
+            entry = {
+                'key': key, 'url': url, 'folder': folder, 'h1': h1, 'publisher_name': publisher_name,
+                'scraped_file': scraped_file, 'prompt_file': prompt_file, 'image_folder': image_folder, 'images': images,
+                'etag': (validators or {}).get('etag'), 'last_modified': (validators or {}).get('last_modified'),
+                'fingerprint': (validators or {}).get('fingerprint'),
+                'created_at': now, 'last_used_at': now, 'size_bytes': size_bytes,
+            }
+            self._store.put(entry)
+            if previous and previous['folder'] != folder:
+                # Content badal gaya tha - purana copy rakhne ka koi fayda nahi
+                self._remove_folder(previous['folder'])
+            self.evict(keep=key)
+            return entry
+
+    def touch(self, entry, **updates):
+        """Cache hit par LRU time (aur naya prompt file, agar bana) update karta hai"""
+        size_bytes = _folder_size(entry['folder'])
+        with self._lock:
+            self._store.put({**entry, **updates, 'last_used_at': datetime.now().isoformat(), 'size_bytes': size_bytes})
+
+    def evict(self, keep=None):
+        """Quota tak LRU entries hatata hai - `keep` (abhi store/touch hui) aur pinned folders kabhi nahi"""
+        quota = Config.SCRAPE_CACHE_MAX_MB * 1024 * 1024
+        with self._lock:
+            entries = sorted(self._store.values(), key=lambda e: e['last_used_at'])
+            total = sum(e.get('size_bytes', 0) for e in entries)
+            for entry in entries:
+                if total <= quota:
+                    break
+                if entry['key'] == keep or self._pins.get(entry['folder']):
+                    continue
+                shutil.rmtree(entry['folder'], ignore_errors=True)
+                self._store.delete(entry['key'])
+                total -= entry.get('size_bytes', 0)
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+def get_scrape_cache():
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ScrapeCache()
+        return _shared_cache
@@ -0,0 +1,126 @@
+# seo_audit.py
+
+import json
+import hashlib
+from journal_store import atomic_write_json
+from scan_index import scan_meta_path
+
+TITLE_LENGTH = (30, 60)
+DESCRIPTION_LENGTH = (70, 160)
+THIN_CONTENT_WORDS = 300
+# Report mein sabse bade duplicate groups, aur har group ke kitne URLs
+DUPLICATE_GROUP_LIMIT = 100
+DUPLICATE_GROUP_URLS = 20
+# Ye flags poori site dekh kar lagte hain - pichle scan ka audit reuse karte waqt hata diye jaate hain
+SITE_ISSUES = ('duplicate_title', 'duplicate_description')
+# Ye fields sirf HTML parse se aate hain; body same ho to pichle scan se copy
+PARSED_FIELDS = ('content_hash', 'canonical_url', 'title', 'meta_description', 'h1_count', 'word_count', 'page_issues')
+NON_CONTENT_TAGS = ['script', 'style', 'noscript', 'template']
+
+def audit_page(soup, title, description):
+    """
+    Health check ke isi soup se on-page fields + issue flags. Soup se script/style hata deta hai,
+    isliye links/canonical nikalne ke baad call karein.
+    """
+    h1_count = len(soup.find_all('h1'))
+    for tag in soup(NON_CONTENT_TAGS):
+        tag.decompose()
+    root = soup.body or soup
+    fields = {
+        'title': title,
+        'meta_description': description,
+        'h1_count': h1_count,
+        'word_count': len(root.get_text(' ').split()),
+    }
+    fields['page_issues'] = page_issues(fields)
+    return fields
+
+def page_issues(fields):
+    """Ek page ke apne issues (duplicates SiteAudit finalize par jodta hai)"""
+    issues = []
+    title_length = len(fields['title'])
+    if not title_length:
+        issues.append('missing_title')
+    elif title_length < TITLE_LENGTH[0]:
+        issues.append('title_too_short')
+    elif title_length > TITLE_LENGTH[1]:
+        issues.append('title_too_long')
+    description_length = len(fields['meta_description'])
+    if not description_length:
+        issues.append('missing_description')
+    elif description_length < DESCRIPTION_LENGTH[0]:
+        issues.append('description_too_short')
+    elif description_length > DESCRIPTION_LENGTH[1]:
+        issues.append('description_too_long')
+    if fields['h1_count'] == 0:
+        issues.append('missing_h1')
+    elif fields['h1_count'] > 1:
+        issues.append('multiple_h1')
+    if fields['word_count'] < THIN_CONTENT_WORDS:
+        issues.append('thin_content')
+    return issues
+
+def reuse_audit(previous_fields):
+    """Byte-for-byte same page ke liye pichle scan ke parse fields (site-wide flags ke bina)"""
+    fields = {field: previous_fields.get(field) for field in PARSED_FIELDS}
+    fields['page_issues'] = [issue for issue in fields['page_issues'] or [] if issue not in SITE_ISSUES]
+    fields['audit_reused'] = True
+    return fields
+
+def _text_key(text):
+    return hashlib.md5(' '.join(text.lower().split()).encode('utf-8')).hexdigest()
+
+class SiteAudit:
+    """
+    Scan ke dauraan ek hi pass mein title/description hash -> URLs groups banata hai.
+    annotate() finalize transform hai: duplicate flags row ke page_issues mein jodta hai.
+    """
+    def __init__(self):
+        self.titles = {}  # hash -> [text, [urls]]
+        self.descriptions = {}
+
+    def add(self, result):
+        # Sirf audited HTML pages; jo page canonical se kisi aur URL ko point karta hai uska duplicate hona expected hai
+        if result.get('page_issues') is None or result.get('canonical_mismatch'):
+            return
+        for text, groups in ((result.get('title'), self.titles), (result.get('meta_description'), self.descriptions)):
+            if text:
+                groups.setdefault(_text_key(text), [text, []])[1].append(result['url'])
+
+    def _is_duplicate(self, groups, text):
+        return bool(text) and len(groups.get(_text_key(text), ('', ()))[1]) > 1
+
+    def annotate(self, row):
+        if row.get('page_issues') is None or row.get('canonical_mismatch'):
+            return row
+        issues = [issue for issue in row['page_issues'] if issue not in SITE_ISSUES]
+        if self._is_duplicate(self.titles, row.get('title')):
+            issues.append('duplicate_title')
+        if self._is_duplicate(self.descriptions, row.get('meta_description')):
+            issues.append('duplicate_description')
+        return {**row, 'page_issues': issues}
+
+    @staticmethod
+    def _duplicate_groups(groups):
+        duplicates = sorted((group for group in groups.values() if len(group[1]) > 1), key=lambda group: -len(group[1]))
+        return len(duplicates), [{'text': text, 'count': len(urls), 'urls': urls[:DUPLICATE_GROUP_URLS]}
+                                 for text, urls in duplicates[:DUPLICATE_GROUP_LIMIT]]
+
+    def write_report(self, scan_file):
+        title_group_count, title_groups = self._duplicate_groups(self.titles)
+        description_group_count, description_groups = self._duplicate_groups(self.descriptions)
+        report = {
+            'duplicate_title_groups': title_group_count,
+            'duplicate_description_groups': description_group_count,
+            'duplicate_titles': title_groups,
+            'duplicate_descriptions': description_groups,
+        }
+        atomic_write_json(scan_meta_path(scan_file, 'audit'), report, ensure_ascii=False)
+        return report
+
+def load_audit_report(scan_file):
+    try:
+        with open(scan_meta_path(scan_file, 'audit'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
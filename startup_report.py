@@ -0,0 +1,84 @@
+# startup_report.py
+
+import re
+import sys
+import time
+import argparse
+import subprocess
+import threading
+from contextlib import contextmanager
+from metrics import STARTUP_SECONDS
+
+# app.py sabse pehle isko import karta hai - yahin se startup ka clock chalta hai
+IMPORT_STARTED = time.perf_counter()
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+_timings = {}
+_lock = threading.Lock()
+
+def record(phase, seconds):
+    """Startup ya lazy component build ka time (pehli baar wala hi rakhte hain)"""
+    with _lock:
+        if phase in _timings:
+            return
+        _timings[phase] = round(seconds * 1000, 1)
+    STARTUP_SECONDS.observe(seconds, phase=phase)
+
+def mark_imports_done():
+    record('imports', time.perf_counter() - IMPORT_STARTED)
+
+@contextmanager
+def measure(phase):
+    """`with measure('component:x'):` - block ka time record karta hai"""
+    started = time.perf_counter()
+    yield
+    record(phase, time.perf_counter() - started)
+
+def startup_timings():
+    with _lock:
+        return dict(_timings)
+
+def importtime_breakdown(module='app', top=25, max_depth=1):
+    """
+    Naye interpreter mein `python -X importtime -c "import <module>"` chala kar har module ka
+    self/cumulative time (ms). max_depth=1 par sirf `module` ke seedhe imports aate hain.
+    """
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                               capture_output=True, text=True, timeout=120)
+    rows, total_ms = [], None
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        if name == module and depth == 0:
+            total_ms = round(int(cumulative_us) / 1000, 1)
+        elif 1 <= depth <= max_depth:
+            rows.append({'module': name, 'depth': depth, 'self_ms': round(int(self_us) / 1000, 1), 'cumulative_ms': round(int(cumulative_us) / 1000, 1)})
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return {'module': module, 'total_ms': total_ms, 'ok': completed.returncode == 0,
+            'error': completed.stderr.strip().splitlines()[-1] if completed.returncode else None, 'imports': rows[:top]}
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time breakdown of the app (python -X importtime, grouped).')
+    parser.add_argument('--module', default='app')
+    parser.add_argument('--top', type=int, default=25)
+    parser.add_argument('--depth', type=int, default=1, help='Nested import levels to include.')
+    parser.add_argument('--budget-ms', type=float, help='Exit with status 1 if the total import time is above this.')
+    args = parser.parse_args()
+
+    report = importtime_breakdown(args.module, args.top, args.depth)
+    if not report['ok']:
+        print(f"import {args.module} failed: {report['error']}")
+        sys.exit(2)
+    print(f"import {report['module']}: {report['total_ms']} ms total")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for row in report['imports']:
+        print(f"{row['cumulative_ms']:>14} {row['self_ms']:>9}  {'  ' * (row['depth'] - 1)}{row['module']}")
+    if args.budget_ms is not None and report['total_ms'] > args.budget_ms:
+        print(f"Over budget: {report['total_ms']} ms > {args.budget_ms} ms")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
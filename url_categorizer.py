@@ -0,0 +1,207 @@
+# url_categorizer.py
+
+import os
+import re
+import json
+import threading
+from urllib.parse import urlparse
+from config import Config
+from journal_store import atomic_write_json
+from scan_index import build_scan_index, list_scan_files, scan_meta_path, iter_scan_rows
+
+FALLBACK_CATEGORY = 'Other Page'
+MATCH_TYPES = ('contains', 'prefix', 'exact', 'regex')
+
+# Purane hard-coded categorize_url jaisa hi behaviour - upar wala rule pehle jeet-ta hai
+DEFAULT_CATEGORY_RULES = [
+    {'category': 'Post/Article', 'match': 'contains', 'patterns': ['/blog/', '/post/', '/article/', '/news/']},
+    {'category': 'Web Story', 'match': 'contains', 'patterns': ['/web-stories/', '/web-story/']},
+    {'category': 'Product', 'match': 'contains', 'patterns': ['/product/', '/shop/']},
+    {'category': 'Category Page', 'match': 'contains', 'patterns': ['/category/', '/collection/']},
+    {'category': 'Homepage', 'match': 'exact', 'patterns': ['/', '']},
+]
+
+def _rule_lookahead(rule):
+    patterns = [p if rule['match'] == 'regex' else re.escape(p.lower()) for p in rule['patterns']]
+    alternation = '|'.join(f'(?:{p})' for p in patterns)
+    if rule['match'] == 'contains' or rule['match'] == 'regex':
+        return f'(?=.*?(?:{alternation}))'
+    if rule['match'] == 'prefix':
+        return f'(?=(?:{alternation}))'
+    return f'(?=(?:{alternation})\\Z)'
+
+# Ye sab akele regex mein chalte hain par sabko ek alternation mein jodne par toot-te hain
+# (global flag beech mein, same group naam do baar, group numbers khisakne se galat backreference)
+GLOBAL_FLAGS = re.compile(r'^\(\?[aiLmsux]+\)')
+BACKREFERENCE = re.compile(r'(?<!\\)(?:\\\\)*\\(?:[1-9]|g<)|\(\?P=')
+
+def _validate_regex(position, pattern):
+    try:
+        compiled = re.compile(pattern)
+    except re.error as e:
+        raise ValueError(f'Rule {position}: invalid regex {pattern!r}: {e}')
+    if GLOBAL_FLAGS.search(pattern):
+        raise ValueError(f'Rule {position}: {pattern!r} uses a global inline flag; use a scoped group like (?i:...) instead.')
+    if compiled.groupindex:
+        raise ValueError(f'Rule {position}: {pattern!r} uses named groups; use plain or (?:...) groups.')
+    if BACKREFERENCE.search(pattern):
+        raise ValueError(f'Rule {position}: {pattern!r} uses a backreference, which is not supported in category rules.')
+
+def _compile_rules(rules):
+    alternatives = [f'{_rule_lookahead(rule)}(?P<r{i}>)' for i, rule in enumerate(rules)]
+    return re.compile('|'.join(alternatives)) if alternatives else None
+
+def validate_rules(rules):
+    """Galat rules par ValueError - save karne se pehle UI ko saaf message milta hai"""
+    if not isinstance(rules, list):
+        raise ValueError('Rules must be a JSON list.')
+    for position, rule in enumerate(rules, start=1):
+        if not isinstance(rule, dict) or not rule.get('category') or not isinstance(rule.get('patterns'), list) or not rule['patterns']:
+            raise ValueError(f'Rule {position}: "category" and a non-empty "patterns" list are required.')
+        if rule.get('match', 'contains') not in MATCH_TYPES:
+            raise ValueError(f'Rule {position}: "match" must be one of {", ".join(MATCH_TYPES)}.')
+        if rule.get('match') == 'regex':
+            for pattern in rule['patterns']:
+                _validate_regex(position, str(pattern))
+    rules = [{'category': r['category'], 'match': r.get('match', 'contains'), 'patterns': [str(p) for p in r['patterns']]} for r in rules]
+    # Matcher jo combined regex banata hai wahi yahan bhi - save hone ke baad get_matcher kabhi fail na ho
+    try:
+        _compile_rules(rules)
+    except re.error as e:
+        raise ValueError(f'Rules cannot be combined into one pattern: {e}')
+    return rules
+
+class CategoryMatcher:
+    """
+    Saare rules ek hi regex mein compile hote hain: har rule ek lookahead + khali named group,
+    alternation order hi priority hai aur `match.lastgroup` se jeetne wala rule milta hai.
+    Per URL ek hi regex call - rules kitne bhi hon.
+    """
+    def __init__(self, rules):
+        self.rules = validate_rules(rules)
+        self._pattern = _compile_rules(self.rules)
+        self._categories = {f'r{i}': rule['category'] for i, rule in enumerate(self.rules)}
+
+    def categorize_path(self, path):
+        match = self._pattern.match(path) if self._pattern else None
+        return self._categories[match.lastgroup] if match else FALLBACK_CATEGORY
+
+    def categorize(self, url):
+        return self.categorize_path(urlparse(url).path.lower())
+
+    def categorize_many(self, urls):
+        """Bulk: har unique path sirf ek baar match hota hai"""
+        seen = {}
+        categories = []
+        for url in urls:
+            path = urlparse(url).path.lower()
+            category = seen.get(path)
+            if category is None:
+                category = seen[path] = self.categorize_path(path)
+            categories.append(category)
+        return categories
+
+def load_category_rules():
+    try:
+        with open(Config.CATEGORY_RULES_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_CATEGORY_RULES
+
+def save_category_rules(rules):
+    rules = validate_rules(rules)
+    atomic_write_json(Config.CATEGORY_RULES_FILE, rules, indent=2, ensure_ascii=False)
+    return rules
+
+_matcher = None
+_matcher_mtime = None
+_matcher_lock = threading.Lock()
+
+def get_matcher():
+    """Rules file badalne par (mtime) hi dobara compile hota hai"""
+    global _matcher, _matcher_mtime
+    try:
+        mtime = os.path.getmtime(Config.CATEGORY_RULES_FILE)
+    except OSError:
+        mtime = None
+    with _matcher_lock:
+        if _matcher is None or mtime != _matcher_mtime:
+            try:
+                _matcher = CategoryMatcher(load_category_rules())
+            except ValueError as e:
+                # Validation se pehle save hui kharab rules file - scans default rules se chalte rahein
+                print(f"Invalid category rules, using defaults: {e}")
+                _matcher = CategoryMatcher(DEFAULT_CATEGORY_RULES)
+            _matcher_mtime = mtime
+        return _matcher
+
+def recategorize_scan(scan_file, matcher=None):
+    """
+    Stored scan ko bina rescan kiye naye rules se categorize karta hai; kuch badla ho to hi likhta hai.
+    File row-by-row temp file mein stream hoti hai (finalize jaisa format) aur purana mtime wapas set
+    hota hai - scans ka order (list_scan_files) recategorize se nahi badalna chahiye.
+    """
+    matcher = matcher or get_matcher()
+    stat = os.stat(scan_file)
+    tmp_path = f"{scan_file}.recategorize.tmp"
+    changed = 0
+    category_counts = {}
+    seen = {}
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as out:
+            out.write('[\n')
+            for i, item in enumerate(iter_scan_rows(scan_file)):
+                path = urlparse(item.get('final_url') or item['url']).path.lower()
+                category = seen.get(path)
+                if category is None:
+                    category = seen[path] = matcher.categorize_path(path)
+                if item.get('category') != category:
+                    item['category'] = category
+                    changed += 1
+                category_counts[category] = category_counts.get(category, 0) + 1
+                out.write(('' if i == 0 else ',\n') + '    ' + json.dumps(item))
+            out.write('\n]\n')
+        if not changed:
+            return 0
+        os.replace(tmp_path, scan_file)
+        os.utime(scan_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    build_scan_index(scan_file, iter_scan_rows(scan_file))
+    # Summary ke baaki numbers (latency, errors) categories par depend nahi karte
+    summary_paths = [scan_meta_path(scan_file, 'summary'), os.path.join(os.path.dirname(scan_file), 'meta', 'latest_summary.json')]
+    scan_id = os.path.splitext(os.path.basename(scan_file))[0]
+    for summary_path in summary_paths:
+        try:
+            with open(summary_path, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+        except (FileNotFoundError, ValueError):
+            continue
+        if summary.get('scan_id') == scan_id:
+            summary['category_counts'] = category_counts
+            atomic_write_json(summary_path, summary)
+    return changed
+
+def recategorize_all_scans(task_id, status_dict):
+    """Background task: har site ke saare stored scans naye rules se"""
+    try:
+        matcher = get_matcher()
+        scan_files = []
+        for site in os.listdir(Config.SCAN_DATA_DIR):
+            site_dir = os.path.join(Config.SCAN_DATA_DIR, site)
+            if os.path.isdir(site_dir):
+                scan_files.extend(os.path.join(site_dir, name) for name in list_scan_files(site_dir))
+        status_dict[task_id]['status'] = 'running'
+        changed_rows = 0
+        for i, scan_file in enumerate(scan_files):
+            changed_rows += recategorize_scan(scan_file, matcher)
+            status_dict[task_id]['progress'] = int((i + 1) / len(scan_files) * 100)
+            status_dict[task_id]['message'] = f'Recategorized {i + 1}/{len(scan_files)} scans'
+        status_dict[task_id]['status'] = 'complete'
+        status_dict[task_id]['progress'] = 100
+        status_dict[task_id]['message'] = f'{len(scan_files)} scans checked, {changed_rows} URLs moved to a new category.'
+    except Exception as e:
+        status_dict[task_id]['status'] = 'error'
+        status_dict[task_id]['message'] = str(e)
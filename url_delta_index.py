@@ -0,0 +1,78 @@
+# url_delta_index.py
+
+import os
+import hashlib
+from array import array
+from datetime import datetime, timezone
+from analyzer_logic import sanitize_url_for_filename
+
+URL_SETS_DIR = os.path.join('monitoring_data', 'url_sets')
+
+def url_id(url):
+    """URL ka stable 64-bit hashed ID"""
+    return int.from_bytes(hashlib.blake2b(url.strip().encode('utf-8'), digest_size=8).digest(), 'big')
+
+def parse_lastmod(value):
+    """Sitemap lastmod ko timezone-aware UTC datetime mein badalta hai (invalid ho to None)"""
+    if not value or value == 'N/A':
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+class UrlDeltaIndex:
+    """
+    Ek site ke sitemap URLs ka compact exact set - sorted 64-bit hash IDs ki binary file.
+    Poora URL map store karne ki jagah sirf 8 bytes per URL disk par jaata hai.
+    """
+    def __init__(self, site_url):
+        self.path = os.path.join(URL_SETS_DIR, f"{sanitize_url_for_filename(site_url)}.bin")
+
+    def load(self):
+        ids = array('Q')
+        try:
+            with open(self.path, 'rb') as f:
+                ids.frombytes(f.read())
+        except FileNotFoundError:
+            pass
+        return ids
+
+    def save(self, ids):
+        os.makedirs(URL_SETS_DIR, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(array('Q', sorted(ids)).tobytes())
+        os.replace(tmp_path, self.path)
+
+def compute_delta(url_items, previous_ids, high_water=None):
+    """
+    Current sitemap entries ko pichle ID set se compare karta hai - ek linear pass.
+    New = pichle set mein nahi tha, updated = pehle se tha par lastmod high-water mark se aage hai.
+    """
+    previous = set(previous_ids)
+    current_ids = array('Q')
+    new_items, updated_items = [], []
+    new_high_water = high_water
+
+    for item in url_items:
+        uid = url_id(item['url'])
+        current_ids.append(uid)
+        lastmod = parse_lastmod(item.get('last_modified'))
+        if uid not in previous:
+            new_items.append(item)
+        elif lastmod and high_water and lastmod > high_water:
+            updated_items.append(item)
+        if lastmod and (new_high_water is None or lastmod > new_high_water):
+            new_high_water = lastmod
+
+    return {
+        'current_ids': current_ids,
+        'new': new_items,
+        'updated': updated_items,
+        'removed_count': len(previous) - (len(current_ids) - len(new_items)),
+        'high_water': new_high_water
+    }